@@ -4,11 +4,11 @@
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 from referee.game.constants import *
+from referee.game.bitboard import cell_pos
+from opening_book import OpeningBook
 from .state import Board
 from random import choice
-from itertools import product
 import heapq
-import numpy as np
 
 
 # This is the entry point for your game playing agent. Currently the agent
@@ -24,6 +24,7 @@ class Agent:
         """
         self._color = color
         self._board = Board()
+        self._book = OpeningBook()
         match color:
             case PlayerColor.RED:
                 print("Testing: I am playing as red")
@@ -34,18 +35,15 @@ class Agent:
         """
         Return the next action to take.
         """
-        curr_state = self._board.state
         turn_num = self._board.turn_num
 
+        book_action = self._book.lookup(self._board)
+        if book_action is not None:
+            return book_action
         if turn_num < 2:
             # spawn
-            r = list(range(7))
-            q = list(range(7))
-            locs = list(product(r, q))
-            locs = [HexPos(r, q) for (r, q) in locs]
-            locs = list(filter(lambda key: curr_state[key].color is None, locs))
-            spawn_loc = choice(locs)
-            return SpawnAction(spawn_loc)
+            spawn_loc = choice(self._board.emptyCells())
+            return SpawnAction(cell_pos(spawn_loc))
         else:
             # either
             possible_moves = self._board.getLegalActions()
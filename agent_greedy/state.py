@@ -2,146 +2,65 @@
 # Project Part B: Game Playing Agent
 
 from referee.game import \
-    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
+    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir, \
+    AttackBoard
+from referee.game.bitboard import \
+    cell_index, dir_index, move_action, iter_bits
 from referee.game.constants import *
-from collections import defaultdict
-from itertools import product
 import random
 import heapq
 
-SPREAD_DIRECTIONS = [HexDir.Down, HexDir.DownRight, HexDir.DownLeft,
-                     HexDir.Up, HexDir.UpRight, HexDir.UpLeft]
 
-POS = 0
-CELL = 1
-
-class Cell:
-    def __init__(self, color: PlayerColor | None = None, power: int = 0):
-        self.color = color
-        self.power = power
+class Board(AttackBoard):
+    # The pieces are held by the referee's BitBoard engine, which also keeps
+    # the attack map (the cells each color can spread onto) up to date. Updates
+    # return a new Board, leaving this one untouched.
+    __slots__ = []
 
     def __repr__(self):
-        return f"{self.color, self.power}"
-
+        return f"{self.turn_num, self.turn}"
 
-class Board:
-    def __init__(self, initial_state: dict[HexPos, Cell] = {},
-                 turn: PlayerColor = PlayerColor.RED,
-                 turn_num: int = 0):
-        self.state: dict[HexPos, Cell] = \
-            defaultdict(lambda: Cell(None, 0))
-        self.state.update(initial_state)
+    @property
+    def turn(self) -> PlayerColor:
+        return self.turn_color
 
-        self.turn = turn
-        self.turn_num = turn_num
-
-    def __repr__(self):
-        return f"{self.state}"
+    @property
+    def turn_num(self) -> int:
+        return self.turn_count
 
     def totalCombPower(self):
         # Calculate the total power of board
-        total = 0
-        for cell in self.state.values():
-            total += cell.power
-        return total
+        return self.total_power
 
     def updateSpawn(self, color: PlayerColor, pos: HexPos):
-        # update board for a spawn move
-        cell = Cell(color, 1)
-        new_state = self.state.copy()
-        turn_num = 1 + self.turn_num
-        turn = self.updatePlayer()
-        new_state[pos] = cell
-        return Board(new_state, turn, turn_num)
+        # update board for a spawn move (color must be the player to move)
+        new_board = self.copy()
+        new_board.spawn(cell_index(pos))
+        return new_board
 
     def updateSpread(self, color: PlayerColor, pos: HexPos, direction: HexDir):
-        # update board for spread move
-        power = self.state[pos].power
-        new_state = self.state.copy()
-        new_state[pos] = Cell(None, 0)
-
-        curr_pos = pos
-        for _ in range(power):
-            curr_pos += direction
-            if new_state[curr_pos].power == MAX_CELL_POWER:
-                new_state[curr_pos] = Cell(None, 0)
-                continue
-            else:
-                new_state[curr_pos] = Cell(
-                    color, new_state[curr_pos].power + 1)
-        turn_num = 1 + self.turn_num
-        turn = self.updatePlayer()
-
-        return Board(new_state, turn, turn_num)
-
-    def simulateSpawn(self, color: PlayerColor, pos: HexPos):
-        # update board for a spawn move
-        cell = Cell(color, 1)
-        new_state = self.state.copy()
-        new_state[pos] = cell
-        return Board(new_state, self.turn, self.turn_num)
-
-    def simulateSpread(self, color: PlayerColor, pos: HexPos, direction: HexDir):
-        # update board for spread move
-        power = self.state[pos].power
-        new_state = self.state.copy()
-        new_state[pos] = Cell(None, 0)
-
-        curr_pos = pos
-        for _ in range(power):
-            curr_pos += direction
-            if new_state[curr_pos].power == MAX_CELL_POWER:
-                new_state[curr_pos] = Cell(None, 0)
-                continue
-            else:
-                new_state[curr_pos] = Cell(
-                    color, new_state[curr_pos].power + 1)
-
-        return Board(new_state, self.turn, self.turn_num)
+        # update board for spread move (color must be the player to move)
+        new_board = self.copy()
+        new_board.spread(cell_index(pos), dir_index(direction))
+        return new_board
 
     def getLegalActions(self):
-        # return a list of the valid moves from this board state for this player
-        r = list(range(7))
-        q = list(range(7))
-        cells = list(product(r, q))
-        cells = [HexPos(r, q) for (r, q) in cells]
-
-        if self.totalCombPower() >= MAX_TOTAL_POWER:
-            spawn_actions = []
-        else:
-            spawn_cells = list(
-                filter(lambda key: self.state[key].color is None, cells))
-            spawn_actions = [SpawnAction(x) for x in spawn_cells]
-
-        heap_spawn = [(-self.simulateSpawn(self.turn, x.cell)._heuristic(), x) for x in spawn_actions]
-
-        spread_cells = list(
-            filter(lambda key: self.state[key].color == self.turn, cells))
-
-        spread_actions = [SpreadAction(x, y) for (x, y) in
-                          list(product(spread_cells, SPREAD_DIRECTIONS))]
-
-        heap_spread = [(-self.simulateSpread(self.turn, x.cell, x.direction)._heuristic(), x) for x in
-                       spread_actions]
-
-        heap = heap_spread + heap_spawn
-        print(heap)
+        # return a heap of the valid moves from this board state for this
+        # player, keyed on the negated heuristic of the resulting board
+        color = self.turn
+        heap = []
+        for move in self.legal_moves():
+            self.play(move)
+            heap.append((-self._heuristic(color), move))
+            self.undo()
         heapq.heapify(heap)
 
-        return heap
-
-    def updatePlayer(self):
-        # iterate turns
-        if self.turn == PlayerColor.RED:
-            return PlayerColor.BLUE
-        else:
-            return PlayerColor.RED
+        return [(score, move_action(move)) for (score, move) in heap]
 
     ## Heuristic methods
-    def _heuristic(self):
-        curr_colour = self.turn
+    def _heuristic(self, curr_colour: PlayerColor):
         turn_num = self.turn_num
-        opp_colour = self.opponentColor()
+        opp_colour = opponentColor(curr_colour)
 
         # if near end game, give more weighting to having more power i.e. give higher weighting to boards with more of our power
         player_power = self.colorPower(curr_colour)
@@ -157,9 +76,9 @@ class Board:
         # safety - number of pieces and power of safe cells
         safety = 0
         unsafe = self.unsafePositions(opp_colour)
-        for cell in player_cells:
-            if cell[POS] not in unsafe:
-                safety += cell[CELL].power
+        for index in player_cells:
+            if not unsafe >> index & 1:
+                safety += self.power(index)
 
         if diff_num_cells > 0:
             safety_weight = 1 - diff_num_cells / player_num_cells
@@ -172,67 +91,31 @@ class Board:
 
     def colorNumCells(self, color: PlayerColor):
         # total number of cells for a color
-        total = 0
-        for cell in self.state.values():
-            if cell.color == color:
-                total += 1
-        return total
+        return self.color_mask(color).bit_count()
 
     def colorCells(self, color: PlayerColor):
-        # return a list of cells of a color
-        curr_state = self.state
-        cells = []
-        for item in curr_state.items():
-            if item[CELL].color == color:
-                cells.append(item)
-        return cells
+        # return a list of the cell indices of a color
+        return self.color_cells(color)
 
     def colorPower(self, color: PlayerColor):
         # Calculate power for a color
-        total = 0
-        for cell in self.state.values():
-            if cell.color == color:
-                total += cell.power
-        return total
+        return self.color_power(color)
+
+    def emptyCells(self):
+        # return a list of the empty cell indices
+        return list(iter_bits(self.empty_mask))
 
     def unsafePositions(self, color: PlayerColor):
-        curr_state = self.state.copy()
-        opp_cells = self.colorCells(color)
-        for cell in opp_cells:
-            pos = cell[POS]
-            for direction in [HexDir.Down, HexDir.DownRight, HexDir.DownLeft,
-                      HexDir.Up, HexDir.UpRight, HexDir.UpLeft]:
-                curr_state = simulateSpreadNew(curr_state, color, pos, direction)
-        return [x[POS] for x in curr_state.items() if x[CELL].color == color]
+        # mask of the cells a color occupies or can spread onto
+        return self.color_mask(color) | self.reach_mask(color)
 
     def opponentColor(self):
-        return PlayerColor.RED if self.turn == PlayerColor.BLUE else PlayerColor.BLUE
-
-    def _is_under_attack(self, base_cell):
-
-        opp_colour = PlayerColor.RED if self.turn == PlayerColor.BLUE else PlayerColor.BLUE
-        for direction in SPREAD_DIRECTIONS:
-            key = base_cell[0]
-            for radius in range(1, 7):
-
-                key += direction
-
-                if self.state[key].color == opp_colour and self.state[key].power >= radius:
-                    return True
-
-        return False
+        return opponentColor(self.turn)
 
-def simulateSpreadNew(state: dict[HexPos, Cell], color: PlayerColor, pos: HexPos,
-                   direction: HexDir):
-    # simulate spread to determine the locations that it can spread to
-    power = state[pos].power
-    new_state = state.copy()
-    # new_state[pos] = Cell(None, 0)
+    def _is_under_attack(self, index: int):
+        # whether the opponent of the player to move can spread onto the cell
+        return self.is_attacked(index, self.opponentColor())
 
-    curr_pos = pos
-    for _ in range(power):
-        curr_pos += direction
-        new_state[curr_pos] = Cell(
-            color, new_state[curr_pos].power)
 
-    return new_state
+def opponentColor(color: PlayerColor):
+    return PlayerColor.RED if color == PlayerColor.BLUE else PlayerColor.BLUE
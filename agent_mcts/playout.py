@@ -0,0 +1,86 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from referee.game import PlayerColor
+from referee.game.rays import CELL_COUNT, SPREAD_CELLS
+from referee.game.constants import *
+import random
+
+# Playout engine for the rollouts. A playout plays random moves until the game
+# is over on its own copy of the board: a bytearray of powers and a mask of the
+# cells each color controls, with running power totals, all updated in place.
+# Nothing is allocated per move: no action objects, no board copies and no
+# list of legal moves. Instead, a move id is drawn uniformly from all 343 and
+# redrawn until it is legal (spawn ids are 0-48, spread ids are 49 + cell * 6 +
+# direction), which picks uniformly among the legal moves.
+
+MOVE_COUNT = CELL_COUNT * 7
+COLORS = (PlayerColor.RED, PlayerColor.BLUE)
+
+
+def playout(masks, powers, turn: int, turn_count: int, rng=random,
+            played=None):
+    # masks: [red mask, blue mask]; powers: power of each cell (copied, not
+    # modified); turn: index of the color to move. Returns the winning color,
+    # or None for a draw. If given, played[color * MOVE_COUNT + move] is set
+    # for every move played (for the AMAF statistics of the search).
+    powers = bytearray(powers)
+    mine, theirs = masks[turn], masks[1 - turn]
+    my_power = their_power = 0
+    for index in range(CELL_COUNT):
+        if mine >> index & 1:
+            my_power += powers[index]
+        elif theirs >> index & 1:
+            their_power += powers[index]
+    draw = rng.random
+
+    while turn_count < 2 or (
+            turn_count < MAX_TURNS and my_power and their_power):
+        # draw move ids until one is legal for the player to move
+        can_spawn = my_power + their_power < MAX_TOTAL_POWER
+        while True:
+            move = int(draw() * MOVE_COUNT)
+            if move < CELL_COUNT:
+                if can_spawn and not (mine | theirs) >> move & 1:
+                    break
+            elif mine >> ((move - CELL_COUNT) // 6) & 1:
+                break
+        if played is not None:
+            played[turn * MOVE_COUNT + move] = 1
+
+        if move < CELL_COUNT:
+            powers[move] = 1
+            mine |= 1 << move
+            my_power += 1
+        else:
+            index, direction = divmod(move - CELL_COUNT, 6)
+            power = powers[index]
+            powers[index] = 0
+            mine ^= 1 << index
+            my_power -= power
+            for to in SPREAD_CELLS[index][direction][power]:
+                bit = 1 << to
+                prev = powers[to]
+                if theirs & bit:
+                    theirs ^= bit
+                    their_power -= prev
+                    my_power += prev
+                if prev == MAX_CELL_POWER:
+                    powers[to] = 0
+                    mine &= ~bit
+                    my_power -= prev
+                else:
+                    powers[to] = prev + 1
+                    mine |= bit
+                    my_power += 1
+
+        # pass the turn to the other player
+        mine, theirs = theirs, mine
+        my_power, their_power = their_power, my_power
+        turn = 1 - turn
+        turn_count += 1
+
+    diff = my_power - their_power
+    if abs(diff) < WIN_POWER_DIFF:
+        return None
+    return COLORS[turn] if diff > 0 else COLORS[1 - turn]
@@ -4,11 +4,28 @@
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 from referee.game.constants import *
-from .state import Board, MonteCarloTreeSearchNode
+from opening_book import OpeningBook
+from .state import Board, MonteCarloTreeSearchNode, WorkerPool, TIME_LIMIT
+from .tree import ArrayTree
 from random import choice
 from itertools import product
+import weakref
 
 
+# Worker processes for a parallel search (1 searches in this process), and
+# whether they play out the leaves of one tree rather than each growing a tree
+WORKERS = 1
+LEAF_PARALLEL = False
+# Keep the search tree in an ArrayTree (compact, but searched in this process
+# only) rather than as MonteCarloTreeSearchNode objects
+ARRAY_TREE = False
+# Number of turns we budget for, and the fewest of our own moves we assume
+# are left, when splitting the remaining time between moves
+EXPECTED_TURNS = 150
+MIN_MOVES_LEFT = 10
+# Seconds of CPU time kept in reserve
+TIME_MARGIN = 2.0
+
 # This is the entry point for your game playing agent
 
 class Agent:
@@ -18,6 +35,19 @@ class Agent:
         """
         self._color = color
         self._board = Board()
+        self._book = OpeningBook()
+        # search tree kept between turns, rooted at the current board
+        if ARRAY_TREE:
+            self._root = ArrayTree(self._board)
+            self._pool = None
+        else:
+            self._root = MonteCarloTreeSearchNode(self._board)
+            self._pool = WorkerPool(WORKERS, LEAF_PARALLEL) if WORKERS > 1 \
+                else None
+        # end the workers once the game is over (see _endGame), or failing
+        # that when the agent is collected or the interpreter exits
+        self._closePool = weakref.finalize(
+            self, self._pool.close) if self._pool is not None else None
         match color:
             case PlayerColor.RED:
                 print("Testing: I am playing as red")
@@ -28,15 +58,41 @@ class Agent:
         """
         Return the next action to take.
         """
-        curr_board = self._board
-        # print(curr_board
-        root = MonteCarloTreeSearchNode(curr_board, None, None)
-        return root.bestAction()
+        action = self._book.lookup(self._board)
+        if action is not None:
+            return action
+        time_remaining = referee["time_remaining"]
+        if time_remaining is None:
+            time_limit = TIME_LIMIT
+        else:
+            # the referee doesn't see the time our workers use, so count it
+            if self._pool is not None:
+                time_remaining -= self._pool.time_used
+            time_limit = self._moveBudget(time_remaining)
+        action = self._root.bestAction(time_limit, self._pool)
+        self._endGame(self._board.move(action))
+        return action
+
+    def _moveBudget(self, time_remaining: float) -> float:
+        """
+        Split the remaining CPU time evenly over the moves we still expect to
+        make (at least MIN_MOVES_LEFT, unless the turn limit is closer),
+        keeping a safety margin in reserve.
+        """
+        turn_num = self._board.turn_num
+        turns_left = MAX_TURNS - turn_num
+        moves_left = min(
+            (turns_left + 1) // 2,
+            max(MIN_MOVES_LEFT, (EXPECTED_TURNS - turn_num) // 2)
+        )
+        spare = max(0, time_remaining - TIME_MARGIN)
+        return spare / max(1, moves_left)
 
     def turn(self, color: PlayerColor, action: Action, **referee: dict):
         """
         Update the agent with the last player's action.
         """
+        self._root = self._root.descend(action)
         match action:
             case SpawnAction(cell):
                 # update Board
@@ -47,3 +103,14 @@ class Agent:
                 self._board = self._board.updateSpread(color, cell, direction)
                 print(f"Testing: {color} SPREAD from {cell}, {direction}")
                 pass
+        self._endGame(self._board)
+
+    def _endGame(self, board: Board):
+        """
+        Close the worker pool if the game is over on the given board. (The
+        referee doesn't pass the last action of a game on to turn(), so our
+        own winning action is checked for in action(); after an opponent's,
+        the finaliser closes the pool when the agent exits.)
+        """
+        if board.isGameOver() and self._closePool is not None:
+            self._closePool()
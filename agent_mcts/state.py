@@ -2,200 +2,130 @@
 # Project Part B: Game Playing Agent
 
 from referee.game import \
-    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
+    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir, BitBoard
+from referee.game.bitboard import \
+    cell_index, dir_index, action_move, move_action, MOVE_COUNT
+from referee.game.rays import SPREAD_CELLS
+from referee.game.batch import board_planes, stack_planes, batch_features
+from .playout import playout
 from referee.game.constants import *
-from collections import defaultdict
 import numpy as np
-from itertools import product
+import multiprocessing
 import time
-import heapq
 import random
 
+# Seconds of CPU time per move when the referee imposes no time limit
 TIME_LIMIT = 1
-
-POS = 0
-CELL = 1
-
-BOARD = 1
-
-
-class Cell:
-    def __init__(self, color: PlayerColor | None = None, power: int = 0):
-        self.color = color
-        self.power = power
+# Search iterations between checks of the clock
+CLOCK_CHECK_INTERVAL = 16
+# Rows of the statistics a node keeps for its children
+VISITS, WINS, PRIOR, AMAF_VISITS, AMAF_WINS, PROVEN = range(6)
+# Game theoretic values of solved nodes, for the player who moved into them
+PROVEN_WIN, PROVEN_LOSS = 1, -1
+# Whether the search proves wins and losses (MCTS-Solver)
+SOLVER = True
+# Visits of a child at which its own win rate and its AMAF (all moves as
+# first) win rate are weighted equally in selection; 0 turns RAVE off
+RAVE_EQUIVALENCE = 300
+
+
+class Board(BitBoard):
+    # The pieces are held by the referee's BitBoard engine. Moves return a new
+    # Board so that tree nodes can keep their own copy.
+    __slots__ = []
 
     def __repr__(self):
-        return f"{self.color, self.power}"
-
+        return f"{self.turn_num, self.turn}"
 
-class Board:
-    def __init__(self, initial_state: dict[HexPos, Cell] = {},
-                 turn: PlayerColor = PlayerColor.RED,
-                 turn_num: int = 0):
-        self.state: dict[HexPos, Cell] = \
-            defaultdict(lambda: Cell(None, 0))
-        self.state.update(initial_state)
-        self.turn = turn
-        self.turn_num = turn_num
+    @property
+    def turn(self) -> PlayerColor:
+        return self.turn_color
 
-    def __repr__(self):
-        return f"{self.state}"
+    @property
+    def turn_num(self) -> int:
+        return self.turn_count
 
     def totalCombPower(self):
         # Calculate the total power of board
-        total = 0
-        for cell in self.state.values():
-            total += cell.power
-        return total
+        return self.total_power
 
     def colorPower(self, color: PlayerColor):
         # Calculate power for a color
-        total = 0
-        for cell in self.state.values():
-            if cell.color == color:
-                total += cell.power
-        return total
+        return self.color_power(color)
 
     def colorNumCells(self, color: PlayerColor):
         # total number of cells for a color
-        total = 0
-        for cell in self.state.values():
-            if cell.color == color:
-                total += 1
-        return total
+        return self.color_mask(color).bit_count()
 
     def colorCells(self, color: PlayerColor):
-        # return a list of cells of a color
-        curr_state = self.state
-        cells = []
-        for item in curr_state.items():
-            if item[CELL].color == color:
-                cells.append(item)
-        return cells
+        # return a list of the cell indices of a color
+        return self.color_cells(color)
 
     def unsafePositions(self, color: PlayerColor):
-        curr_state = self.state.copy()
-        opp_cells = self.colorCells(color)
-        for cell in opp_cells:
-            pos = cell[POS]
-            for dir in [HexDir.Down, HexDir.DownRight, HexDir.DownLeft,
-                        HexDir.Up, HexDir.UpRight, HexDir.UpLeft]:
-                curr_state = simulateSpread(curr_state, color, pos, dir)
-        return [x[POS] for x in curr_state.items() if x[CELL].color == color]
+        # mask of the cells a color occupies or can spread onto
+        return self.color_mask(color) | self.reach_mask(color)
 
     def updateSpawn(self, color: PlayerColor, pos: HexPos):
-        # update board for a spawn move
-        cell = Cell(color, 1)
-        new_state = self.state.copy()
-        turn = self.updatePlayer()
-        turn_num = 1 + self.turn_num
-        new_state[pos] = cell
-        return Board(new_state, turn, turn_num)
+        # update board for a spawn move (color must be the player to move)
+        new_board = self.copy()
+        new_board.spawn(cell_index(pos))
+        return new_board
 
     def updateSpread(self, color: PlayerColor, pos: HexPos, direction: HexDir):
-        # update board for spread move
-        power = self.state[pos].power
-        new_state = self.state.copy()
-        new_state[pos] = Cell(None, 0)
-
-        curr_pos = pos
-        for _ in range(power):
-            curr_pos += direction
-            if new_state[curr_pos].power == MAX_CELL_POWER:
-                new_state[curr_pos] = Cell(None, 0)
-                continue
-            else:
-                new_state[curr_pos] = Cell(
-                    color, new_state[curr_pos].power + 1)
-        turn = self.updatePlayer()
-        turn_num = 1 + self.turn_num
-        return Board(new_state, turn, turn_num)
+        # update board for spread move (color must be the player to move)
+        new_board = self.copy()
+        new_board.spread(cell_index(pos), dir_index(direction))
+        return new_board
 
     def isPieceTaken(self, color: PlayerColor, pos: HexPos, direction: HexDir):
-        # update board for spread move
-        power = self.state[pos].power
-        new_state = self.state.copy()
-        new_state[pos] = Cell(None, 0)
-        takes_piece = False
-
-        curr_pos = pos
-        for _ in range(power):
-            curr_pos += direction
-            if new_state[curr_pos].power == MAX_CELL_POWER:
-                new_state[curr_pos] = Cell(None, 0)
-                continue
-            else:
-                if new_state[curr_pos].color == self.turn:
-                    takes_piece = True
-
-                new_state[curr_pos] = Cell(
-                    color, new_state[curr_pos].power + 1)
-
-        return takes_piece
-
-    def updatePlayer(self):
-        # iterate turns
-        if self.turn == PlayerColor.RED:
-            return PlayerColor.BLUE
-        else:
-            return PlayerColor.RED
+        # check whether a spread lands on an opponent cell without clearing it
+        index = cell_index(pos)
+        opp_mask = self.color_mask(opponentColor(color))
+        for to in SPREAD_CELLS[index][dir_index(direction)][self.power(index)]:
+            if opp_mask >> to & 1 and self.power(to) < MAX_CELL_POWER:
+                return True
+        return False
+
+    def playout(self, rng=random, played=None):
+        # result of a random playout from this board, which is left untouched
+        # (see playout for played)
+        return playout(self._masks, self._powers, self._turn, self._turn_count,
+                       rng, played)
 
     def getLegalActions(self):
         # return a list of the valid moves from this board state for this player
-        r = list(range(7))
-        q = list(range(7))
-        cells = list(product(r, q))
-        cells = [HexPos(r, q) for (r, q) in cells]
-
-        if self.totalCombPower() >= MAX_TOTAL_POWER:
-            spawn_actions = []
-        else:
-            spawn_cells = list(
-                filter(lambda key: self.state[key].color is None, cells))
-            spawn_actions = [SpawnAction(x) for x in spawn_cells]
-
-        spread_cells = list(
-            filter(lambda key: self.state[key].color == self.turn, cells))
-        spread_dir = [HexDir.Down, HexDir.DownRight, HexDir.DownLeft,
-                      HexDir.Up, HexDir.UpRight, HexDir.UpLeft]
-        spread_actions = [SpreadAction(x, y) for (x, y) in
-                          list(product(spread_cells, spread_dir))]
-
-        return [x for x in spread_actions + spawn_actions]
+        return self.legal_actions()
 
     def move(self, action: Action):
-        match action:
-            case SpawnAction(cell):
-                return self.updateSpawn(self.turn, cell)
-            case SpreadAction(cell, dir):
-                return self.updateSpread(self.turn, cell, dir)
+        new_board = self.copy()
+        new_board.play(action_move(action))
+        return new_board
+
+    def playMove(self, move: int):
+        # like move, for a move id
+        new_board = self.copy()
+        new_board.play(move)
+        return new_board
+
+    def childPlanes(self, moves: list[int]):
+        # the boards after each of the moves, stacked as planes for evalPlanes;
+        # the moves are played and undone here rather than on copies
+        masks, powers = [], []
+        for move in moves:
+            self.play(move)
+            masks.append(tuple(self._masks))
+            powers.append(bytes(self._powers))
+            self.undo()
+        return stack_planes(masks, powers)
 
     def isGameOver(self):
-        # taken from the board.py in referee module
-        if self.turn_num < 2:
-            return False
-
-        return any([
-            self.turn_num >= MAX_TURNS,
-            self.colorPower(PlayerColor.RED) == 0,
-            self.colorPower(PlayerColor.BLUE) == 0
-        ])
+        return self.game_over
 
     def gameResult(self) -> PlayerColor | None:
         """
         The player (color) who won the game, or None if no player has won.
         """
-        # taken from the board.py in referee module
-        if not self.isGameOver():
-            return None
-
-        red_power = self.colorPower(PlayerColor.RED)
-        blue_power = self.colorPower(PlayerColor.BLUE)
-
-        if abs(red_power - blue_power) < WIN_POWER_DIFF:
-            return None
-
-        return (PlayerColor.RED, PlayerColor.BLUE)[red_power < blue_power]
+        return self.winner_color
 
 
 class MonteCarloTreeSearchNode:
@@ -206,17 +136,47 @@ class MonteCarloTreeSearchNode:
         self.children = []
         self._n = 0
         self._wins = 0
-        self._untried = self.untriedActions()
-
-    def untriedActions(self):
-        return self.board.getLegalActions()
+        # position of this node in its parent's children (and child stats)
+        self._index = 0
+        # (move id, prior) of the moves not yet expanded, worst first; left as
+        # None (so a node costs next to nothing) until it is first expanded
+        self._untried = None
+        # PROVEN_WIN or PROVEN_LOSS once the node is solved (see prove)
+        self._proven = None
+        # the visits, wins, prior (evalFunction of the board), AMAF visits and
+        # wins and proven value (0 if unsolved) of each child, by column, and
+        # the move id of each, so that selection is one vector expression;
+        # allocated along with _untried
+        self._childStats = None
+        self._childMoves = None
+
+    def untriedMoves(self):
+        # the legal moves, ranked once by evaluating every child in one batch
+        # (ties keep the order of legal_moves, best first) and kept worst first
+        # so that each expansion pops the best one left
+        moves = self.board.legal_moves()
+        scores = evalPlanes(self.board.childPlanes(moves), self.board.turn)
+        order = np.argsort(-scores, kind="stable")[::-1]
+        return [(moves[i], float(scores[i])) for i in order]
+
+    def generateMoves(self):
+        self._untried = self.untriedMoves()
+        self._childStats = np.zeros((6, len(self._untried)))
+        self._childMoves = np.zeros(len(self._untried), dtype=np.int64)
 
     def expand(self):
-        val = [evalFunction(board) for board in map(self.board.move, self._untried)]
-        action = self._untried.pop(np.argmax(val))
-        next_board = self.board.move(action)
+        # expand the untried child with the best evaluation
+        if self._untried is None:
+            self.generateMoves()
+        move, prior = self._untried.pop()
+        return self._addChild(move, prior, move_action(move))
+
+    def _addChild(self, move, prior, action):
         child_node = MonteCarloTreeSearchNode(
-            next_board, parent=self, parent_action=action)
+            self.board.playMove(move), parent=self, parent_action=action)
+        child_node._index = len(self.children)
+        self._childStats[PRIOR, child_node._index] = prior
+        self._childMoves[child_node._index] = move
         self.children.append(child_node)
         return child_node
 
@@ -224,35 +184,85 @@ class MonteCarloTreeSearchNode:
         return self.board.isGameOver()
 
     def isFullyExpanded(self):
-        return len(self._untried) == 0
-
-    def rollout(self):
-        current_rollout_board = self.board
-
-        while not current_rollout_board.isGameOver():
-            possible_moves = current_rollout_board.getLegalActions()
-
-            action = self.rolloutPolicy(possible_moves)
-            current_rollout_board = current_rollout_board.move(action)
-        return current_rollout_board.gameResult()
-
-    def rolloutPolicy(self, possible_moves):
-        # eval_scores = [evalFunction(board) for board in map(self.board.move, possible_moves)]
-        # return possible_moves[np.argmax(eval_scores)]
-        return possible_moves[np.random.randint(len(possible_moves))]
-
-    def backPropagate(self, result):
-        self._n += 1
-        if result == self.board.turn:
-            self._wins += 1
-        if self.parent:
-            self.parent.backPropagate(result)
+        return self._untried is not None and len(self._untried) == 0
+
+    def prove(self, winner: PlayerColor | None):
+        # solve a node where the game is over, and propagate the proof up the
+        # tree (MCTS-Solver): a node is a proven loss if the player to move
+        # there has a move that is a proven win, and a proven win if all of
+        # their moves are proven losses. Solved children are never selected,
+        # so solved subtrees aren't sampled again.
+        if winner is None or not SOLVER:
+            return
+        node = self
+        node._proven = PROVEN_LOSS if winner.value == node.board._turn \
+            else PROVEN_WIN
+        while node.parent is not None:
+            parent = node.parent
+            stats = parent._childStats
+            stats[PROVEN, node._index] = node._proven
+            if node._proven == PROVEN_WIN:
+                proven = PROVEN_LOSS
+            elif parent.isFullyExpanded() and \
+                    np.all(stats[PROVEN] == PROVEN_LOSS):
+                proven = PROVEN_WIN
+            else:
+                return
+            if parent._proven == proven:
+                return
+            parent._proven = proven
+            node = parent
+
+    def rollout(self, played=None):
+        # play the game out with uniformly random moves, on the playout engine
+        # (see playout for played)
+        return self.board.playout(played=played)
+
+    def backPropagate(self, result, played=None):
+        # update the nodes from here up to the root, and their parents' copies
+        # of their statistics. A node's wins are those of the player who moved
+        # into it, so its parent selects the child best for the player to move.
+        # Given the moves of the playout (see playout), the AMAF statistics of
+        # the children of each node on the way up are updated too: a child
+        # counts the playout if its move was played, at any point after the
+        # node, by the player to move at the node. The path's own moves are
+        # added to the played moves on the way.
+        winner = -1 if result is None else result.value
+        if played is not None:
+            flags = np.frombuffer(played, dtype=np.uint8).reshape(2, MOVE_COUNT)
+        node = self
+        while node is not None:
+            mover = 1 - node.board._turn
+            won = winner == mover
+            node._n += 1
+            node._wins += won
+            parent = node.parent
+            if parent is not None:
+                stats = parent._childStats
+                stats[VISITS, node._index] += 1
+                stats[WINS, node._index] += won
+                if played is not None:
+                    moves = parent._childMoves
+                    played[mover * MOVE_COUNT + moves[node._index]] = 1
+                    seen = flags[mover, moves[:len(parent.children)]]
+                    stats[AMAF_VISITS, :len(seen)] += seen
+                    if won:
+                        stats[AMAF_WINS, :len(seen)] += seen
+            node = parent
 
     def bestChild(self, c_param=0.1):
-        # select the best child according to UCB1, only looks at expanded children
-        choices_weights = [
-            (c._wins / c._n) + c_param * np.sqrt((2 * np.log(self._n) / c._n)) + 0.01 * evalFunction(c.board) / (
-                        c._n + 1) for c in self.children]
+        # select the best child according to UCB1, only looks at expanded
+        # children; the win rate is blended with the AMAF win rate, which is
+        # trusted less as the child's own visits grow. Proven losses are never
+        # selected (a proven win would have solved this node).
+        expanded = len(self.children)
+        n, wins, prior, amaf_n, amaf_wins, proven = \
+            self._childStats[:, :expanded]
+        beta = np.sqrt(RAVE_EQUIVALENCE / (3 * n + RAVE_EQUIVALENCE))
+        value = (1 - beta) * wins / n + beta * amaf_wins / np.maximum(amaf_n, 1)
+        choices_weights = value + c_param * np.sqrt(2 * np.log(self._n) / n) \
+            + 0.01 * prior / (n + 1)
+        choices_weights[proven == PROVEN_LOSS] = -np.inf
         return self.children[np.argmax(choices_weights)]
 
     def treePolicy(self):
@@ -265,39 +275,196 @@ class MonteCarloTreeSearchNode:
                 current_node = current_node.bestChild()
         return current_node
 
-    def bestAction(self):
-        start = time.time()
+    def descend(self, action: Action):
+        # return the subtree for the board after an action, as a new root with
+        # its statistics kept, so that the search carries over between turns.
+        # The rest of the tree is no longer referenced and is freed.
+        for child in self.children:
+            if child.parent_action == action:
+                child.parent = None
+                child.parent_action = None
+                return child
+        return MonteCarloTreeSearchNode(self.board.move(action))
+
+    def child(self, action: Action):
+        # return the child for an action, expanding it if it isn't yet
+        for child in self.children:
+            if child.parent_action == action:
+                return child
+        if self._untried is None:
+            self.generateMoves()
+        move = action_move(action)
+        for i, (untried, prior) in enumerate(self._untried):
+            if untried == move:
+                del self._untried[i]
+                break
+        else:
+            raise ValueError(f"{action} is not a legal move from {self.board}")
+        return self._addChild(move, prior, action)
+
+    def bestAction(self, time_limit=TIME_LIMIT, pool=None):
+        # with a WorkerPool, search in parallel for time_limit seconds of CPU
+        # time shared among the workers (see WorkerPool)
+        if pool is not None:
+            if pool.leaf:
+                return self._leafParallel(pool, time_limit)
+            return self._rootParallel(pool, time_limit)
+
+        # search for time_limit seconds of CPU time (the referee's clock),
+        # reading the clock only every CLOCK_CHECK_INTERVAL iterations, and stop
+        # early once the most visited child can't be overtaken in the time left
+        # or this node is solved
+        start = time.process_time()
         count = 0
-        while time.time() - start < TIME_LIMIT:
-            v = self.treePolicy()
-            reward = v.rollout()
-            v.backPropagate(reward)
-            count += 1
+        while self._proven is None:
+            for _ in range(CLOCK_CHECK_INTERVAL):
+                self.iterate()
+                if self._proven is not None:
+                    break
+            count += CLOCK_CHECK_INTERVAL
+            elapsed = time.process_time() - start
+            if elapsed >= time_limit:
+                break
+            if elapsed > 0 and self._decided(
+                    count / elapsed * (time_limit - elapsed)):
+                break
         print(count)
 
-        return self.bestChild(c_param=0.).parent_action
+        return self.mostVisitedChild().parent_action
+
+    def iterate(self):
+        # one iteration of the search from this node: select and expand a
+        # leaf, play it out (or solve it if the game is over there) and
+        # backpropagate the result
+        played = bytearray(2 * MOVE_COUNT)
+        v = self.treePolicy()
+        if v.isTerminalNode():
+            reward = v.board.gameResult()
+            v.prove(reward)
+        else:
+            reward = v.rollout(played)
+        v.backPropagate(reward, played)
+
+    def mostVisitedChild(self):
+        # the most visited child, but a proven win if there is one, and not a
+        # proven loss unless all are
+        def key(c):
+            return c._proven == PROVEN_WIN, c._proven != PROVEN_LOSS, c._n
+        return max(self.children, key=key)
+
+    def _decided(self, iterations_left):
+        # True iff the most visited child will stay so whatever the remaining
+        # iterations visit (untried actions count as children with no visits)
+        if len(self.children) + len(self._untried or ()) == 1:
+            return True
+        visits = sorted((c._n for c in self.children), reverse=True)
+        runner_up = visits[1] if len(visits) > 1 else 0
+        return visits[0] - runner_up > iterations_left
+
+    def _rootParallel(self, pool, time_limit):
+        # every worker grows its own tree from this board; their root children
+        # statistics are summed into this tree, and the most visited action
+        # over all the trees is chosen
+        totals = {}
+        for stats in pool.searchTrees(self.board, time_limit):
+            for action, *counts in stats:
+                totals[action] = totals.get(action, 0) + np.array(counts)
+        for action, (n, wins, amaf_n, amaf_wins) in totals.items():
+            child = self.child(action)
+            child._n += int(n)
+            child._wins += int(wins)
+            self._childStats[[VISITS, WINS, AMAF_VISITS, AMAF_WINS],
+                             child._index] += totals[action]
+            self._n += int(n)
+        return max(totals, key=lambda action: totals[action][0])
+
+    def _leafParallel(self, pool, time_limit):
+        # the tree is grown here, and each leaf is played out once by every
+        # worker; the time budget counts this process and the workers
+        start = time.process_time()
+        worker_start = pool.time_used
+        while time.process_time() - start + pool.time_used - worker_start \
+                < time_limit:
+            if self._proven is not None:
+                break
+            v = self.treePolicy()
+            if v.isTerminalNode():
+                reward = v.board.gameResult()
+                v.prove(reward)
+                v.backPropagate(reward)
+                continue
+            for reward, played in pool.rollouts(v.board):
+                v.backPropagate(reward, played)
+        return self.mostVisitedChild().parent_action
+
+
+class WorkerPool:
+    # A pool of worker processes for parallel search. The referee's
+    # CountdownTimer measures the CPU time of the agent's process only, and
+    # can't see the workers', so each worker measures its own CPU time and
+    # reports it back. It is added up in time_used, for the agent to count
+    # against its time limit, and a search is given a CPU time budget to share
+    # among all the processes, not one each.
+    # leaf: play out leaves of a single tree in parallel, rather than growing
+    # a tree in each worker (root parallelisation)
+    def __init__(self, workers: int, leaf=False):
+        self.workers = workers
+        self.leaf = leaf
+        self.time_used = 0.
+        # forked workers would all share the parent's random state; reseed
+        self._pool = multiprocessing.Pool(workers, initializer=random.seed)
+
+    def searchTrees(self, board: Board, time_limit):
+        # grow a tree from the board in each worker for an equal share of the
+        # budget; returns (action, visits, wins, AMAF visits, AMAF wins) of
+        # each tree's root children
+        share = time_limit / self.workers
+        results = self._pool.starmap(
+            searchTree, [(board, share)] * self.workers, chunksize=1)
+        self.time_used += sum(cpu for _, cpu in results)
+        return [stats for stats, _ in results]
+
+    def rollouts(self, board: Board):
+        # play the board out once in each worker; returns the winner and the
+        # moves played (see playout) of each playout
+        results = self._pool.map(
+            rolloutTimed, [board] * self.workers, chunksize=1)
+        self.time_used += sum(cpu for _, _, cpu in results)
+        return [(winner, played) for winner, played, _ in results]
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+def searchTree(board: Board, time_limit):
+    # worker task: search from a board for time_limit seconds of CPU time
+    start = time.process_time()
+    root = MonteCarloTreeSearchNode(board)
+    while root._proven is None:
+        root.iterate()
+        if time.process_time() - start >= time_limit:
+            break
+    stats = [
+        (c.parent_action,
+         *root._childStats[[VISITS, WINS, AMAF_VISITS, AMAF_WINS], c._index])
+        for c in root.children
+    ]
+    return stats, time.process_time() - start
+
+
+def rolloutTimed(board: Board):
+    # worker task: play a board out once
+    start = time.process_time()
+    played = bytearray(2 * MOVE_COUNT)
+    winner = board.playout(played=played)
+    return winner, played, time.process_time() - start
 
 
 def opponentColor(color: PlayerColor):
     return PlayerColor.RED if color == PlayerColor.BLUE else PlayerColor.BLUE
 
 
-def simulateSpread(state: dict[HexPos, Cell], color: PlayerColor, pos: HexPos,
-                   direction: HexDir):
-    # simulate spread to determine the locations that it can spread to
-    power = state[pos].power
-    new_state = state.copy()
-    # new_state[pos] = Cell(None, 0)
-
-    curr_pos = pos
-    for _ in range(power):
-        curr_pos += direction
-        new_state[curr_pos] = Cell(
-            color, new_state[curr_pos].power)
-
-    return new_state
-
-
 def evalFunction(board: Board):
     opp_color = board.turn  # because now the board will say it's the opponent's turn after we just made a move
     color = opponentColor(opp_color)
@@ -319,13 +486,31 @@ def evalFunction(board: Board):
     # safety - number of pieces and power of safe cells
     safety = 0
     unsafe = board.unsafePositions(opp_color)
-    for cell in player_cells:
-        if cell[POS] not in unsafe:
-            safety += cell[CELL].power
+    for index in player_cells:
+        if not unsafe >> index & 1:
+            safety += board.power(index)
 
-    possible_spread = len(board.unsafePositions(color))
+    possible_spread = board.unsafePositions(color).bit_count()
     # cells that can eat but not be eaten?
 
     if safety == 0:
         return -10000
-    return 0.5 * diff_power - opp_power + diff_num_cells - opp_num_cells + safety
\ No newline at end of file
+    return 0.5 * diff_power - opp_power + diff_num_cells - opp_num_cells + safety
+
+
+def evalBatch(boards: list[Board]):
+    # evalFunction for a list of boards with the same player to move, computed
+    # for all of them at once with numpy; returns an array of scores
+    return evalPlanes(board_planes(boards), opponentColor(boards[0].turn))
+
+
+def evalPlanes(planes, color: PlayerColor):
+    # evalBatch for boards stacked as planes, where color is the player who
+    # just moved
+    f = batch_features(planes, color)
+
+    diff_power = f.player_power - f.opp_power
+    diff_num_cells = f.player_cells - f.opp_cells
+    scores = 0.5 * diff_power - f.opp_power + diff_num_cells - f.opp_cells + f.safety
+    scores = np.where(f.safety == 0, -10000, scores)
+    return np.where(f.opp_power == 0, 10000, scores)
@@ -0,0 +1,298 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from referee.game import Action
+from referee.game.bitboard import action_move, move_action, MOVE_COUNT
+from . import state
+from .state import Board, evalPlanes, TIME_LIMIT, CLOCK_CHECK_INTERVAL, \
+    PROVEN_WIN, PROVEN_LOSS
+import numpy as np
+import time
+
+# A compact store for the search tree, for trees too big to keep as
+# MonteCarloTreeSearchNode objects (each with its own Board and lists). It runs
+# the same search, but a node is a row across a few preallocated numpy
+# columns, under 40 bytes in all:
+#
+#   parent    row of the parent node (-1 for the root)
+#   move      move id of the action leading to the node
+#   visits    number of playouts through the node
+#   wins      number of them won by the player who moved into the node
+#   prior     evalFunction of the node's board, for the selection bonus
+#   amaf_visits, amaf_wins
+#             AMAF statistics of the node's move (see backPropagate in
+#             MonteCarloTreeSearchNode)
+#   proven    PROVEN_WIN or PROVEN_LOSS once the node is solved, else 0
+#   first     row of the first child, or -1 until the node is first expanded
+#   count     number of children (legal moves)
+#   expanded  number of children that have joined the tree
+#
+# When a node is first expanded, rows for all of its children are allocated as
+# one block, ranked best prior first, so its children are the rows first to
+# first + count (the next sibling of a node is the next row) and UCB selection
+# works on slices of the columns. Children then join the tree one per
+# expansion, best first, as the untried actions of a node do. Boards aren't
+# stored at all: each iteration plays the moves on its path from the root on
+# one board, and undoes them once the leaf has been played out.
+
+COLUMNS = [
+    ("parent", np.int32),
+    ("move", np.int16),
+    ("visits", np.int32),
+    ("wins", np.int32),
+    ("prior", np.float64),
+    ("amaf_visits", np.int32),
+    ("amaf_wins", np.int32),
+    ("proven", np.int8),
+    ("first", np.int32),
+    ("count", np.int16),
+    ("expanded", np.int16),
+]
+# Bytes per row, over all the columns (39)
+ROW_BYTES = sum(np.dtype(dtype).itemsize for _, dtype in COLUMNS)
+# Rows allocated at first; the columns double in size when full
+INITIAL_CAPACITY = 1 << 14
+# Most rows the tree may use; once full, leaves aren't expanded. A power of
+# two, so the columns never grow past it: at most 39MB of rows. The peak is
+# twice that, 78MB: descend copies the kept subtree into new columns of the
+# same capacity while the old ones still exist (and _reserve briefly holds
+# both the old and the doubled columns). With the ~100MB the interpreter and
+# NumPy take in an agent subprocess, that stays inside the referee's 250MB
+# space limit, which a tree of 1 << 21 rows (156MB at peak) would not.
+MAX_NODES = 1 << 20
+
+
+class ArrayTree:
+    # The tree of a search from a board, with the interface of its root
+    # MonteCarloTreeSearchNode (bestAction and descend)
+    def __init__(self, board: Board, capacity=INITIAL_CAPACITY):
+        self.board = board.copy()
+        self._allocate(capacity)
+        self._size = 1
+        self._resetRows(0, 1)
+        self.parent[0] = -1
+        self.move[0] = -1
+        self.prior[0] = 0.
+        self.iterations = 0
+
+    def __len__(self):
+        return self._size
+
+    def _allocate(self, capacity):
+        for name, dtype in COLUMNS:
+            setattr(self, name, np.empty(capacity, dtype=dtype))
+
+    def _reserve(self, rows):
+        # make room for more rows, doubling the columns as needed
+        capacity = len(self.parent)
+        if self._size + rows <= capacity:
+            return
+        while self._size + rows > capacity:
+            capacity *= 2
+        for name, _ in COLUMNS:
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def _resetRows(self, start, stop):
+        self.visits[start:stop] = 0
+        self.wins[start:stop] = 0
+        self.amaf_visits[start:stop] = 0
+        self.amaf_wins[start:stop] = 0
+        self.proven[start:stop] = 0
+        self.first[start:stop] = -1
+        self.count[start:stop] = 0
+        self.expanded[start:stop] = 0
+
+    def _expand(self, node):
+        # allocate the children of a node, with the board at the node; False if
+        # the tree is full
+        board = self.board
+        moves = board.legal_moves()
+        if self._size + len(moves) > MAX_NODES:
+            return False
+        scores = evalPlanes(board.childPlanes(moves), board.turn)
+        order = np.argsort(-scores, kind="stable")
+
+        self._reserve(len(moves))
+        start, stop = self._size, self._size + len(moves)
+        self._size = stop
+        self.parent[start:stop] = node
+        self.move[start:stop] = np.array(moves)[order]
+        self.prior[start:stop] = scores[order]
+        self._resetRows(start, stop)
+        self.first[node] = start
+        self.count[node] = len(moves)
+        return True
+
+    def _bestChild(self, node, c_param=0.1):
+        # select the best child according to UCB1, as in
+        # MonteCarloTreeSearchNode.bestChild, over the slice of its children
+        first = self.first[node]
+        children = slice(first, first + self.count[node])
+        n = self.visits[children]
+        rave = state.RAVE_EQUIVALENCE
+        beta = np.sqrt(rave / (3 * n + rave))
+        amaf_n = np.maximum(self.amaf_visits[children], 1)
+        value = (1 - beta) * self.wins[children] / n \
+            + beta * self.amaf_wins[children] / amaf_n
+        weights = value \
+            + c_param * np.sqrt(2 * np.log(self.visits[node]) / n) \
+            + 0.01 * self.prior[children] / (n + 1)
+        weights[self.proven[children] == PROVEN_LOSS] = -np.inf
+        return first + int(np.argmax(weights))
+
+    def _iterate(self):
+        # one iteration of the search: select and expand a leaf, play it out
+        # and backpropagate the result
+        board = self.board
+        node, path = 0, [0]
+        while not board.game_over:
+            if self.first[node] < 0 and not self._expand(node):
+                break
+            expanded = int(self.expanded[node])
+            if expanded < self.count[node]:
+                self.expanded[node] = expanded + 1
+                node = int(self.first[node]) + expanded
+                board.play(int(self.move[node]))
+                path.append(node)
+                break
+            node = self._bestChild(node)
+            board.play(int(self.move[node]))
+            path.append(node)
+
+        played = bytearray(2 * MOVE_COUNT)
+        if board.game_over:
+            result = board.winner_color
+            self._prove(path, result)
+        else:
+            result = board.playout(played=played)
+        for _ in range(len(path) - 1):
+            board.undo()
+        winner = -1 if result is None else result.value
+
+        # the player to move alternates down the path, so the nodes won are
+        # every other one from the first the winner moved into
+        self.visits[path] += 1
+        if result is not None:
+            self.wins[path[(winner - board._turn + 1) & 1::2]] += 1
+
+        # AMAF statistics, from the leaf up
+        flags = np.frombuffer(played, dtype=np.uint8).reshape(2, MOVE_COUNT)
+        for depth in range(len(path) - 1, 0, -1):
+            parent = path[depth - 1]
+            mover = (board._turn + depth - 1) & 1
+            played[mover * MOVE_COUNT + int(self.move[path[depth]])] = 1
+            first = self.first[parent]
+            children = slice(first, first + self.expanded[parent])
+            seen = flags[mover, self.move[children]]
+            self.amaf_visits[children] += seen
+            if winner == mover:
+                self.amaf_wins[children] += seen
+
+    def _prove(self, path, winner):
+        # solve the node at the end of the path, where the game is over, and
+        # propagate the proof up the path (see MonteCarloTreeSearchNode.prove)
+        if winner is None or not state.SOLVER:
+            return
+        depth = len(path) - 1
+        proven = PROVEN_LOSS if winner.value == self.board._turn \
+            else PROVEN_WIN
+        self.proven[path[depth]] = proven
+        while depth > 0:
+            parent = path[depth - 1]
+            if proven == PROVEN_WIN:
+                proven = PROVEN_LOSS
+            else:
+                first, count = self.first[parent], self.count[parent]
+                if self.expanded[parent] < count or not np.all(
+                        self.proven[first:first + count] == PROVEN_LOSS):
+                    return
+                proven = PROVEN_WIN
+            if self.proven[parent] == proven:
+                return
+            self.proven[parent] = proven
+            depth -= 1
+
+    def bestAction(self, time_limit=TIME_LIMIT, pool=None):
+        # search as MonteCarloTreeSearchNode.bestAction does
+        if pool is not None:
+            raise ValueError("parallel search needs MonteCarloTreeSearchNode")
+        start = time.process_time()
+        count = 0
+        while not self.proven[0]:
+            for _ in range(CLOCK_CHECK_INTERVAL):
+                self._iterate()
+                if self.proven[0]:
+                    break
+            count += CLOCK_CHECK_INTERVAL
+            elapsed = time.process_time() - start
+            if elapsed >= time_limit:
+                break
+            if elapsed > 0 and self._decided(
+                    count / elapsed * (time_limit - elapsed)):
+                break
+        # iterations run by the last search, for benchmarks
+        self.iterations = count
+
+        return move_action(int(self.move[self.mostVisitedChild()]))
+
+    def mostVisitedChild(self):
+        # see MonteCarloTreeSearchNode.mostVisitedChild
+        first = self.first[0]
+        children = slice(first, first + self.expanded[0])
+        proven = self.proven[children]
+        rank = 2 * (proven == PROVEN_WIN) + (proven != PROVEN_LOSS)
+        key = (rank.astype(np.int64) << 32) + self.visits[children]
+        return first + int(np.argmax(key))
+
+    def _decided(self, iterations_left):
+        # see MonteCarloTreeSearchNode._decided
+        if self.count[0] == 1:
+            return True
+        first = self.first[0]
+        visits = np.sort(self.visits[first:first + self.expanded[0]])[::-1]
+        runner_up = visits[1] if len(visits) > 1 else 0
+        return visits[0] - runner_up > iterations_left
+
+    def descend(self, action: Action):
+        # re-root the tree at the child for an action, keeping its subtree
+        # (moved to the front of the columns) and dropping the rest
+        move = action_move(action)
+        child = -1
+        first = self.first[0]
+        for i in range(first, first + self.expanded[0]) if first >= 0 else ():
+            if self.move[i] == move:
+                child = i
+        self.board = self.board.playMove(move)
+        old = {name: getattr(self, name) for name, _ in COLUMNS}
+        self._allocate(len(self.parent))
+        self._size = 1
+        if child < 0:
+            self._resetRows(0, 1)
+        else:
+            self._copyRows(old, child, 0, 1)
+        self.parent[0] = -1
+        self.move[0] = -1
+
+        # copy the blocks of children breadth first, pointing each at the new
+        # row of its parent
+        queue = [(child, 0)] if child >= 0 else []
+        for node, row in queue:
+            first = old["first"][node]
+            if first < 0:
+                continue
+            count = int(old["count"][node])
+            start = self._size
+            self._copyRows(old, first, start, count)
+            self._size += count
+            self.parent[start:start + count] = row
+            self.first[row] = start
+            for i in range(old["expanded"][node]):
+                queue.append((first + i, start + i))
+        return self
+
+    def _copyRows(self, old, src, dst, count):
+        for name, _ in COLUMNS:
+            getattr(self, name)[dst:dst + count] = old[name][src:src + count]
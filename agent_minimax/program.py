@@ -4,37 +4,79 @@
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 from referee.game.constants import *
-from .state import Board, Node, alpha_beta_search
+from opening_book import OpeningBook
+from .state import Board, Node, TranspositionTable, MoveOrderer, \
+    alpha_beta_search, iterative_deepening_search
 from random import choice
 from itertools import product
+from time import process_time
+
+# Search depth used when the referee imposes no time limit
+FIXED_DEPTH = 3
+# Deepest iteration the iterative deepening search will attempt
+MAX_DEPTH = 8
+# Number of turns we budget for, and the fewest of our own moves we assume
+# are left, when splitting the remaining time between moves
+EXPECTED_TURNS = 150
+MIN_MOVES_LEFT = 10
+# Seconds of CPU time kept in reserve
+TIME_MARGIN = 2.0
 
 
 class Agent:
     def __init__(self, color: PlayerColor, **referee: dict):
         """
-        Initialise the agent, with a new Board object.
+        Initialise the agent, with a new Board object, an empty transposition
+        table and move orderer, which are kept for the whole game, and the
+        opening book (read on its first lookup).
         """
         self._color = color
         self._board = Board()
+        self._table = TranspositionTable()
+        self._orderer = MoveOrderer()
+        self._book = OpeningBook()
 
     def action(self, **referee: dict) -> Action:
         """
-        Using the current board and taking into account the remaining resources,
-        run an alpha-beta search to determine the next move to take, and return
-        the action.
-        """
-        curr_board = self._board
-        board_copy = self._board.copy()
-        node = Node(curr_board, None, None)
-        depth = 3
-        if referee["time_remaining"] < 80:
-            depth = 2
-        elif referee["time_remaining"] < 20:
-            depth = 1
-        move = alpha_beta_search(node, depth)
-        self._board = board_copy
-        return move
+        Play the book move if the opening book has the current board.
+        Otherwise, taking into account the remaining resources, run an
+        iterative deepening alpha-beta search to determine the next move to
+        take, and return the action.
+        """
+        action = self._book.lookup(self._board)
+        if action is not None:
+            return action
+        # The search plays and undoes moves on our own board in place, leaving
+        # it as it was once it returns.
+        self._table.newSearch()
+        self._orderer.newSearch()
+        time_remaining = referee["time_remaining"]
+        if time_remaining is None:
+            node = Node(self._board, None, None)
+            return alpha_beta_search(
+                node, FIXED_DEPTH, self._table, self._orderer
+            )
+
+        deadline = process_time() + self._moveBudget(time_remaining)
+        node = Node(self._board, None, None, deadline)
+        max_depth = min(MAX_DEPTH, MAX_TURNS - self._board.turn_num)
+        return iterative_deepening_search(
+            node, max_depth, self._table, self._orderer
+        )
 
+    def _moveBudget(self, time_remaining: float) -> float:
+        """
+        _moveBudget splits the remaining CPU time evenly over the moves we still
+        expect to make (at least MIN_MOVES_LEFT, unless the turn limit is
+        closer), keeping a safety margin in reserve.
+        """
+        turns_left = MAX_TURNS - self._board.turn_num
+        moves_left = min(
+            (turns_left + 1) // 2,
+            max(MIN_MOVES_LEFT, (EXPECTED_TURNS - self._board.turn_num) // 2)
+        )
+        spare = max(0, time_remaining - TIME_MARGIN)
+        return spare / max(1, moves_left)
 
     def turn(self, color: PlayerColor, action: Action, **referee: dict):
         """
@@ -2,181 +2,227 @@
 # Project Part B: Game Playing Agent
 
 from referee.game import \
-    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
+    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir, \
+    AttackBoard
+from referee.game.bitboard import \
+    cell_index, dir_index, action_move, move_action, iter_bits, MOVE_COUNT, \
+    FULL_MASK
+from referee.game.rays import CELL_COUNT, SPREAD_MASKS
+from referee.game.attacks import ATTACK_PLANES
 from referee.game.constants import *
-from collections import defaultdict
-from itertools import product
+from array import array
+import time
 
 # CONSTANTS
 INFINITY = float('inf')
 WIN = 10000
 LOSS = -10000
-# Index for dictionary items
-POS = 0
-CELL = 1
-# List of the HexPos of valid cells
-CELLS = [HexPos(r, q) for (r, q) in list(product(list(range(7)), list(range(7))))]
-
-
-class Cell:
+# Transposition table entry types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+TT_SIZE_MB = 32
+# The clock is checked once every this many nodes (must be a power of 2)
+CLOCK_CHECK_INTERVAL = 256
+# Move ordering: killer moves kept per ply, and the bonuses which place killer
+# moves before, and spawns after, the other non-capturing spreads
+NUM_KILLERS = 2
+KILLER_BONUS = 1 << 48
+SPREAD_BONUS = 1 << 40
+# Number of bit planes needed for a cell's power
+POWER_PLANES = MAX_CELL_POWER.bit_length()
+
+
+class Board(AttackBoard):
     """
-    The Cell class has two attributes: a color and a power. It is NOT
-    associated with a HexPos by nature, but will be used in the board state
-    dictionary as the values, while the HexPos will be the keys. Color will
-    be a PlayerColor object, or None to represent an empty cell. Power will
-    range from 0 to 6.
+    The Board class represents a board at a given time in the game. It is a
+    thin layer over the referee's BitBoard engine, which stores the pieces on
+    the board as one bitmask per color plus the power of each cell (indexed by
+    r * 7 + q). Turn tells us who's turn it is to play, while turn_num is the
+    turn number. Therefore, if turn is RED, then the board will be a
+    representation of the board before RED has played.
+
+    On top of the engine, the board keeps the aggregates needed by the
+    evaluation function up to date as moves are played and undone, so that
+    evaluating a leaf doesn't need to scan the board. The AttackBoard keeps the
+    mask of cells each color can spread onto, and _planes holds the bit planes
+    of every cell's power (plane b is the mask of cells with bit b of their
+    power set). A move flips the power bits of the cells it changed, and undo
+    flips them back.
     """
+    __slots__ = ["_planes"]
 
-    def __init__(self, color: PlayerColor | None = None, power: int = 0):
-        self.color = color
-        self.power = power
+    def __init__(self):
+        super().__init__()
+        self._planes = [0] * POWER_PLANES
 
     def __repr__(self):
-        return f"{self.color, self.power}"
+        return f"{self.turn_num, self.turn}"
 
+    @property
+    def turn(self) -> PlayerColor:
+        return self.turn_color
 
-class Board:
-    """
-    The Board class represents a board at a given time in the game. It has 3
-    attributes: state, turn and turn_num. The state is a dictionary and
-    provides the details of the pieces on the board. Turn tells us who's
-    turn it is to play, while turn_num is the turn number. Therefore, if
-    turn is RED, then the state will be a representation of the board before
-    RED has played.
-    """
+    @property
+    def turn_num(self) -> int:
+        return self.turn_count
+
+    def copy(self):
+        """
+        copy returns a copy of the board and its aggregates, without history.
+        """
+        other = super().copy()
+        other._planes = self._planes[:]
+        return other
 
-    def __init__(self, initial_state: dict[HexPos, Cell] = {},
-                 turn: PlayerColor = PlayerColor.RED,
-                 turn_num: int = 0):
-        self.state: dict[HexPos, Cell] = \
-            defaultdict(lambda: Cell(None, 0))
-        self.state.update(initial_state)
-        self.turn = turn
-        self.turn_num = turn_num
+    def place(self, index: int, color: PlayerColor | None, power: int):
+        """
+        place sets the contents of a cell directly (see BitBoard.place).
+        """
+        super().place(index, color, power)
+        self._rebuildPlanes()
 
-    def __repr__(self):
-        return f"{self.state, self.turn_num, self.turn}"
+    def spawn(self, index: int):
+        """
+        spawn plays a spawn on the given cell, updating the aggregates.
+        """
+        super().spawn(index)
+        self._flipPlanes()
 
-    def copy(self):
+    def spread(self, index: int, direction: int):
+        """
+        spread plays a spread from the given cell, updating the aggregates.
+        """
+        super().spread(index, direction)
+        self._flipPlanes()
+
+    def undo(self):
+        """
+        undo undoes the last move, restoring the aggregates from before it.
+        """
+        self._flipPlanes()
+        super().undo()
+
+    def _rebuildPlanes(self):
+        """
+        _rebuildPlanes computes the aggregates from scratch.
+        """
+        planes = self._planes = [0] * POWER_PLANES
+        for index in iter_bits(self._masks[0] | self._masks[1]):
+            power = self._powers[index]
+            for b in range(POWER_PLANES):
+                if power >> b & 1:
+                    planes[b] |= 1 << index
+
+    def _flipPlanes(self):
+        """
+        _flipPlanes flips the power bits of the cells changed by the last move
+        (as recorded for the engine's undo) between their powers before and
+        after it, which both applies and reverts the move's effect.
+        """
+        planes = self._planes
+        powers = self._powers
+        for index, old in self._history[-1][-1]:
+            flipped = old ^ powers[index]
+            if flipped & 1:
+                planes[0] ^= 1 << index
+            if flipped & 2:
+                planes[1] ^= 1 << index
+            if flipped & 4:
+                planes[2] ^= 1 << index
+
+    def maskPower(self, mask: int):
+        """
+        maskPower returns the total power of the cells in a mask.
         """
-        The copy function allows for the copying of a Board object, preventing
-        any undesired overwriting.
+        planes = self._planes
+        return (mask & planes[0]).bit_count() \
+            + 2 * (mask & planes[1]).bit_count() \
+            + 4 * (mask & planes[2]).bit_count()
+
+    def powerMask(self, power: int):
+        """
+        powerMask returns the mask of cells (of either color) with the given
+        power.
         """
-        turn = self.turn
-        turn_num = self.turn_num
-        return Board(self.state.copy(), turn, turn_num)
+        mask = FULL_MASK
+        for b in range(POWER_PLANES):
+            plane = self._planes[b]
+            mask &= plane if power >> b & 1 else ~plane
+        return mask
+
+    def colorNumCells(self, color: PlayerColor):
+        """
+        colorNumCells returns the number of cells controlled by color.
+        """
+        return self.color_mask(color).bit_count()
 
     def totalCombPower(self):
         """
-        totalCombPower calculates the total power that is on the board.
+        totalCombPower returns the total power that is on the board.
         """
-        total = 0
-        for cell in self.state.values():
-            total += cell.power
-        return total
+        return self.total_power
 
     def colorPower(self, color: PlayerColor):
         """
         colorPower takes in a color variable and returns the total power for
         that color.
         """
-        total = 0
-        for cell in self.state.values():
-            if cell.color == color:
-                total += cell.power
-        return total
+        return self.color_power(color)
 
     def boardInfo(self, color: PlayerColor):
         """
-        boardInfo takes in a color variable, and using just one iteration,
-        calculates all of the required data from the board's pieces for the
-        evaluation function. This is the player's and opponent's power and total
-        cells, as well as a list of the player's cells.
-        """
-        playerPower = 0
-        oppPower = 0
-        playerNumCells = 0
-        oppNumCells = 0
-        playerCells = []
-        for item in self.state.items():
-            if item[CELL].color == color:
-                playerPower += item[CELL].power
-                playerNumCells += 1
-                playerCells.append(item)
-            elif item[CELL].color == opponentColor(color):
-                oppPower += item[CELL].power
-                oppNumCells += 1
-        return [playerPower, oppPower, playerNumCells, oppNumCells, playerCells]
-
-    def colorCells(self, color: PlayerColor):
-        """
-        colorCells takes in a color variable, and returns a list of the pieces
-        on the board that are of the correct color.
-        """
-        curr_state = self.state
-        cells = []
-        for item in curr_state.items():
-            if item[CELL].color == color:
-                cells.append(item)
-        return cells
+        boardInfo takes in a color variable, and returns all of the required
+        data from the board's pieces for the evaluation function. This is the
+        player's and opponent's power and total cells, as well as the total
+        power of the player's cells which the opponent can't spread onto. It
+        only reads the board's aggregates.
+        """
+        c = color.value
+        player_mask = self._masks[c]
+        opp_mask = self._masks[1 - c]
+        start = (1 - c) * ATTACK_PLANES
+        opp_reach = 0
+        for plane in self._attacks[start:start + ATTACK_PLANES]:
+            opp_reach |= plane
+        return [self._color_power[c], self._color_power[1 - c],
+                player_mask.bit_count(), opp_mask.bit_count(),
+                self.maskPower(player_mask & ~opp_reach)]
 
     def unsafePositions(self, color: PlayerColor):
         """
         unsafePositions takes in a color variable, which represents the player's
-        color. It returns a list of positions that the opponent can potentially
-        spread onto.
-        """
-        curr_state = self.state.copy()
-        opp_cells = self.colorCells(color)
-        for cell in opp_cells:
-            pos = cell[POS]
-            for dir in [HexDir.Down, HexDir.DownRight, HexDir.DownLeft,
-                        HexDir.Up, HexDir.UpRight, HexDir.UpLeft]:
-                simulateSpread(curr_state, color, pos, dir)
-        return [x[POS] for x in curr_state.items() if x[CELL].color == color]
+        color. It returns a mask of the positions that the player either
+        occupies or can potentially spread onto.
+        """
+        return self.color_mask(color) | self.reach_mask(color)
+
+    def takeablePositions(self, color: PlayerColor):
+        """
+        takeablePositions takes in a color variable, and returns a mask of the
+        opponent's cells that a spread by color onto them would take, i.e.
+        those with less than the maximum power (as in isPieceTaken of the mcts
+        agent).
+        """
+        return self.color_mask(opponentColor(color)) \
+            & ~self.powerMask(MAX_CELL_POWER)
 
     def updateSpawn(self, color: PlayerColor, pos: HexPos):
         """
         updateSpawn updates the Board object such that the resulting board
         accounts for the spawning of a cell with color 'color' and position
-        'pos'. Since an action was taken, we also need to switch turn to the
-        other color, and increment turn_num by 1.
+        'pos'. The engine always plays for whoever's turn it is, so color must
+        equal board.turn. The turn is then passed to the other color.
         """
-        cell = Cell(color, 1)
-        self.updatePlayer()
-        self.turn_num += 1
-        self.state[pos] = cell
+        self.spawn(cell_index(pos))
 
     def updateSpread(self, color: PlayerColor, pos: HexPos, direction: HexDir):
         """
         updateSpread updates the Board object such that the resulting board
         accounts for the spread of a cell with color 'color', position 'pos' and
-        direction 'direction. Since an action was taken, we also need to switch
-        turn to the other color, and increment turn_num by 1.
-        """
-        power = self.state[pos].power
-        self.state[pos] = Cell(None, 0)
-
-        curr_pos = pos
-        for _ in range(power):
-            curr_pos += direction
-            if self.state[curr_pos].power == MAX_CELL_POWER:
-                self.state[curr_pos] = Cell(None, 0)
-                continue
-            else:
-                self.state[curr_pos] = Cell(
-                    color, self.state[curr_pos].power + 1)
-        self.updatePlayer()
-        self.turn_num += 1
-
-    def updatePlayer(self):
+        direction 'direction'. As with updateSpawn, color must equal board.turn.
         """
-        updatePlayer updates the turn attribute to switch to the other player.
-        """
-        if self.turn == PlayerColor.RED:
-            self.turn = PlayerColor.BLUE
-        else:
-            self.turn = PlayerColor.RED
+        self.spread(cell_index(pos), dir_index(direction))
 
     def getLegalActions(self):
         """
@@ -184,62 +230,32 @@ class Board:
         state. This is determined for whoever's turn it is, i.e. player's color
         = board.turn
         """
-        if self.totalCombPower() >= MAX_TOTAL_POWER:
-            spawn_actions = []
-        else:
-            spawn_cells = list(
-                filter(lambda key: self.state[key].color is None, CELLS))
-            spawn_actions = [SpawnAction(x) for x in spawn_cells]
-
-        spread_cells = list(
-            filter(lambda key: self.state[key].color == self.turn, CELLS))
-        spread_dir = [HexDir.Down, HexDir.DownRight, HexDir.DownLeft,
-                      HexDir.Up, HexDir.UpRight, HexDir.UpLeft]
-        spread_actions = [SpreadAction(x, y) for (x, y) in
-                          list(product(spread_cells, spread_dir))]
-
-        return [x for x in spread_actions + spawn_actions]
+        return self.legal_actions()
 
     def move(self, action: Action):
         """
         move takes an action and updates the board accordingly.
         """
-        match action:
-            case SpawnAction(cell):
-                self.updateSpawn(self.turn, cell)
-            case SpreadAction(cell, dir):
-                self.updateSpread(self.turn, cell, dir)
+        self.play(action_move(action))
 
     def isGameOver(self):
         """
         isGameOver checks whether the game is over, either by max turns, or a
-        player win. This code was taken from board.py in the referee module.
+        player win.
         """
-        # Game can't be over within the first two turns.
-        if self.turn_num < 2:
-            return False
-
-        return any([
-            self.turn_num >= MAX_TURNS,
-            self.colorPower(PlayerColor.RED) == 0,
-            self.colorPower(PlayerColor.BLUE) == 0
-        ])
+        return self.game_over
 
     def gameResult(self) -> PlayerColor | None:
         """
-        The player (color) who won the game, or None if no player has won. This
-        function was taken from board.py in the referee module.
+        The player (color) who won the game, or None if no player has won.
         """
-        if not self.isGameOver():
-            return None
+        return self.winner_color
 
-        red_power = self.colorPower(PlayerColor.RED)
-        blue_power = self.colorPower(PlayerColor.BLUE)
 
-        if abs(red_power - blue_power) < WIN_POWER_DIFF:
-            return None
-
-        return (PlayerColor.RED, PlayerColor.BLUE)[red_power < blue_power]
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the node's deadline has passed.
+    """
 
 
 class Node:
@@ -247,28 +263,33 @@ class Node:
     The Node class is defined to be the node in the minimax algorithm. It has
     three attributes: board, parent and parent_action. The board is the Board
     object at the node, and parent is the Board object that board came from.
-    parent_action is the action taken to go from parent to board.
+    parent_action is the action taken to go from parent to board. A search from
+    the node may also be given a deadline (in process CPU time), and records
+    the number of nodes visited, the value found and the depth completed.
     """
 
-    def __init__(self, board, parent=None, parent_action=None):
+    def __init__(self, board, parent=None, parent_action=None, deadline=None):
         self.board = board
         self.parent = parent
         self.parent_action = parent_action
+        self.deadline = deadline
+        self.nodes = 0
+        self.value = None
+        self.depth = 0
 
-    def __repr__(self) -> str:
-        return f"{self.parent_action}"
-
-    def copy(self):
+    def checkClock(self):
         """
-        The copy function allows for the copying of a Node object, preventing
-        any undesired overwriting.
+        checkClock counts a visited node, and every CLOCK_CHECK_INTERVAL nodes
+        raises SearchTimeout if the deadline has passed.
         """
-        board = self.board.copy()
-        if self.parent is None:
-            parent = None
-        else:
-            parent = self.parent.copy()
-        return Node(board, parent, self.parent_action)
+        self.nodes += 1
+        if self.deadline is not None \
+                and not self.nodes & (CLOCK_CHECK_INTERVAL - 1) \
+                and time.process_time() > self.deadline:
+            raise SearchTimeout()
+
+    def __repr__(self) -> str:
+        return f"{self.parent_action}"
 
     def getChildren(self):
         """
@@ -281,7 +302,8 @@ class Node:
             return children
         actions = self.board.getLegalActions()
         for action in actions:
-            next_board = self.board.move(action)
+            next_board = self.board.copy()
+            next_board.move(action)
             child_node = Node(next_board, parent=self, parent_action=action)
             children.append(child_node)
         return children
@@ -311,19 +333,13 @@ class Node:
             else:
                 return 0
 
+        # safety - total power of safe cells
         [player_power, opp_power, player_num_cells,
-         opp_num_cells, player_cells] = self.board.boardInfo(color)
+         opp_num_cells, safety] = self.board.boardInfo(color)
 
         diff_power = player_power - opp_power
         diff_num_cells = player_num_cells - opp_num_cells
 
-        # safety - total power of safe cells
-        safety = 0
-        unsafe = self.board.unsafePositions(opp_color)
-        for cell in player_cells:
-            if cell[POS] not in unsafe:
-                safety += cell[CELL].power
-
         if diff_num_cells > 0:
             safety_weight = 1 - diff_num_cells / player_num_cells
         else:
@@ -336,60 +352,284 @@ class Node:
         return 0.5 * diff_power - opp_power + diff_num_cells - opp_num_cells + safety_weight * safety
 
 
-def opponentColor(color: PlayerColor):
+class TranspositionTable:
     """
-    opponentColor takes a PlayerColor argument, and returns the other color.
+    The TranspositionTable class remembers the results of previous searches,
+    keyed on the Zobrist hash of the board, so that positions reached by a
+    different move order (or searched on a previous turn) are not searched
+    again. It has a fixed size of size_mb megabytes, with each hash mapping to a
+    single slot. An entry stores the value found, the depth it was searched to,
+    whether the value is EXACT or only a LOWER/UPPER bound (because of pruning),
+    and the best move. A slot is only overwritten by a search at least as deep,
+    unless its entry is from an earlier turn. The key doesn't cover the turn
+    number, so a value is only stored, and only used, when the search below the
+    position ends before MAX_TURNS (otherwise the same cells may be a draw at one
+    turn and not at another); near the turn limit only the best move is kept.
     """
-    return PlayerColor.RED if color == PlayerColor.BLUE else PlayerColor.BLUE
+    # Bytes per entry: key, value, depth, type, move, age
+    ENTRY_BYTES = 8 + 8 + 1 + 1 + 2 + 1
+
+    def __init__(self, size_mb: float = TT_SIZE_MB):
+        num_entries = max(1, int(size_mb * 2 ** 20) // self.ENTRY_BYTES)
+        size = 1 << (num_entries.bit_length() - 1)
+        self.mask = size - 1
+        self.keys = array('q', bytes(8 * size))
+        self.values = array('d', bytes(8 * size))
+        self.depths = array('b', [-1]) * size
+        self.types = array('b', bytes(size))
+        self.moves = array('h', [-1]) * size
+        self.ages = array('B', bytes(size))
+        self.age = 0
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self):
+        return self.mask + 1
+
+    def newSearch(self):
+        """
+        newSearch marks the start of a new search (i.e. a new turn), so that
+        entries from earlier searches can be replaced.
+        """
+        self.age = (self.age + 1) & 0xFF
+
+    def probe(self, key, depth, alpha, beta, turn_count):
+        """
+        probe returns the stored value for the position with the given key, at
+        the given turn, if it was searched at least depth deep (without
+        reaching MAX_TURNS from this turn) and the value can be used with the
+        current alpha and beta. Otherwise it returns None.
+        """
+        self.probes += 1
+        i = key & self.mask
+        if self.keys[i] != key or self.depths[i] < depth \
+                or turn_count + self.depths[i] >= MAX_TURNS:
+            return None
+        value = self.values[i]
+        entry_type = self.types[i]
+        if entry_type == EXACT or (entry_type == LOWER and value >= beta) \
+                or (entry_type == UPPER and value <= alpha):
+            self.hits += 1
+            return value
+        return None
 
+    def bestMove(self, key):
+        """
+        bestMove returns the best move stored for the position with the given
+        key, or None if there isn't one.
+        """
+        i = key & self.mask
+        if self.keys[i] != key or self.moves[i] < 0:
+            return None
+        return self.moves[i]
 
-def simulateSpread(state: dict[HexPos, Cell], color: PlayerColor, pos: HexPos,
-                   direction: HexDir):
+    def store(self, key, depth, value, entry_type, move, turn_count):
+        """
+        store records the result of searching the position with the given key,
+        at the given turn, unless the slot holds a deeper search from this
+        turn. If the search reached MAX_TURNS, only the move is recorded.
+        """
+        if turn_count + depth >= MAX_TURNS:
+            depth = -1
+        i = key & self.mask
+        if self.ages[i] == self.age and self.depths[i] > depth:
+            return
+        self.keys[i] = key
+        self.values[i] = value
+        self.depths[i] = depth
+        self.types[i] = entry_type
+        self.moves[i] = -1 if move is None else move
+        self.ages[i] = self.age
+
+
+class MoveOrderer:
     """
-    simulateSpread is similar to updateSpread in that it will be determining
-    a board after a spread move. However, only the positions spreaded onto
-    are important, and hence it is a more relaxed function.
+    The MoveOrderer class decides the order in which the search tries the
+    legal moves of a position, so that the best move tends to come first and
+    alpha-beta prunes as much as possible. The move from the transposition
+    table (the principal variation move of the previous iteration) is tried
+    first, then spreads which take opponent cells (most cells taken first),
+    then the killer moves of the ply (quiet moves which recently caused a
+    cutoff at the same turn number), then the other spreads and finally the
+    spawns, each by their history score. The history score of a move grows by
+    depth * depth every time it causes a cutoff.
     """
-    power = state[pos].power
 
-    curr_pos = pos
-    for _ in range(power):
-        curr_pos += direction
-        state[curr_pos] = Cell(
-            color, state[curr_pos].power)
+    def __init__(self):
+        self.killers = [[None] * NUM_KILLERS for _ in range(MAX_TURNS + 1)]
+        self.history = [[0] * MOVE_COUNT for _ in PlayerColor]
+
+    def newSearch(self):
+        """
+        newSearch marks the start of a new search (i.e. a new turn), so that
+        the history scores from earlier turns count for less.
+        """
+        for scores in self.history:
+            for move in range(MOVE_COUNT):
+                scores[move] >>= 1
+
+    def orderMoves(self, board, first=None):
+        """
+        orderMoves returns the legal moves of the board in the order they
+        should be searched. first is a move to try before all others, if legal.
+        """
+        color = board.turn
+        takeable = board.takeablePositions(color)
+        history = self.history[color.value]
+        killers = self.killers[board.turn_num]
+        num_dirs = len(HexDir)
+
+        captures = []
+        quiet = []
+        for index in iter_bits(board.color_mask(color)):
+            rays = SPREAD_MASKS[index]
+            power = board.power(index)
+            move = CELL_COUNT + index * num_dirs
+            for d in range(num_dirs):
+                taken = rays[d][power] & takeable
+                if taken:
+                    captures.append((taken.bit_count(), move + d))
+                else:
+                    quiet.append(move + d)
+        if board.totalCombPower() < MAX_TOTAL_POWER:
+            quiet.extend(iter_bits(board.empty_mask))
+
+        captures.sort(reverse=True)
+        quiet.sort(reverse=True, key=lambda move:
+                   history[move]
+                   + (KILLER_BONUS if move in killers else 0)
+                   + (SPREAD_BONUS if move >= CELL_COUNT else 0))
+        moves = [move for _, move in captures]
+        moves.extend(quiet)
+
+        if first is not None and first in moves and first != moves[0]:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def cutoff(self, board, move, depth):
+        """
+        cutoff records that move caused a cutoff when searched depth deep from
+        the board. Moves which take opponent cells are already tried early, so
+        only quiet moves are recorded.
+        """
+        if move >= CELL_COUNT:
+            index, d = divmod(move - CELL_COUNT, len(HexDir))
+            rays = SPREAD_MASKS[index][d]
+            if rays[board.power(index)] & board.takeablePositions(board.turn):
+                return
+        killers = self.killers[board.turn_num]
+        if move not in killers:
+            killers.pop()
+            killers.insert(0, move)
+        self.history[board.turn.value][move] += depth * depth
+
+
+def opponentColor(color: PlayerColor):
+    """
+    opponentColor takes a PlayerColor argument, and returns the other color.
+    """
+    return PlayerColor.RED if color == PlayerColor.BLUE else PlayerColor.BLUE
 
 
 # The following alpha beta code (functions alpha_beta_search, max_value and
 # min_value) was adapted from this blog:
 # https://tonypoer.io/2016/10/28/implementing-minimax-and-alpha-beta-pruning-using-python/
-def alpha_beta_search(node, depth):
+#
+# The search works on a single board in place: each move is played on the
+# node's board and undone again once its subtree has been searched, so only the
+# board's small undo record is allocated per ply. The board is always restored
+# to its original position before these functions return. If a transposition
+# table is given, max_value and min_value consult it before searching (or
+# evaluating) a position, and record their result in it afterwards. Most
+# transpositions occur at the leaves, where our two moves commute. If a
+# MoveOrderer is given, the moves of each position are searched in its order
+# (starting from the table's best move), and it is told of every cutoff.
+def alpha_beta_search(node, depth, table=None, orderer=None):
     """
     alpha_beta_search is the starting function of the minimax algorithm, with
     alpha beta pruning. The recursion occurs in max_value and min_value. This
     function only ever runs for our player, and hence the first step is always a
     maximising player's move. It takes a node and a depth as arguments. The node
     is the root node, which represents the current board, while depth is how
-    deep we want the minimax search to be.
+    deep we want the minimax search to be. table is an optional
+    TranspositionTable and orderer an optional MoveOrderer, to share between
+    searches.
     """
     best_val = -INFINITY
     beta = INFINITY
 
-    start_node = node.copy()
-    moves = node.board.getLegalActions()
+    board = node.board
+    moves = orderedMoves(board, table, orderer)
     best_move = None
     for move in moves:
-        node.board.move(move)
-        value = min_value(node, best_val, beta, depth - 1)
+        board.play(move)
+        value = min_value(node, best_val, beta, depth - 1, table, orderer)
+        board.undo()
         if value == WIN:
-            return move
+            best_val = value
+            best_move = move
+            break
         elif value > best_val:
             best_val = value
             best_move = move
-        node = start_node.copy()
+    node.value = best_val
+    if table is not None and best_move is not None:
+        # Remember the best move, to be tried first by the next iteration
+        table.store(board.zobrist_key, depth, best_val, EXACT, best_move,
+                    board.turn_count)
+    return move_action(best_move) if best_move is not None else None
+
+
+def orderedMoves(board, table=None, orderer=None):
+    """
+    orderedMoves returns the legal moves of the board in the order they should
+    be searched, using the orderer and the table's best move if given.
+    """
+    if orderer is None:
+        return board.legal_moves()
+    first = table.bestMove(board.zobrist_key) if table is not None else None
+    return orderer.orderMoves(board, first)
+
+
+def iterative_deepening_search(node, max_depth, table=None, orderer=None):
+    """
+    iterative_deepening_search runs alpha_beta_search at depth 1, 2, 3, ... up
+    to max_depth, until node.deadline passes. An unfinished search is abandoned
+    (restoring the board), and the move from the deepest completed search is
+    returned, with that depth recorded on node.depth. Depth 1 is always
+    completed, so a move is always returned if one exists. It stops early once
+    a win is found, or once half of the time up to the deadline has been used.
+    """
+    board = node.board
+    turn_count = board.turn_count
+    deadline = node.deadline
+    start = time.process_time()
+    best_move = None
+
+    for depth in range(1, max_depth + 1):
+        # The first iteration always runs to completion
+        node.deadline = deadline if depth > 1 else None
+        try:
+            best_move = alpha_beta_search(node, depth, table, orderer)
+            node.depth = depth
+        except SearchTimeout:
+            while board.turn_count > turn_count:
+                board.undo()
+            break
+        finally:
+            node.deadline = deadline
+        if node.value == WIN:
+            break
+        # The next iteration would take several times as long as this one, so
+        # don't start it once half the time is gone
+        if deadline is not None and \
+                time.process_time() - start > (deadline - start) / 2:
+            break
     return best_move
 
 
-def max_value(node, alpha, beta, depth):
+def max_value(node, alpha, beta, depth, table=None, orderer=None):
     """
     max_value takes a node, an alpha and beta value as well as a depth. If the
     depth is 0 or the game is over, return the evaluation score. Otherwise,
@@ -397,24 +637,50 @@ def max_value(node, alpha, beta, depth):
     greater than beta, we can prune the rest of the nodes immediately.
     This function is for the maximising player.
     """
-    if depth <= 0 or node.board.isGameOver():
-        return node.eval(True)
+    board = node.board
+    node.checkClock()
+    if table is None:
+        if depth <= 0 or board.isGameOver():
+            return node.eval(True)
+    else:
+        key = board.zobrist_key
+        turn_count = board.turn_count
+        stored = table.probe(key, depth, alpha, beta, turn_count)
+        if stored is not None:
+            return stored
+        if depth <= 0 or board.isGameOver():
+            value = node.eval(True)
+            table.store(key, depth, value, EXACT, None, turn_count)
+            return value
+    alpha_orig = alpha
     value = -INFINITY
+    best_move = None
 
-    start_node = node.copy()
-    moves = node.board.getLegalActions()
-    for move in moves:
-        node.board.move(move)
-        value = max(value, min_value(node, alpha, beta, depth - 1))
+    for move in orderedMoves(board, table, orderer):
+        board.play(move)
+        child_value = min_value(node, alpha, beta, depth - 1, table, orderer)
+        board.undo()
+        if child_value > value:
+            value = child_value
+            best_move = move
         if value >= beta:
-            node = start_node.copy()
-            return value
+            if orderer is not None:
+                orderer.cutoff(board, move, depth)
+            break
         alpha = max(alpha, value)
-        node = start_node.copy()
+
+    if table is not None:
+        if value >= beta:
+            entry_type = LOWER
+        elif value <= alpha_orig:
+            entry_type = UPPER
+        else:
+            entry_type = EXACT
+        table.store(key, depth, value, entry_type, best_move, turn_count)
     return value
 
 
-def min_value(node, alpha, beta, depth):
+def min_value(node, alpha, beta, depth, table=None, orderer=None):
     """
     min_value takes a node, an alpha and beta value as well as a depth. If the
     depth is 0 or the game is over, return the evaluation score. Otherwise,
@@ -422,18 +688,44 @@ def min_value(node, alpha, beta, depth):
     less than alpha, we can prune the rest of the nodes immediately.
     This function is for the minimising player.
     """
-    if depth <= 0 or node.board.isGameOver():
-        return node.eval(False)
+    board = node.board
+    node.checkClock()
+    if table is None:
+        if depth <= 0 or board.isGameOver():
+            return node.eval(False)
+    else:
+        key = board.zobrist_key
+        turn_count = board.turn_count
+        stored = table.probe(key, depth, alpha, beta, turn_count)
+        if stored is not None:
+            return stored
+        if depth <= 0 or board.isGameOver():
+            value = node.eval(False)
+            table.store(key, depth, value, EXACT, None, turn_count)
+            return value
+    beta_orig = beta
     value = INFINITY
+    best_move = None
 
-    start_node = node.copy()
-    moves = node.board.getLegalActions()
-    for move in moves:
-        node.board.move(move)
-        value = min(value, max_value(node, alpha, beta, depth - 1))
+    for move in orderedMoves(board, table, orderer):
+        board.play(move)
+        child_value = max_value(node, alpha, beta, depth - 1, table, orderer)
+        board.undo()
+        if child_value < value:
+            value = child_value
+            best_move = move
         if value <= alpha:
-            node = start_node.copy()
-            return value
+            if orderer is not None:
+                orderer.cutoff(board, move, depth)
+            break
         beta = min(beta, value)
-        node = start_node.copy()
+
+    if table is not None:
+        if value <= alpha:
+            entry_type = UPPER
+        elif value >= beta_orig:
+            entry_type = LOWER
+        else:
+            entry_type = EXACT
+        table.store(key, depth, value, entry_type, best_move, turn_count)
     return value
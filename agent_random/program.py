@@ -4,9 +4,9 @@
 from referee.game import \
     PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir
 from referee.game.constants import *
+from referee.game.bitboard import cell_pos
 from .state import Board
 from random import choice
-from itertools import product
 
 
 # This is the entry point for your game playing agent. Currently the agent
@@ -32,10 +32,8 @@ class Agent:
         """
         Return the next action to take.
         """
-        curr_state = self._board.state
         turn_num = self._board.turn_num
-        spread_pieces = \
-            [key for key in curr_state if curr_state[key].color == self._color]
+        spread_pieces = self._board.colorCells(self._color)
         if turn_num < 2 or spread_pieces == []:
             move_type = 0
         elif self._board.totalCombPower() == MAX_TOTAL_POWER:
@@ -45,18 +43,13 @@ class Agent:
 
         if move_type:
             # spread
-            spread_loc = choice(spread_pieces)
+            spread_loc = cell_pos(choice(spread_pieces))
             spread_dir = choice([HexDir.Down, HexDir.DownRight, HexDir.DownLeft, 
                                 HexDir.Up, HexDir.UpRight, HexDir.UpLeft])
             return SpreadAction(spread_loc, spread_dir)
         else:
             # spawn
-            r = list(range(7))
-            q = list(range(7))
-            locs = list(product(r, q))
-            locs = [HexPos(r, q) for (r,q) in locs]
-            locs = list(filter(lambda key: curr_state[key].color == None, locs))
-            spawn_loc = choice(locs)
+            spawn_loc = cell_pos(choice(self._board.emptyCells()))
             return SpawnAction(spawn_loc)
 
     def turn(self, color: PlayerColor, action: Action, **referee: dict):
@@ -72,7 +65,4 @@ class Agent:
             case SpreadAction(cell, direction):
                 self._board.updateSpread(color, cell, direction)
                 # print(f"Testing: {color} SPREAD from {cell}, {direction}")
-                pass
-        
-        self._board.turn_num += 1
-        self._board.updatePlayer()
\ No newline at end of file
+                pass
\ No newline at end of file
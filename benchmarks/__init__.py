@@ -0,0 +1,7 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Micro-benchmarks for the board engine and the agents. Each module can be run
+# directly from the repository root, e.g.
+#
+#   python -m benchmarks.board
@@ -0,0 +1,69 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures the batched NumPy evaluator of agent_mcts (evalBatch) against
+# evaluating one board at a time (evalFunction), over the children of positions
+# sampled from random games, grouped by the number of children.
+
+import random
+import sys
+import time
+
+from agent_mcts.state import Board, evalFunction, evalBatch
+
+GAMES = 30
+SAMPLE_RATE = 0.2
+BATCH_SIZES = [(1, 20), (20, 50), (50, 100), (100, 400)]
+
+
+def child_batches(games: int, seed: int = 0) -> list[list[Board]]:
+    """
+    Return the children of positions sampled from random (spread-biased) games.
+    """
+    rng = random.Random(seed)
+    batches = []
+    for _ in range(games):
+        board = Board()
+        while not board.game_over:
+            legal = board.legal_moves()
+            spreads = [m for m in legal if m >= 49]
+            board.play(rng.choice(spreads if spreads and rng.random() < 0.6
+                                  else legal))
+            if not board.game_over and rng.random() < SAMPLE_RATE:
+                batches.append(
+                    [board.move(a) for a in board.getLegalActions()]
+                )
+    return batches
+
+
+def bench_mcts(games: int):
+    batches = child_batches(games)
+    for low, high in BATCH_SIZES:
+        selected = [b for b in batches if low <= len(b) < high]
+        if not selected:
+            continue
+        count = sum(map(len, selected))
+
+        start = time.perf_counter()
+        for boards in selected:
+            [evalFunction(board) for board in boards]
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for boards in selected:
+            evalBatch(boards)
+        batched = time.perf_counter() - start
+
+        print(f"mcts children {low:>3}-{high:<3}: "
+              f"evalFunction {count / scalar:>9,.0f}/s, "
+              f"evalBatch {count / batched:>9,.0f}/s "
+              f"(x{scalar / batched:.1f})")
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    bench_mcts(games)
+
+
+if __name__ == "__main__":
+    main()
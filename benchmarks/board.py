@@ -0,0 +1,129 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures moves per second through the referee Board, the agents' Boards and
+# the BitBoard engine they share, replaying the same set of random games. Also
+# compares computing the attack map from scratch with keeping it incrementally.
+
+import random
+import time
+
+from referee.game import Board as RefereeBoard, BitBoard, AttackBoard
+from referee.game.bitboard import move_action
+from agent_mcts.state import Board as MctsBoard
+from agent_minimax.state import Board as MinimaxBoard
+
+NUM_GAMES = 20
+MAX_MOVES = 120
+
+
+def random_games(num_games: int, seed: int = 0) -> list[list[int]]:
+    """
+    Return the move ids of some random (spread-biased) games.
+    """
+    rng = random.Random(seed)
+    games = []
+    for _ in range(num_games):
+        board = BitBoard()
+        moves = []
+        while not board.game_over and len(moves) < MAX_MOVES:
+            legal = board.legal_moves()
+            spreads = [m for m in legal if m >= 49]
+            move = rng.choice(spreads if spreads and rng.random() < 0.5
+                              else legal)
+            board.play(move)
+            moves.append(move)
+        games.append(moves)
+    return games
+
+
+def rate(label: str, count: int, start: float):
+    print(f"{label:<32} {count / (time.perf_counter() - start):>12,.0f} /s")
+
+
+def main():
+    games = random_games(NUM_GAMES)
+    actions = [[move_action(m) for m in moves] for moves in games]
+    num_moves = sum(map(len, games))
+
+    start = time.perf_counter()
+    for seq in actions:
+        board = RefereeBoard()
+        for action in seq:
+            board.apply_action(action)
+        for _ in seq:
+            board.undo_action()
+    rate("referee Board apply+undo", 2 * num_moves, start)
+
+    start = time.perf_counter()
+    for seq in actions:
+        board = MctsBoard()
+        for action in seq:
+            board = board.move(action)
+    rate("agent_mcts Board.move", num_moves, start)
+
+    start = time.perf_counter()
+    for seq in actions:
+        board = MinimaxBoard()
+        for action in seq:
+            board.copy()
+            board.move(action)
+    rate("agent_minimax Board copy+move", num_moves, start)
+
+    start = time.perf_counter()
+    for seq in actions:
+        board = MctsBoard()
+        for action in seq:
+            board.getLegalActions()
+            board = board.move(action)
+    rate("agent_mcts getLegalActions", num_moves, start)
+
+    start = time.perf_counter()
+    for seq in actions:
+        board = MinimaxBoard()
+        for action in seq:
+            board.unsafePositions(board.turn)
+            board.move(action)
+    rate("agent_minimax unsafePositions", num_moves, start)
+
+    start = time.perf_counter()
+    for moves in games:
+        board = BitBoard()
+        for move in moves:
+            board.play(move)
+        for _ in moves:
+            board.undo()
+    rate("BitBoard play+undo", 2 * num_moves, start)
+
+    start = time.perf_counter()
+    for moves in games:
+        board = BitBoard()
+        for move in moves:
+            board.legal_moves()
+            board.play(move)
+    rate("BitBoard legal_moves", num_moves, start)
+
+    start = time.perf_counter()
+    for moves in games:
+        board = AttackBoard()
+        for move in moves:
+            board.play(move)
+        for _ in moves:
+            board.undo()
+    rate("AttackBoard play+undo", 2 * num_moves, start)
+
+    for cls in [BitBoard, AttackBoard]:
+        positions = []
+        for moves in games:
+            board = cls()
+            for move in moves:
+                board.play(move)
+                positions.append(board.copy())
+        start = time.perf_counter()
+        for board in positions:
+            board.reach_mask(board.turn_color)
+        rate(f"{cls.__name__} reach_mask", len(positions), start)
+
+
+if __name__ == "__main__":
+    main()
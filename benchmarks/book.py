@@ -0,0 +1,68 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures the opening book: its size on disk and in memory once loaded, the
+# time to load it, and the time to look up positions in the plies it covers
+# (hits, reached by playing book moves, and misses, reached at random).
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from referee.game import BitBoard
+from referee.game.bitboard import action_move
+from opening_book import OpeningBook, BOOK_PATH
+
+GAMES = 200
+
+
+def opening_positions(book: OpeningBook, games: int, seed: int = 0) -> \
+        tuple[list[BitBoard], list[BitBoard]]:
+    """
+    Return positions in the plies covered by a book where it has a move, and
+    ones where it doesn't, from games playing book moves where it has them
+    and random moves otherwise.
+    """
+    rng = random.Random(seed)
+    hits, misses = [], []
+    for _ in range(games):
+        board = BitBoard()
+        while board.turn_count < book.plies and not board.game_over:
+            action = book.lookup(board)
+            (misses if action is None else hits).append(board.copy())
+            if action is None or rng.random() < 0.5:
+                board.play(rng.choice(board.legal_moves()))
+            else:
+                board.play(action_move(action))
+    return hits, misses
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else BOOK_PATH
+    print(f"file: {os.path.getsize(path):,} bytes")
+
+    tracemalloc.start()
+    book = OpeningBook(path)
+    start = time.perf_counter()
+    len(book)
+    elapsed = time.perf_counter() - start
+    print(f"load: {elapsed * 1e3:.2f} ms, {len(book):,} entries, "
+          f"{book.plies} plies, "
+          f"{tracemalloc.get_traced_memory()[1]:,} bytes peak")
+    tracemalloc.stop()
+
+    hits, misses = opening_positions(book, GAMES)
+    for label, boards in [("hit", hits), ("miss", misses)]:
+        start = time.perf_counter()
+        for board in boards:
+            book.lookup(board)
+        elapsed = time.perf_counter() - start
+        print(f"lookup ({label}): "
+              f"{elapsed / max(1, len(boards)) * 1e6:.1f} us "
+              f"over {len(boards):,} positions")
+
+
+if __name__ == "__main__":
+    main()
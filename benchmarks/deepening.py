@@ -0,0 +1,53 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures the iterative deepening search in agent_minimax: for several
+# per-move CPU budgets, the depth completed and the time actually used on each
+# of a fixed set of mid-game positions (one table and move orderer kept across
+# positions, as the agent keeps them across turns).
+
+import sys
+import time
+
+from agent_minimax.state import Node, TranspositionTable, MoveOrderer, \
+    iterative_deepening_search
+from .minimax import mid_game_position, POSITION_PLIES
+
+BUDGETS = [0.1, 0.5, 2.0]
+MAX_DEPTH = 8
+
+
+def run(budget: float) -> list[tuple[int, int, float]]:
+    """
+    Search each position with the given budget, returning the depth completed,
+    the nodes visited and the CPU time used for each.
+    """
+    results = []
+    table = TranspositionTable()
+    orderer = MoveOrderer()
+    for plies in POSITION_PLIES:
+        board = mid_game_position(plies)
+        table.newSearch()
+        orderer.newSearch()
+        start = time.process_time()
+        node = Node(board, None, None, start + budget)
+        iterative_deepening_search(node, MAX_DEPTH, table, orderer)
+        results.append(
+            (node.depth, node.nodes, time.process_time() - start)
+        )
+    return results
+
+
+def main():
+    budgets = [float(b) for b in sys.argv[1:]] or BUDGETS
+    for budget in budgets:
+        results = run(budget)
+        depths = " ".join(str(depth) for depth, _, _ in results)
+        nodes = sum(n for _, n, _ in results)
+        used = max(t for _, _, t in results)
+        print(f"budget {budget:5.2f}s: depths {depths}, {nodes:>9,} nodes, "
+              f"max time used {used:5.2f}s")
+
+
+if __name__ == "__main__":
+    main()
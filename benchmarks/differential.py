@@ -0,0 +1,511 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Differential test of the board engine: replays seeded games through a frozen
+# copy of the baseline (dict-based) referee Board and through every board built
+# on the BitBoard engine (the referee Board, BitBoard, AttackBoard and the
+# Boards of agent_minimax, agent_mcts, agent_greedy and agent_random), and
+# stops with an error at the first difference.
+#
+#   python -m benchmarks.differential [games] [seed]
+#
+# At every ply, every board must agree with the baseline on the cells, the
+# turn, each player's power, game over, the winner and the legal actions; the
+# referee Board must also record the same mutation history and accept or
+# reject every one of the 343 actions (and some malformed ones) with the same
+# error message. Boards which keep an attack map or evaluation aggregates must
+# agree with those computed from the baseline's cells. Each game is then undone
+# move by move, checking the same state, and that the Zobrist key and power
+# totals are restored to what they were at that ply.
+#
+# Games alternate between random (spread-biased) play, which mostly runs to
+# the MAX_TURNS limit with a winner on power, and greedy play, which takes the
+# most power it can and so ends with a player eliminated. The last games keep
+# the powers level and never end the game early, so they run to the MAX_TURNS
+# limit and finish as a draw.
+
+import random
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+
+from referee.game import Board as RefereeBoard, BitBoard, AttackBoard, \
+    PlayerColor, Action, SpawnAction, SpreadAction, HexPos, HexDir, \
+    IllegalActionException
+from referee.game.bitboard import MOVE_ACTIONS, ZOBRIST_CELLS, ZOBRIST_TURN, \
+    action_move
+from referee.game.constants import *
+from agent_minimax.state import Board as MinimaxBoard
+from agent_mcts.state import Board as MctsBoard
+from agent_greedy.state import Board as GreedyBoard
+from agent_random.state import Board as RandomBoard
+
+GAMES = 10
+LONG_GAMES = 2
+SEED = 0
+ENGINES = [BitBoard, AttackBoard, MinimaxBoard, MctsBoard, GreedyBoard,
+           RandomBoard]
+COLORS = (PlayerColor.RED, PlayerColor.BLUE)
+
+
+class Mismatch(Exception):
+    pass
+
+
+# The baseline referee Board, frozen: cells are keyed on (r, q), and positions
+# are computed with the baseline's wrap-around arithmetic and direction vectors,
+# so that it doesn't depend on the current hex.py. Positions, directions and
+# actions themselves are the current (interned) types, as the boards under test
+# take them.
+
+_VECTORS: dict[HexDir, tuple[int, int]] = {
+    HexDir.DownRight: (0, 1),
+    HexDir.Down:      (-1, 1),
+    HexDir.DownLeft:  (-1, 0),
+    HexDir.UpLeft:    (0, -1),
+    HexDir.Up:        (1, -1),
+    HexDir.UpRight:   (1, 0),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CellState:
+    player: PlayerColor|None = None
+    power: int = 0
+
+    def __post_init__(self):
+        if self.player is None or self.power > MAX_CELL_POWER:
+            object.__setattr__(self, "power", 0)
+            object.__setattr__(self, "player", None)
+
+    def __iter__(self):
+        yield self.player
+        yield self.power
+
+
+@dataclass(frozen=True, slots=True)
+class BoardMutation:
+    action: Action
+    cell_mutations: frozenset  # of (cell, prev CellState, next CellState)
+
+
+class BaselineBoard:
+
+    def __init__(self):
+        self._state: dict[tuple[int, int], CellState] = \
+            defaultdict(lambda: CellState(None, 0))
+        self._turn_color: PlayerColor = PlayerColor.RED
+        self._history: list[BoardMutation] = []
+
+    def __getitem__(self, cell: tuple[int, int]) -> CellState:
+        return self._state[cell]
+
+    def apply_action(self, action: Action):
+        match action:
+            case SpawnAction():
+                res_action = self._resolve_spawn_action(action)
+            case SpreadAction():
+                res_action = self._resolve_spread_action(action)
+            case _:
+                raise IllegalActionException(
+                    f"Unknown action {action}", self._turn_color)
+
+        for cell, _, next in res_action.cell_mutations:
+            self._state[cell] = next
+
+        self._history.append(res_action)
+        self._turn_color = self._turn_color.opponent
+
+    def undo_action(self):
+        if len(self._history) == 0:
+            raise IndexError("No actions to undo.")
+
+        action: BoardMutation = self._history.pop()
+        for cell, prev, _ in action.cell_mutations:
+            self._state[cell] = prev
+        self._turn_color = self._turn_color.opponent
+
+    @property
+    def turn_count(self) -> int:
+        return len(self._history)
+
+    @property
+    def turn_color(self) -> PlayerColor:
+        return self._turn_color
+
+    @property
+    def game_over(self) -> bool:
+        if self.turn_count < 2:
+            return False
+
+        return any([
+            self.turn_count >= MAX_TURNS,
+            self._color_power(PlayerColor.RED) == 0,
+            self._color_power(PlayerColor.BLUE) == 0
+        ])
+
+    @property
+    def winner_color(self) -> PlayerColor | None:
+        if not self.game_over:
+            return None
+
+        red_power = self._color_power(PlayerColor.RED)
+        blue_power = self._color_power(PlayerColor.BLUE)
+
+        if abs(red_power - blue_power) < WIN_POWER_DIFF:
+            return None
+
+        return (PlayerColor.RED, PlayerColor.BLUE)[red_power < blue_power]
+
+    @property
+    def _total_power(self) -> int:
+        return sum(map(lambda cell: cell.power, self._state.values()))
+
+    def _color_power(self, color: PlayerColor) -> int:
+        return sum(cell.power for cell in self._state.values()
+                   if cell.player == color)
+
+    def _cell_occupied(self, coord: tuple[int, int]) -> bool:
+        return self._state[coord].power > 0
+
+    def _validate_action_pos_input(self, pos: HexPos):
+        if type(pos) != HexPos or \
+                not (0 <= pos.r < BOARD_N and 0 <= pos.q < BOARD_N):
+            raise IllegalActionException(
+                f"'{pos}' is not a valid position.", self._turn_color)
+
+    def _validate_action_dir_input(self, dir: HexDir):
+        if type(dir) != HexDir:
+            raise IllegalActionException(
+                f"'{dir}' is not a valid direction.", self._turn_color)
+
+    def _resolve_spawn_action(self, action: SpawnAction) -> BoardMutation:
+        self._validate_action_pos_input(action.cell)
+
+        cell = (action.cell.r, action.cell.q)
+
+        if (self._total_power >= MAX_TOTAL_POWER):
+            raise IllegalActionException(
+                f"Total board power max reached ({MAX_TOTAL_POWER})",
+                self._turn_color)
+
+        if self._cell_occupied(cell):
+            raise IllegalActionException(
+                f"Cell {action.cell} is occupied.", self._turn_color)
+
+        return BoardMutation(action, frozenset({
+            (cell, self._state[cell], CellState(self._turn_color, 1))
+        }))
+
+    def _resolve_spread_action(self, action: SpreadAction) -> BoardMutation:
+        self._validate_action_pos_input(action.cell)
+        self._validate_action_dir_input(action.direction)
+
+        from_cell = (action.cell.r, action.cell.q)
+        dr, dq = _VECTORS[action.direction]
+        action_player: PlayerColor = self._turn_color
+
+        if self[from_cell].player != action_player:
+            raise IllegalActionException(
+                f"SPREAD cell {action.cell} not occupied by {action_player}",
+                self._turn_color)
+
+        r, q = from_cell
+        to_cells = [
+            ((r + dr * (i + 1)) % BOARD_N, (q + dq * (i + 1)) % BOARD_N)
+            for i in range(self[from_cell].power)
+        ]
+
+        return BoardMutation(action, frozenset(
+            {(from_cell, self[from_cell], CellState())} |
+            {(to_cell, self[to_cell],
+              CellState(action_player, self[to_cell].power + 1))
+             for to_cell in to_cells}
+        ))
+
+
+# What the boards under test must agree on, computed from the baseline
+
+def cells(baseline: BaselineBoard) -> list[tuple[PlayerColor | None, int]]:
+    """
+    Return the owner and power of every cell, by cell index.
+    """
+    return [tuple(baseline[(r, q)])
+            for r in range(BOARD_N) for q in range(BOARD_N)]
+
+
+def legal_actions(baseline: BaselineBoard) -> dict[Action, str | None]:
+    """
+    Return, for every action, the error message of the baseline rejecting it,
+    or None if it is legal.
+    """
+    results = {}
+    for action in MOVE_ACTIONS:
+        try:
+            baseline.apply_action(action)
+        except IllegalActionException as e:
+            results[action] = e.args[0]
+        else:
+            baseline.undo_action()
+            results[action] = None
+    return results
+
+
+def reach_mask(baseline: BaselineBoard, color: PlayerColor) -> int:
+    """
+    Return the mask of cells a player could spread onto.
+    """
+    mask = 0
+    for (r, q), cell in list(baseline._state.items()):
+        if cell.player != color:
+            continue
+        for dr, dq in _VECTORS.values():
+            for i in range(1, cell.power + 1):
+                mask |= 1 << ((r + dr * i) % BOARD_N * BOARD_N
+                              + (q + dq * i) % BOARD_N)
+    return mask
+
+
+def zobrist_key(baseline: BaselineBoard) -> int:
+    """
+    Return the Zobrist key of the baseline's position, from scratch.
+    """
+    key = ZOBRIST_TURN if baseline.turn_color == PlayerColor.BLUE else 0
+    for index, (owner, power) in enumerate(cells(baseline)):
+        if owner is not None:
+            key ^= ZOBRIST_CELLS[owner.value][index][power]
+    return key
+
+
+def expect(actual, expected, what: str):
+    if actual != expected:
+        raise Mismatch(f"{what}: expected {expected!r}, got {actual!r}")
+
+
+def check_engine(board: BitBoard, baseline: BaselineBoard, state: list,
+                 legal: dict[Action, str | None]):
+    """
+    Check a board built on the BitBoard engine against the baseline.
+    """
+    name = type(board).__module__ + "." + type(board).__name__
+    expect([(board.owner(i), board.power(i)) for i in range(BOARD_N ** 2)],
+           state, f"{name} cells")
+    expect(board.turn_count, baseline.turn_count, f"{name} turn count")
+    expect(board.turn_color, baseline.turn_color, f"{name} turn color")
+    expect(len(board._history), baseline.turn_count, f"{name} undo history")
+    for color in COLORS:
+        expect(board.color_power(color), baseline._color_power(color),
+               f"{name} {color} power")
+    expect(board.total_power, baseline._total_power, f"{name} total power")
+    expect(board.game_over, baseline.game_over, f"{name} game over")
+    expect(board.winner_color, baseline.winner_color, f"{name} winner")
+    expect(board.zobrist_key, zobrist_key(baseline), f"{name} Zobrist key")
+    expect(set(board.legal_actions()),
+           {action for action, error in legal.items() if error is None},
+           f"{name} legal actions")
+    for color in COLORS:
+        expect(board.reach_mask(color), reach_mask(baseline, color),
+               f"{name} {color} reach")
+
+
+def check_agents(boards: dict, baseline: BaselineBoard):
+    """
+    Check the agents' own board APIs against the baseline.
+    """
+    legal = set(boards[MctsBoard].legal_actions())
+    expect(set(boards[MctsBoard].getLegalActions()), legal,
+           "agent_mcts getLegalActions")
+    expect(set(boards[MinimaxBoard].getLegalActions()), legal,
+           "agent_minimax getLegalActions")
+    expect({action for _, action in boards[GreedyBoard].getLegalActions()},
+           legal, "agent_greedy getLegalActions")
+    for board_type in [MctsBoard, MinimaxBoard]:
+        board = boards[board_type]
+        expect(board.isGameOver(), baseline.game_over,
+               f"{board_type.__module__} isGameOver")
+        expect(board.gameResult(), baseline.winner_color,
+               f"{board_type.__module__} gameResult")
+
+    # the minimax evaluation aggregates, against the baseline's cells
+    board = boards[MinimaxBoard]
+    for color in COLORS:
+        player = [cell for cell in baseline._state.items()
+                  if cell[1].player == color]
+        opp = [cell for cell in baseline._state.items()
+               if cell[1].player == color.opponent]
+        opp_reach = reach_mask(baseline, color.opponent)
+        safety = sum(cell.power for (r, q), cell in player
+                     if not opp_reach >> (r * BOARD_N + q) & 1)
+        expect(board.boardInfo(color), [
+            baseline._color_power(color),
+            baseline._color_power(color.opponent),
+            len(player), len(opp), safety
+        ], f"agent_minimax boardInfo({color})")
+
+
+def check_referee(referee: RefereeBoard, baseline: BaselineBoard, state: list,
+                  legal: dict[Action, str | None] | None):
+    """
+    Check the referee Board against the baseline; given the baseline's verdict
+    on every action, also check that the referee agrees with each.
+    """
+    expect([tuple(referee[HexPos(r, q)])
+            for r in range(BOARD_N) for q in range(BOARD_N)],
+           state, "referee cells")
+    expect(referee.turn_count, baseline.turn_count, "referee turn count")
+    expect(referee.turn_color, baseline.turn_color, "referee turn color")
+    for color in COLORS:
+        expect(referee._color_power(color), baseline._color_power(color),
+               f"referee {color} power")
+    expect(referee._total_power, baseline._total_power, "referee total power")
+    expect(referee.game_over, baseline.game_over, "referee game over")
+    expect(referee.winner_color, baseline.winner_color, "referee winner")
+    expect([BoardMutation(m.action, frozenset(
+                ((c.cell.r, c.cell.q), CellState(*c.prev), CellState(*c.next))
+                for c in m.cell_mutations))
+            for m in referee._history],
+           baseline._history, "referee history")
+    if legal is None:
+        return
+
+    cell = HexPos(0, 0)
+    malformed = [SpawnAction((0, 0)), SpreadAction(cell, (0, 1)),
+                 SpreadAction((0, 0), HexDir.Up), "SPAWN(0, 0)"]
+    for action in [*MOVE_ACTIONS, *malformed]:
+        try:
+            referee.apply_action(action)
+        except IllegalActionException as e:
+            error = e.args[0]
+        else:
+            referee.undo_action()
+            error = None
+        if action in legal:
+            expected = legal[action]
+        else:
+            try:
+                baseline.apply_action(action)
+            except IllegalActionException as e:
+                expected = e.args[0]
+            else:
+                baseline.undo_action()
+                expected = None
+        expect(error, expected, f"referee verdict on {action!r}")
+
+
+def check(referee: RefereeBoard, boards: dict, baseline: BaselineBoard,
+          every_action: bool) -> dict[Action, str | None]:
+    """
+    Check every board against the baseline, returning the baseline's verdict
+    on every action (see legal_actions).
+    """
+    state = cells(baseline)
+    legal = legal_actions(baseline)
+    check_referee(referee, baseline, state, legal if every_action else None)
+    for board in boards.values():
+        check_engine(board, baseline, state, legal)
+    check_agents(boards, baseline)
+    return legal
+
+
+def choose(baseline: BaselineBoard, legal: list[Action], rng: random.Random,
+           style: str) -> Action:
+    """
+    Choose the next action in the given style of play: "random" (preferring
+    spreads), "greedy" (the most power taken from the opponent, often) or
+    "level" (leaving the powers most level without ending the game early).
+    """
+    if style == "random" or (style == "greedy" and rng.random() < 0.3):
+        spreads = [a for a in legal if isinstance(a, SpreadAction)]
+        return rng.choice(spreads if spreads and rng.random() < 0.5
+                          else legal)
+
+    color = baseline.turn_color
+    def score(action: Action) -> tuple:
+        baseline.apply_action(action)
+        if style == "greedy":
+            key = (baseline._color_power(color.opponent),
+                   -baseline._color_power(color))
+        else:
+            key = (baseline.game_over and baseline.turn_count < MAX_TURNS,
+                   abs(baseline._color_power(PlayerColor.RED)
+                       - baseline._color_power(PlayerColor.BLUE)))
+        baseline.undo_action()
+        return key, rng.random()
+    return min(legal, key=score)
+
+
+def play_game(rng: random.Random, style: str) \
+        -> tuple[int, PlayerColor | None]:
+    """
+    Play a game through every board, checking them at every ply and as the
+    game is undone. Returns the number of plies and the winner.
+    """
+    baseline = BaselineBoard()
+    referee = RefereeBoard()
+    boards = {engine: engine() for engine in ENGINES}
+    keys = []
+    verdicts = check(referee, boards, baseline, True)
+
+    while not baseline.game_over:
+        keys.append(boards[BitBoard].zobrist_key)
+        legal = [a for a, e in verdicts.items() if e is None]
+        action = choose(baseline, legal, rng, style)
+
+        # the agents' copying updates must give the board played in place
+        mcts_next = boards[MctsBoard].move(action)
+        match action:
+            case SpawnAction(cell):
+                greedy_next = boards[GreedyBoard].updateSpawn(
+                    baseline.turn_color, cell)
+            case SpreadAction(cell, direction):
+                greedy_next = boards[GreedyBoard].updateSpread(
+                    baseline.turn_color, cell, direction)
+
+        baseline.apply_action(action)
+        referee.apply_action(action)
+        for board in boards.values():
+            board.play(action_move(action))
+        verdicts = check(referee, boards, baseline, True)
+        for board in [mcts_next, greedy_next]:
+            expect((board._masks, bytes(board._powers), board.zobrist_key),
+                   (boards[MctsBoard]._masks, bytes(boards[MctsBoard]._powers),
+                    boards[MctsBoard].zobrist_key),
+                   f"{type(board).__module__} copied update")
+
+    plies, winner = baseline.turn_count, baseline.winner_color
+    while keys:
+        baseline.undo_action()
+        referee.undo_action()
+        for board in boards.values():
+            board.undo()
+        check(referee, boards, baseline, False)
+        key = keys.pop()
+        for board in boards.values():
+            expect(board.zobrist_key, key,
+                   f"{type(board).__module__} Zobrist key after undo")
+            expect(board._color_power,
+                   [baseline._color_power(color) for color in COLORS],
+                   f"{type(board).__module__} power after undo")
+    return plies, winner
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else SEED
+    rng = random.Random(seed)
+    for game in range(games + LONG_GAMES):
+        style = "level" if game >= games else ("random", "greedy")[game % 2]
+        try:
+            plies, winner = play_game(rng, style)
+        except Mismatch as e:
+            sys.exit(f"game {game + 1} (seed {seed}): {e}")
+        result = "draw" if winner is None else f"{winner} wins"
+        print(f"game {game + 1:>3} ({style:<6}): {plies:>3} plies, {result}, "
+              f"all boards match")
+        if style == "level" and (plies != MAX_TURNS or winner is not None):
+            sys.exit(f"game {game + 1} (seed {seed}) should have been drawn "
+                     f"at {MAX_TURNS} turns")
+
+
+if __name__ == "__main__":
+    main()
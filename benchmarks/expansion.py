@@ -0,0 +1,48 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures tree growth in agent_mcts: tree nodes created per second by the
+# selection, expansion and backpropagation steps of the search, from a fixed
+# set of positions. Rollouts are left out (each leaf is scored by a coin flip)
+# so that only the cost of the tree itself is measured.
+
+import random
+import sys
+import time
+
+from referee.game import PlayerColor
+from agent_mcts.state import MonteCarloTreeSearchNode
+from .playout import positions
+
+NUM_POSITIONS = 20
+ITERATIONS = 500
+COLORS = (PlayerColor.RED, PlayerColor.BLUE)
+
+
+def count_nodes(root: MonteCarloTreeSearchNode) -> int:
+    stack, count = [root], 0
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    boards = positions(NUM_POSITIONS)
+    rng = random.Random(0)
+    nodes, elapsed = 0, 0.
+    for board in boards:
+        start = time.perf_counter()
+        root = MonteCarloTreeSearchNode(board)
+        for _ in range(iterations):
+            v = root.treePolicy()
+            v.backPropagate(rng.choice(COLORS))
+        elapsed += time.perf_counter() - start
+        nodes += count_nodes(root)
+    print(f"{nodes:,} nodes in {elapsed:.2f}s: {nodes / elapsed:,.0f} nodes/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures alpha-beta search speed (nodes per second) in agent_minimax at
+# several depths, from a fixed set of mid-game positions. Each position is
+# searched for a few consecutive turns, with no transposition table, with a
+# fresh table every turn, and with one table kept for the whole sequence (as
+# the agent does), each with and without move ordering. The turns follow a
+# fixed random line of play rather than the moves found, and every search runs
+# to the full depth, so that all modes search exactly the same positions and
+# their node counts compare directly. The effective branching factor is
+# nodes ** (1 / depth), averaged (geometrically) over the searches.
+
+import math
+import random
+import sys
+import time
+
+from agent_minimax.state import Board, Node, TranspositionTable, \
+    MoveOrderer, alpha_beta_search
+
+DEPTHS = [2, 3, 4]
+POSITION_PLIES = [8, 12, 16]
+TURNS = 3
+
+
+class CountingBoard(Board):
+    """
+    Board which counts the moves played on it (i.e. search nodes).
+    """
+    nodes = 0
+
+    def play(self, move: int):
+        CountingBoard.nodes += 1
+        super().play(move)
+
+
+def mid_game_position(plies: int, seed: int = 0) -> CountingBoard:
+    """
+    Return the position reached after some random (spread-biased) plies.
+    """
+    rng = random.Random(seed)
+    board = CountingBoard()
+    while board.turn_count < plies:
+        legal = board.legal_moves()
+        spreads = [m for m in legal if m >= 49]
+        board.play(rng.choice(spreads if spreads and rng.random() < 0.5
+                              else legal))
+    return board
+
+
+def run(depth: int, mode: str, ordered: bool) \
+        -> tuple[int, float, float, TranspositionTable | None]:
+    """
+    Search every position for TURNS turns, returning the nodes searched, the
+    time taken, the effective branching factor and the last table used.
+    """
+    nodes = 0
+    log_nodes = 0.0
+    searches = 0
+    elapsed = 0.0
+    table = None
+    for plies in POSITION_PLIES:
+        board = mid_game_position(plies)
+        rng = random.Random(plies)
+        orderer = MoveOrderer() if ordered else None
+        if mode == "kept":
+            table = TranspositionTable()
+        for _ in range(TURNS):
+            if mode == "fresh":
+                table = TranspositionTable()
+            if table is not None:
+                table.newSearch()
+            if orderer is not None:
+                orderer.newSearch()
+            CountingBoard.nodes = 0
+            start = time.perf_counter()
+            alpha_beta_search(Node(board, None, None), depth, table, orderer)
+            elapsed += time.perf_counter() - start
+            nodes += CountingBoard.nodes
+            log_nodes += math.log(max(1, CountingBoard.nodes))
+            searches += 1
+            # our move and the reply, the same whatever the search found
+            for _ in range(2):
+                if not board.game_over:
+                    board.play(rng.choice(board.legal_moves()))
+            if board.game_over:
+                break
+    return nodes, elapsed, math.exp(log_nodes / searches / depth), table
+
+
+def main():
+    depths = [int(d) for d in sys.argv[1:]] or DEPTHS
+    for depth in depths:
+        base_nodes = None
+        for ordered in [False, True]:
+            for mode in ["none", "fresh", "kept"]:
+                nodes, elapsed, ebf, table = run(depth, mode, ordered)
+                base_nodes = base_nodes or nodes
+                line = f"depth {depth} table {mode:<5} " \
+                       f"{'ordered' if ordered else 'unordered':<9}: " \
+                       f"{nodes:>10,} nodes ({nodes / base_nodes:6.1%}) " \
+                       f"in {elapsed:7.2f}s = {nodes / elapsed:>8,.0f} " \
+                       f"nodes/s, EBF {ebf:5.1f}"
+                if table is not None:
+                    line += f", hit rate " \
+                            f"{table.hits / max(1, table.probes):.1%}"
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures parallel MCTS in agent_mcts: playouts per second of wall-clock time,
+# and per second of CPU time over all the processes, searching a fixed set of
+# positions with root and leaf parallelisation on 1, 2, 4 and 8 workers. The
+# search is given the same CPU budget for each worker count.
+
+import contextlib
+import io
+import sys
+import time
+
+from agent_mcts.state import MonteCarloTreeSearchNode, WorkerPool
+from .playout import positions
+
+NUM_POSITIONS = 5
+BUDGET = 0.5
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def run(boards, budget: float, pool: WorkerPool | None):
+    """
+    Search each board, returning the playouts, wall-clock and CPU time used.
+    """
+    playouts = 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    worker_time = pool.time_used if pool else 0.
+    for board in boards:
+        root = MonteCarloTreeSearchNode(board)
+        with contextlib.redirect_stdout(io.StringIO()):
+            root.bestAction(budget, pool)
+        playouts += root._n
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    if pool:
+        cpu += pool.time_used - worker_time
+    return playouts, wall, cpu
+
+
+def report(label: str, playouts: int, wall: float, cpu: float):
+    print(f"{label:<14}: {playouts:>6} playouts, "
+          f"{playouts / wall:>8,.1f} /s wall, {playouts / cpu:>8,.1f} /s CPU")
+
+
+def main():
+    counts = [int(w) for w in sys.argv[1:]] or WORKER_COUNTS
+    boards = positions(NUM_POSITIONS)
+    report("serial", *run(boards, BUDGET, None))
+    for leaf in [False, True]:
+        for workers in counts:
+            pool = WorkerPool(workers, leaf)
+            try:
+                result = run(boards, BUDGET, pool)
+            finally:
+                pool.close()
+            mode = "leaf" if leaf else "root"
+            report(f"{mode} x{workers}", *result)
+
+
+if __name__ == "__main__":
+    main()
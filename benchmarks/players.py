@@ -0,0 +1,68 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures games per second through the referee with the agents run in
+# subprocesses (AgentProxyPlayer) and in the referee's process
+# (InProcessPlayer). The agents are quick ones by default, so that the cost of
+# hosting them and passing them messages is most of the time of a game.
+#
+#   python -m benchmarks.players [games] [red] [blue]
+#
+# Games are played in a temporary directory, as the referee writes the result
+# of every game to output.csv in the working directory.
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from referee.game import PlayerColor
+from referee.run import run_game
+from referee.agent import AgentProxyPlayer, InProcessPlayer
+
+GAMES = 20
+AGENTS = ("agent_greedy", "agent_random")
+TIME_LIMIT = 180.
+
+
+async def play(Player: type, agents: tuple[str, str], games: int) -> \
+        list[PlayerColor | None]:
+    """
+    Play games between two agent packages with the given Player class,
+    alternating colours, and return the colour of each winner.
+    """
+    winners = []
+    for game in range(games):
+        red, blue = agents if game % 2 == 0 else agents[::-1]
+        players = [
+            Player(pkg, color, (pkg, "Agent"), TIME_LIMIT, 0)
+            for pkg, color in [(red, PlayerColor.RED),
+                               (blue, PlayerColor.BLUE)]
+        ]
+        winner = await run_game(players)
+        winners.append(None if winner is None else winner.color)
+    return winners
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    agents = tuple(sys.argv[2:4]) if len(sys.argv) > 3 else AGENTS
+
+    # agent subprocesses must still find the packages once we have moved
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [root, os.environ.get("PYTHONPATH")]))
+    os.chdir(tempfile.mkdtemp())
+
+    for label, Player in [("subprocess", AgentProxyPlayer),
+                          ("in-process", InProcessPlayer)]:
+        start = time.perf_counter()
+        asyncio.run(play(Player, agents, games))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<12}: {games / elapsed:6.2f} games/s "
+              f"({elapsed / games * 1e3:,.0f} ms/game)")
+
+
+if __name__ == "__main__":
+    main()
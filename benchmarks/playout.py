@@ -0,0 +1,58 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures random playouts per second in agent_mcts from a fixed set of
+# positions: the playout engine used by rollouts, against playing the game out
+# through Board.move and getLegalActions (as rollouts used to).
+
+import random
+import sys
+import time
+
+from agent_mcts.state import Board
+
+NUM_POSITIONS = 20
+PLAYOUTS = 10
+
+
+def positions(count: int, seed: int = 0) -> list[Board]:
+    """
+    Return positions reached after a random number of random plies.
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board = Board()
+        for _ in range(rng.randrange(40)):
+            board.play(rng.choice(board.legal_moves()))
+            if board.game_over:
+                break
+        if not board.game_over:
+            boards.append(board)
+    return boards
+
+
+def move_playout(board: Board, rng: random.Random):
+    while not board.isGameOver():
+        actions = board.getLegalActions()
+        board = board.move(actions[rng.randrange(len(actions))])
+    return board.gameResult()
+
+
+def main():
+    playouts = int(sys.argv[1]) if len(sys.argv) > 1 else PLAYOUTS
+    boards = positions(NUM_POSITIONS)
+    for label, run in [("Board.move", move_playout),
+                       ("playout engine", Board.playout)]:
+        rng = random.Random(0)
+        start = time.perf_counter()
+        for board in boards:
+            for _ in range(playouts):
+                run(board, rng)
+        elapsed = time.perf_counter() - start
+        count = len(boards) * playouts
+        print(f"{label:<16}: {count / elapsed:>8,.1f} playouts/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures the startup latency of a game (until both agents are constructed,
+# and ready for their first action) and games per second through the referee,
+# with agents in new subprocesses and in hosts from a pool of pre-forked hosts
+# (AgentHostPool).
+#
+#   python -m benchmarks.pool [games] [red] [blue]
+#
+# Games are played in a temporary directory, as the referee writes the result
+# of every game to output.csv in the working directory.
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from referee.game import PlayerColor
+from referee.run import run_game
+from referee.agent import AgentProxyPlayer, AgentHostPool
+
+GAMES = 20
+AGENTS = ("agent_greedy", "agent_random")
+TIME_LIMIT = 180.
+
+
+def players(agents: tuple[str, str], game: int,
+            pool: AgentHostPool | None) -> list[AgentProxyPlayer]:
+    """
+    Return the players of a game between two agent packages, alternating
+    colours between games.
+    """
+    red, blue = agents if game % 2 == 0 else agents[::-1]
+    return [
+        AgentProxyPlayer(pkg, color, (pkg, "Agent"), TIME_LIMIT, 0, pool=pool)
+        for pkg, color in [(red, PlayerColor.RED), (blue, PlayerColor.BLUE)]
+    ]
+
+
+async def startup(agents: tuple[str, str], games: int,
+                  pool: AgentHostPool | None) -> float:
+    """
+    Return the mean seconds to construct both agents of a game.
+    """
+    elapsed = 0.
+    for game in range(games):
+        game_players = players(agents, game, pool)
+        start = time.perf_counter()
+        for player in game_players:
+            await player.__aenter__()
+        elapsed += time.perf_counter() - start
+        for player in game_players:
+            await player.__aexit__(None, None, None)
+    return elapsed / games
+
+
+async def play(agents: tuple[str, str], games: int,
+               pool: AgentHostPool | None) -> float:
+    """
+    Return the games per second of games between two agent packages.
+    """
+    start = time.perf_counter()
+    for game in range(games):
+        await run_game(players(agents, game, pool))
+    return games / (time.perf_counter() - start)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    agents = tuple(sys.argv[2:4]) if len(sys.argv) > 3 else AGENTS
+
+    # agent subprocesses must still find the packages once we have moved
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    os.environ["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [root, os.environ.get("PYTHONPATH")]))
+    sys.path.insert(0, root)
+    os.chdir(tempfile.mkdtemp())
+
+    with AgentHostPool(agents) as pool:
+        for label, game_pool in [("subprocess", None), ("pool", pool)]:
+            latency = asyncio.run(startup(agents, games, game_pool))
+            rate = asyncio.run(play(agents, games, game_pool))
+            print(f"{label:<12}: {latency * 1e3:7.1f} ms startup per game, "
+                  f"{rate:5.2f} games/s")
+
+
+if __name__ == "__main__":
+    main()
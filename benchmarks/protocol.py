@@ -0,0 +1,100 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures the round-trip latency of a method call on a class hosted in an
+# agent subprocess (RemoteProcessClassClient), with each transport. The calls
+# are those of a game: action() returning an action, and turn() passing one
+# (with no result). The cost of encoding and decoding these messages, and
+# their size, is measured on its own too.
+#
+#   python -m benchmarks.protocol [calls]
+
+import asyncio
+import sys
+import time
+
+from referee.game import PlayerColor, SpreadAction, HexPos, HexDir
+from referee.agent.client import RemoteProcessClassClient
+from referee.agent.io import AsyncProcessStatus, TRANSPORTS, \
+    TRANSPORT_BASE64, m_pickle, m_unpickle, m_frame_call, m_frame_result, \
+    m_unframe_header, m_unframe_body, _FRAME_HEADER, _REPLY_OK
+
+CALLS = 2000
+ACTION = SpreadAction(HexPos(3, 4), HexDir.DownRight)
+STATUS = AsyncProcessStatus(0.01, 12.5, True, 20.1, 21.3)
+
+
+class Echo:
+    """
+    Stands in for an agent that takes no time to think.
+    """
+    def __init__(self, color: PlayerColor, **referee: dict):
+        self._color = color
+
+    def action(self, **referee: dict):
+        return ACTION
+
+    def turn(self, color: PlayerColor, action, **referee: dict):
+        pass
+
+
+async def round_trips(transport: str, calls: int) -> float:
+    """
+    Return the mean seconds per call of alternating action() and turn() calls
+    on an Echo in a subprocess.
+    """
+    async with RemoteProcessClassClient(
+        "benchmarks.protocol", "Echo",
+        time_limit=0, space_limit=0, recv_timeout=60,
+        transport=transport, color=PlayerColor.RED,
+    ) as client:
+        start = time.perf_counter()
+        for _ in range(calls // 2):
+            action = await client.action()
+            await client.turn(PlayerColor.RED, action)
+        return (time.perf_counter() - start) / (calls // 2 * 2)
+
+
+def codec(transport: str, calls: int) -> tuple[float, int]:
+    """
+    Return the mean seconds to encode and decode the request and reply of a
+    turn() call, and their total size in bytes.
+    """
+    request = ("turn", (PlayerColor.RED, ACTION), {})
+    if transport == TRANSPORT_BASE64:
+        messages = [request, (STATUS, _REPLY_OK, ACTION)]
+
+        def round_trip():
+            for message in messages:
+                m_unpickle(m_pickle(message))
+
+        size = sum(len(m_pickle(message)) for message in messages)
+    else:
+        def frames() -> list[bytes]:
+            return [m_frame_call(*request), m_frame_result(ACTION, STATUS)]
+
+        def round_trip():
+            for frame in frames():
+                _, kind, _ = m_unframe_header(frame[:_FRAME_HEADER.size])
+                m_unframe_body(kind, frame[_FRAME_HEADER.size:])
+
+        size = sum(len(frame) for frame in frames())
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        round_trip()
+    return (time.perf_counter() - start) / calls, size
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else CALLS
+    for transport in TRANSPORTS:
+        elapsed = asyncio.run(round_trips(transport, calls))
+        coding, size = codec(transport, calls)
+        print(f"{transport:<8}: {elapsed * 1e6:7.1f} us per call, "
+              f"{coding * 1e6:5.1f} us encoding and decoding, "
+              f"{size} bytes")
+
+
+if __name__ == "__main__":
+    main()
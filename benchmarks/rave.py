@@ -0,0 +1,78 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures the effect of RAVE on agent_mcts: its win rate against
+# agent_minimax with and without RAVE, both agents given the same CPU time for
+# the game. Games are played in this process, the agents taking turns as
+# colours alternate, and each is charged the CPU time of its own calls as the
+# referee would charge it. As the agent rarely wins, the turns it survives
+# and its final power margin are reported as well.
+
+import contextlib
+import io
+import sys
+import time
+
+from referee.game import PlayerColor, Board
+import agent_mcts.state
+from agent_mcts.program import Agent as MctsAgent
+from agent_minimax.program import Agent as MinimaxAgent
+
+GAMES = 4
+TIME_LIMIT = 20.
+
+
+def play(agents: dict[PlayerColor, type], time_limit: float) -> \
+        tuple[PlayerColor | None, Board]:
+    """
+    Play a game between two agent classes, returning the winner (a player out
+    of time loses) and the final board.
+    """
+    board = Board()
+    used = {color: 0. for color in agents}
+    with contextlib.redirect_stdout(io.StringIO()):
+        players = {}
+        for color, cls in agents.items():
+            start = time.process_time()
+            players[color] = cls(color)
+            used[color] += time.process_time() - start
+        while not board.game_over:
+            color = board.turn_color
+            start = time.process_time()
+            action = players[color].action(
+                time_remaining=time_limit - used[color])
+            used[color] += time.process_time() - start
+            if used[color] > time_limit:
+                return color.opponent, board
+            board.apply_action(action)
+            for player_color, player in players.items():
+                start = time.process_time()
+                player.turn(color, action)
+                used[player_color] += time.process_time() - start
+    return board.winner_color, board
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else TIME_LIMIT
+    rave = agent_mcts.state.RAVE_EQUIVALENCE
+    for label, equivalence in [("without RAVE", 0), ("with RAVE", rave)]:
+        agent_mcts.state.RAVE_EQUIVALENCE = equivalence
+        wins = draws = turns = margin = 0
+        for game in range(games):
+            mcts = (PlayerColor.RED, PlayerColor.BLUE)[game % 2]
+            winner, board = play(
+                {mcts: MctsAgent, mcts.opponent: MinimaxAgent}, time_limit
+            )
+            wins += winner == mcts
+            draws += winner is None
+            turns += board.turn_count
+            margin += board.bits.color_power(mcts) \
+                - board.bits.color_power(mcts.opponent)
+        print(f"{label:<12}: {wins}/{games} wins, {draws} draws against "
+              f"agent_minimax ({time_limit:g}s each), {turns / games:.1f} "
+              f"turns, mean power margin {margin / games:+.1f}")
+
+
+if __name__ == "__main__":
+    main()
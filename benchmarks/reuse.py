@@ -0,0 +1,49 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures tree reuse in agent_mcts over a full self-play game: at each move,
+# the visits the player's root already had when the search started (inherited
+# from the previous turns) against the visits it had when the search finished.
+
+import contextlib
+import io
+import sys
+
+from agent_mcts.state import Board, MonteCarloTreeSearchNode
+
+TIME_LIMIT = 0.05
+
+
+def play(time_limit: float) -> list[tuple[int, int]]:
+    """
+    Play a game between two searching players, each keeping its own tree, and
+    return the inherited and final root visits of each move.
+    """
+    roots = [MonteCarloTreeSearchNode(Board()) for _ in range(2)]
+    visits = []
+    board = roots[0].board
+    while not board.isGameOver():
+        root = roots[board.turn_count % 2]
+        inherited = root._n
+        with contextlib.redirect_stdout(io.StringIO()):
+            action = root.bestAction(time_limit)
+        visits.append((inherited, root._n))
+        roots = [r.descend(action) for r in roots]
+        board = roots[0].board
+    return visits
+
+
+def main():
+    time_limit = float(sys.argv[1]) if len(sys.argv) > 1 else TIME_LIMIT
+    visits = play(time_limit)
+    inherited = sum(i for i, _ in visits)
+    total = sum(n for _, n in visits)
+    reused = sum(1 for i, _ in visits if i)
+    print(f"{len(visits)} moves, {reused} started from an inherited subtree")
+    print(f"mean root visits: {inherited / len(visits):,.1f} inherited, "
+          f"{total / len(visits):,.1f} after search "
+          f"({inherited / total:.1%} inherited)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Measures MCTS-Solver in agent_mcts on endgames: positions from the last
+# ENDGAME_PLIES plies of random games won by elimination, each searched with the
+# same CPU budget with and without the solver. Reports the simulations (playouts,
+# or visits to a position where the game is over) spent per position, the CPU
+# time used and the positions solved.
+
+import contextlib
+import io
+import random
+import sys
+import time
+
+import agent_mcts.state
+from agent_mcts.state import Board, MonteCarloTreeSearchNode
+from referee.game.constants import MAX_TURNS
+
+NUM_POSITIONS = 60
+ENDGAME_PLIES = 20
+BUDGET = 0.2
+
+
+def endgames(count: int, seed: int = 0) -> list[Board]:
+    """
+    Return positions at most ENDGAME_PLIES plies before the end of random
+    games that a player won before the turn limit.
+    """
+    rng = random.Random(seed)
+    boards = []
+    while len(boards) < count:
+        board, history = Board(), []
+        while not board.game_over:
+            history.append(board.copy())
+            board.play(rng.choice(board.legal_moves()))
+        if board.winner_color is None or board.turn_count >= MAX_TURNS:
+            continue
+        plies = rng.randrange(1, ENDGAME_PLIES + 1)
+        if len(history) >= plies:
+            boards.append(history[-plies])
+    return boards
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else BUDGET
+    boards = endgames(NUM_POSITIONS)
+    for label, solver in [("without solver", False), ("with solver", True)]:
+        agent_mcts.state.SOLVER = solver
+        random.seed(0)
+        simulations, solved = 0, 0
+        start = time.process_time()
+        for board in boards:
+            root = MonteCarloTreeSearchNode(board)
+            with contextlib.redirect_stdout(io.StringIO()):
+                root.bestAction(budget)
+            simulations += root._n
+            solved += root._proven is not None
+        elapsed = time.process_time() - start
+        print(f"{label:<15}: {simulations / len(boards):>7,.1f} simulations, "
+              f"{elapsed / len(boards):.3f}s per position, "
+              f"{solved}/{len(boards)} solved")
+
+
+if __name__ == "__main__":
+    main()
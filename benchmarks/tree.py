@@ -0,0 +1,72 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Compares the two stores for the MCTS tree in agent_mcts, MonteCarloTreeSearchNode
+# objects and the ArrayTree columns: memory per tree node, and search iterations
+# per second, growing a tree from each of a fixed set of positions. Then the
+# iterations an ArrayTree search (bestAction) runs in a fixed budget.
+
+import random
+import sys
+import time
+import tracemalloc
+
+from agent_mcts.state import MonteCarloTreeSearchNode
+from agent_mcts.tree import ArrayTree
+from .expansion import count_nodes
+from .playout import positions
+
+NUM_POSITIONS = 5
+ITERATIONS = 2000
+SEARCH_SECONDS = 1.
+
+
+def grow_nodes(board, iterations):
+    root = MonteCarloTreeSearchNode(board)
+    for _ in range(iterations):
+        v = root.treePolicy()
+        v.backPropagate(v.rollout())
+    return root, count_nodes(root)
+
+
+def grow_array(board, iterations):
+    tree = ArrayTree(board)
+    for _ in range(iterations):
+        tree._iterate()
+    return tree, 1 + int(tree.expanded[:len(tree)].sum())
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    boards = positions(NUM_POSITIONS)
+    for label, grow in [("node objects", grow_nodes),
+                        ("ArrayTree", grow_array)]:
+        random.seed(0)
+        start = time.perf_counter()
+        for board in boards:
+            grow(board, iterations)
+        rate = len(boards) * iterations / (time.perf_counter() - start)
+
+        # measure the memory separately, as tracing slows the search down
+        random.seed(0)
+        nodes, memory = 0, 0
+        for board in boards:
+            tracemalloc.start()
+            tree, count = grow(board, iterations)
+            memory += tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            nodes += count
+            del tree
+        print(f"{label:<13}: {nodes:>7,} nodes, {memory / nodes:>7,.0f} "
+              f"bytes/node, {rate:>7,.0f} iterations/s")
+
+    iterations = 0
+    for board in boards:
+        tree = ArrayTree(board)
+        tree.bestAction(SEARCH_SECONDS)
+        iterations += tree.iterations
+    print(f"ArrayTree.bestAction({SEARCH_SECONDS:g}): "
+          f"{iterations / len(boards):,.0f} iterations per search")
+
+if __name__ == "__main__":
+    main()
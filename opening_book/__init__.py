@@ -0,0 +1,9 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Opening book shared by the agents. Build it from the repository root with
+#
+#   python -m opening_book --plies 4 --search minimax --budget 10
+
+from .book import OpeningBook, BOOK_PATH, canonical, transform_moves, \
+    write_book
@@ -0,0 +1,116 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Builds the opening book offline. For each colour, the positions where it is
+# to move in the first plies are searched for a long time each: from the empty
+# board (or the first red move, for blue), the book move is played, then every
+# reply of the opponent, and so on. Positions equivalent under a symmetry of
+# the board are searched once.
+
+import argparse
+import contextlib
+import io
+import time
+
+from referee.game import PlayerColor, BitBoard
+from referee.game.bitboard import action_move
+from agent_minimax.program import MAX_DEPTH
+import agent_minimax.state as minimax
+import agent_mcts.state as mcts
+from .book import BOOK_PATH, canonical, transform_moves, write_book
+
+PLIES = 4
+BUDGET = 10.
+
+
+def minimax_search(moves: list[int], budget: float) -> int:
+    """
+    Return the move agent_minimax's iterative deepening search plays after the
+    given moves, searching for budget seconds of CPU time.
+    """
+    board = minimax.Board()
+    for move in moves:
+        board.play(move)
+    node = minimax.Node(board, None, None, time.process_time() + budget)
+    return action_move(minimax.iterative_deepening_search(
+        node, MAX_DEPTH, minimax.TranspositionTable(), minimax.MoveOrderer()))
+
+
+def mcts_search(moves: list[int], budget: float) -> int:
+    """
+    Return the move agent_mcts's search plays after the given moves, searching
+    for budget seconds of CPU time.
+    """
+    board = mcts.Board()
+    for move in moves:
+        board.play(move)
+    return action_move(mcts.MonteCarloTreeSearchNode(board).bestAction(budget))
+
+
+SEARCHES = {"minimax": minimax_search, "mcts": mcts_search}
+
+
+def build(plies: int, search, budget: float, verbose: bool = True) -> \
+        dict[int, int]:
+    """
+    Return the book entries (canonical key to canonical move id) for the
+    positions in the first plies, searching each with search(moves, budget).
+    """
+    entries = {}
+    for color in PlayerColor:
+        # the positions at this ply, by canonical key, as the moves to reach
+        # them
+        frontier = {canonical(BitBoard())[0]: []}
+        for ply in range(plies):
+            following = {}
+            for moves in frontier.values():
+                board = BitBoard()
+                for move in moves:
+                    board.play(move)
+                if board.turn_color == color:
+                    start = time.process_time()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        move = search(moves, budget)
+                    key, symmetry = canonical(board)
+                    entries[key] = transform_moves(symmetry)[move]
+                    replies = [move]
+                    if verbose:
+                        print(f"{color} ply {ply}: {len(entries)} entries, "
+                              f"{time.process_time() - start:.1f}s")
+                else:
+                    replies = board.legal_moves()
+                for move in replies:
+                    board.play(move)
+                    if not board.game_over:
+                        following.setdefault(canonical(board)[0],
+                                             moves + [move])
+                    board.undo()
+            frontier = following
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m opening_book",
+        description="Build the opening book by searching the positions of "
+                    "the first plies offline.",
+    )
+    parser.add_argument("--plies", type=int, default=PLIES,
+                        help="number of plies (turns) the book covers")
+    parser.add_argument("--search", choices=SEARCHES, default="minimax",
+                        help="search used to choose the book moves")
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help="CPU seconds to search each position for")
+    parser.add_argument("--out", default=BOOK_PATH,
+                        help="file to write the book to")
+    args = parser.parse_args()
+
+    start = time.process_time()
+    entries = build(args.plies, SEARCHES[args.search], args.budget)
+    write_book(args.out, args.plies, entries)
+    print(f"{len(entries)} entries written to {args.out} in "
+          f"{time.process_time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
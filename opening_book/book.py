@@ -0,0 +1,206 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from array import array
+from bisect import bisect_left
+import os
+import struct
+import sys
+
+from referee.game import Action, BitBoard
+from referee.game.bitboard import ZOBRIST_CELLS, ZOBRIST_TURN, iter_bits, \
+    move_action
+from referee.game.rays import CELL_COUNT, DIRECTIONS
+from referee.game.constants import *
+
+
+# An opening book maps positions early in the game to the move a long offline
+# search chose there (see __main__.py for the builder). Positions are keyed by
+# a canonical Zobrist hash, the same for every position equivalent to it under
+# a symmetry of the board, so one entry answers for all of them.
+#
+# The board is a torus, so every translation is a symmetry, and so is every
+# linear map of the axial coordinates that permutes the six directions (the
+# rotations and reflections of a hexagon): 12 * 49 symmetries in all. The
+# canonical key of a position is the least hash among its images under them.
+# Only the images that translate one of its occupied cells to cell 0 are
+# considered, as the set of those is the same for equivalent positions and it
+# is far smaller. A symmetry is identified by its linear map and the image of
+# the cell it translates to cell 0.
+#
+# On disk, a book is a little-endian header (magic, format version, the number
+# of plies it covers and the number of entries), then the keys in ascending
+# order as unsigned 64-bit integers, then the move id of each key as an
+# unsigned 16-bit integer. Moves are stored as played on the canonical image
+# of their position. That is 10 bytes an entry, and looking a position up is a
+# binary search of the keys.
+
+BOOK_PATH = os.path.join(os.path.dirname(__file__), "opening.book")
+BOOK_MAGIC = b"IXOB"
+BOOK_VERSION = 1
+_HEADER = struct.Struct("<4sHHI")
+
+Symmetry = tuple[int, int]
+
+
+def _linear_maps() -> list[tuple[tuple[int, int], tuple[int, int]]]:
+    # the maps (r, q) -> r * a + q * b that permute the directions, as (a, b),
+    # the identity first
+    vectors = [(d.value.r, d.value.q) for d in DIRECTIONS]
+    maps = []
+    for a in [(1, 0)] + vectors:
+        for b in [(0, 1)] + vectors:
+            images = [(r * a[0] + q * b[0], r * a[1] + q * b[1])
+                      for r, q in vectors]
+            if sorted(images) == sorted(vectors) and (a, b) not in maps:
+                maps.append((a, b))
+    return maps
+
+
+LINEAR_MAPS = _linear_maps()
+# LINEAR_CELLS[l][i] is the image of cell i under linear map l, and
+# LINEAR_DIRS[l][d] is the image of direction d
+LINEAR_CELLS: list[tuple[int, ...]] = [
+    tuple(
+        ((r * a[0] + q * b[0]) % BOARD_N) * BOARD_N
+        + (r * a[1] + q * b[1]) % BOARD_N
+        for r, q in (divmod(i, BOARD_N) for i in range(CELL_COUNT))
+    )
+    for a, b in LINEAR_MAPS
+]
+LINEAR_DIRS: list[tuple[int, ...]] = [
+    tuple(
+        [(d.value.r, d.value.q) for d in DIRECTIONS].index(
+            (d.value.r * a[0] + d.value.q * b[0],
+             d.value.r * a[1] + d.value.q * b[1]))
+        for d in DIRECTIONS
+    )
+    for a, b in LINEAR_MAPS
+]
+# OFFSET[i][j] is cell i translated by minus cell j
+OFFSET: list[tuple[int, ...]] = [
+    tuple(
+        ((i // BOARD_N - j // BOARD_N) % BOARD_N) * BOARD_N
+        + (i - j) % BOARD_N
+        for j in range(CELL_COUNT)
+    )
+    for i in range(CELL_COUNT)
+]
+
+
+def canonical(board: BitBoard) -> tuple[int, Symmetry]:
+    """
+    Return the canonical key of a position, and a symmetry taking the position
+    to its canonical image.
+    """
+    base = ZOBRIST_TURN if board._turn else 0
+    powers = board._powers
+    cells = [
+        (index, color, powers[index])
+        for color, mask in enumerate(board._masks)
+        for index in iter_bits(mask)
+    ]
+    if not cells:
+        return base, (0, 0)
+
+    best, symmetry = None, None
+    for l, linear in enumerate(LINEAR_CELLS):
+        images = [(linear[index], color, power)
+                  for index, color, power in cells]
+        for anchor, _, _ in images:
+            key = base
+            for index, color, power in images:
+                key ^= ZOBRIST_CELLS[color][OFFSET[index][anchor]][power]
+            if best is None or key < best:
+                best, symmetry = key, (l, anchor)
+    return best, symmetry
+
+
+def transform_moves(symmetry: Symmetry) -> list[int]:
+    """
+    Return the image under a symmetry of every move id, by move id.
+    """
+    l, anchor = symmetry
+    cells = [OFFSET[i][anchor] for i in LINEAR_CELLS[l]]
+    directions = LINEAR_DIRS[l]
+    moves = cells[:]
+    for index in range(CELL_COUNT):
+        for direction in range(len(DIRECTIONS)):
+            moves.append(CELL_COUNT + cells[index] * len(DIRECTIONS)
+                         + directions[direction])
+    return moves
+
+
+def write_book(path: str, plies: int, entries: dict[int, int]):
+    """
+    Write a book of entries (canonical key to canonical move id) covering the
+    given number of plies.
+    """
+    keys = array("Q", sorted(entries))
+    moves = array("H", (entries[key] for key in keys))
+    if sys.byteorder == "big":
+        keys.byteswap()
+        moves.byteswap()
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, plies, len(keys)))
+        keys.tofile(file)
+        moves.tofile(file)
+
+
+class OpeningBook:
+    """
+    The moves of an opening book, read from its file on the first lookup. A
+    missing file is an empty book. The entries are dropped once the game has
+    gone past the plies the book covers, as no lookup could hit them again.
+    """
+    def __init__(self, path: str = BOOK_PATH):
+        self._path = path
+        self._plies: int | None = None
+        self._keys = array("Q")
+        self._moves = array("H")
+
+    def _load(self):
+        self._plies = 0
+        if not os.path.isfile(self._path):
+            return
+        with open(self._path, "rb") as file:
+            magic, version, plies, count = \
+                _HEADER.unpack(file.read(_HEADER.size))
+            if magic != BOOK_MAGIC or version != BOOK_VERSION:
+                raise ValueError(f"{self._path} is not an opening book")
+            self._keys.fromfile(file, count)
+            self._moves.fromfile(file, count)
+        if sys.byteorder == "big":
+            self._keys.byteswap()
+            self._moves.byteswap()
+        self._plies = plies
+
+    @property
+    def plies(self) -> int:
+        """
+        The number of plies (turns from the start of the game) covered.
+        """
+        if self._plies is None:
+            self._load()
+        return self._plies
+
+    def __len__(self) -> int:
+        if self._plies is None:
+            self._load()
+        return len(self._keys)
+
+    def lookup(self, board: BitBoard) -> Action | None:
+        """
+        Return the book move for a position, or None if it isn't in the book.
+        """
+        if board.turn_count >= self.plies:
+            if self._keys:
+                self._keys = array("Q")
+                self._moves = array("H")
+            return None
+        key, symmetry = canonical(board)
+        i = bisect_left(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return None
+        move = transform_moves(symmetry).index(self._moves[i])
+        return move_action(move)
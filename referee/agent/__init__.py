@@ -2,6 +2,7 @@
 # Project Part B: Game Playing Agent
 
 from contextlib import contextmanager
+from functools import partial
 from typing import Type
 
 from ..game.player import Player
@@ -9,7 +10,10 @@ from ..log import LogStream, NullLogger
 from ..game import Action, PlayerColor, PlayerException
 from .client import RemoteProcessClassClient, AsyncProcessStatus, \
     WrappedProcessException
+from .local import LocalClassClient
+from .pool import AgentHostPool, PooledProcessClassClient
 from .resources import ResourceLimitException
+from .io import TRANSPORT_BINARY
 
 RECV_TIMEOUT = 60 # Max seconds for reply from agent (wall clock time)
 
@@ -20,6 +24,8 @@ RECV_TIMEOUT = 60 # Max seconds for reply from agent (wall clock time)
 # (process.py) class for more details.
 
 class AgentProxyPlayer(Player):
+    # Client hosting the agent class
+    _Client = RemoteProcessClassClient
 
     def __init__(self, 
         name: str,
@@ -28,7 +34,9 @@ class AgentProxyPlayer(Player):
         time_limit: float | None, 
         space_limit: float | None, 
         log: LogStream=NullLogger(),
-        intercept_exc_type: Type[Exception]=PlayerException
+        intercept_exc_type: Type[Exception]=PlayerException,
+        transport: str=TRANSPORT_BINARY,
+        pool: AgentHostPool | None=None
     ):
         super().__init__(color)
 
@@ -37,11 +45,18 @@ class AgentProxyPlayer(Player):
         self.pkg, self._cls = agent_loc
         
         self._name = name
-        self.agent: RemoteProcessClassClient = RemoteProcessClassClient(
+        # Agents in subprocesses can be hosted by a pool of pre-forked hosts
+        # (see pool.py) instead
+        Client = self._Client
+        if pool is not None and Client is RemoteProcessClassClient:
+            Client = partial(PooledProcessClassClient, pool=pool)
+        self.agent: RemoteProcessClassClient | LocalClassClient
+        self.agent = Client(
             self.pkg, self._cls, 
             time_limit=time_limit, space_limit=space_limit, 
             recv_timeout=RECV_TIMEOUT, 
             log=log,
+            transport=transport,
             # Class constructor arguments
             color=color
         )
@@ -125,3 +140,13 @@ class AgentProxyPlayer(Player):
         else:
             space_str = "  space: unknown (check platform)\n"
         return f"resources usage status:\n{time_str}{space_str}"
+
+
+# The same player, but with the agent class run in the referee's own process,
+# on a thread of its own (see local.py), rather than in a subprocess. Games
+# start and run much faster, but the agent isn't sandboxed and its space usage
+# isn't limited, so only use it for trusted agents (e.g. for self-play
+# tournaments between the agents in this repository).
+
+class InProcessPlayer(AgentProxyPlayer):
+    _Client = LocalClassClient
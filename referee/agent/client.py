@@ -4,12 +4,15 @@
 import sys
 from asyncio import subprocess, wait_for
 from asyncio.subprocess import create_subprocess_exec, Process
-from asyncio.exceptions import TimeoutError as AIOTimeoutError
+from asyncio.exceptions import TimeoutError as AIOTimeoutError, \
+    IncompleteReadError
 from typing import Any
 
 from ..log import NullLogger, LogStream
 from .resources import ResourceLimitException
-from .io import AsyncProcessStatus, m_pickle, m_unpickle,\
+from .io import AsyncProcessStatus, m_pickle, m_unpickle, \
+    m_frame_call, m_unframe_header, m_unframe_body, TRANSPORT_BINARY, \
+    TRANSPORT_BASE64, _FRAME_HEADER, _MSG_EXC, \
     _SUBPROC_MODULE, _ACK, _REPLY_OK, _REPLY_EXC
 
 class WrappedProcessException(Exception):
@@ -17,7 +20,8 @@ class WrappedProcessException(Exception):
 
 # Context manager that wraps a class in a separate "sandbox" process. The class
 # is instantiated in the subprocess, and all calls to methods are forwarded to
-# the subprocess. Exceptions are also forwarded back to the parent process. 
+# the subprocess. Exceptions are also forwarded back to the parent process.
+# Messages are sent with the given transport (see io.py).
 
 class RemoteProcessClassClient:
 
@@ -27,12 +31,14 @@ class RemoteProcessClassClient:
         recv_timeout: float, # Hard timeout (s) for receiving a reply
         *cons_args, 
         log: LogStream=NullLogger(),
+        transport: str=TRANSPORT_BINARY,
         **cons_kwargs
     ):
         self.pkg = pkg
         self._cls = cls
         self._time_limit = time_limit
         self._space_limit = space_limit
+        self._transport = transport
         self._recv_timeout = recv_timeout
         self._log = log
         self._cons_args = cons_args
@@ -50,15 +56,35 @@ class RemoteProcessClassClient:
     def status(self) -> AsyncProcessStatus | None:
         return self._status
 
-    async def _recv_reply(self):
+    async def _read_reply(self) -> tuple[Any, ...]:
         assert self._proc is not None
         assert self._proc.stdout is not None
+        stdout = self._proc.stdout
+        if self._transport == TRANSPORT_BASE64:
+            line = await stdout.readline()
+            if not line:
+                raise EOFError("expected result, got EOF")
+            return m_unpickle(line)
+
+        try:
+            length, kind, status = m_unframe_header(
+                await stdout.readexactly(_FRAME_HEADER.size))
+            body = m_unframe_body(kind, await stdout.readexactly(length))
+        except IncompleteReadError as e:
+            raise EOFError("expected result, got EOF") from e
+        # Rebuild the reply tuple (status, arg0, arg1, ...) from the frame
+        if kind == _MSG_EXC:
+            return (status, _REPLY_EXC, *body)
+        return (status, _REPLY_OK, body)
+
+    async def _recv_reply(self):
+        assert self._proc is not None
         # Read reply from subprocess (with hard timeout)
         self._log.debug(
             f"waiting for reply from subprocess {self._proc.pid} (stdout)")
         try:
-            line = await wait_for(
-                self._proc.stdout.readline(),
+            reply = await wait_for(
+                self._read_reply(),
                 timeout=self._recv_timeout
             )
         except AIOTimeoutError as e:
@@ -71,10 +97,7 @@ class RemoteProcessClassClient:
                 f"({self._recv_timeout}s) exceeded"
             ) from e
 
-        if not line:
-            raise EOFError("expected result, got EOF")
-
-        return await self._process_reply(m_unpickle(line))
+        return await self._process_reply(reply)
 
     async def _process_reply(self, reply: tuple[Any, ...]):
         assert self._proc is not None
@@ -115,19 +138,27 @@ class RemoteProcessClassClient:
         await self._proc.wait()
         self._killed = True
 
-    async def __aenter__(self):
-        # Start subprocess
-        self._proc = await create_subprocess_exec(
+    def _config(self) -> tuple:
+        # The class/constructor arguments, as passed to the subprocess
+        return (
+            self.pkg, self._cls,
+            self._time_limit, self._space_limit,
+            self._cons_args, 
+            self._cons_kwargs
+        )
+
+    async def _start(self) -> Process:
+        return await create_subprocess_exec(
             sys.executable, "-m", _SUBPROC_MODULE,
-            m_pickle((
-                self.pkg, self._cls,
-                self._time_limit, self._space_limit,
-                self._cons_args, 
-                self._cons_kwargs
-            )),
+            m_pickle(self._config()),
+            self._transport,
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE
         )
+
+    async def __aenter__(self):
+        # Start subprocess
+        self._proc = await self._start()
         assert self._proc is not None
         assert self._proc.stdin is not None
         self._log.debug(f"subprocess {self._proc.pid} started")
@@ -179,7 +210,10 @@ class RemoteProcessClassClient:
                 f"send method call request to subprocess "
                 f"{self._proc.pid} (stdin)"
             )
-            self._proc.stdin.write(m_pickle((name, args, kwargs)))
+            if self._transport == TRANSPORT_BASE64:
+                self._proc.stdin.write(m_pickle((name, args, kwargs)))
+            else:
+                self._proc.stdin.write(m_frame_call(name, args, kwargs))
             return await self._recv_reply()
 
         return call
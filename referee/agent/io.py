@@ -4,16 +4,47 @@
 import binascii
 from contextlib import contextmanager
 import pickle
+import struct
 from dataclasses import dataclass
 from binascii import b2a_base64, a2b_base64
 from typing import Any
 
+from ..game import PlayerColor, SpawnAction, SpreadAction
+from ..game.bitboard import action_move, move_action
+
 
 _SUBPROC_MODULE = "referee.agent.subprocess"
 _ACK = "ACK"
 _REPLY_OK = b"OK"
 _REPLY_EXC = b"EXC"
 
+# Transports for messages between the referee and agent subprocesses:
+# - "binary": each message is a fixed header followed by a raw pickle
+#   (protocol 5) body of the length given in the header. The header holds the
+#   body length, the message type, and the fields of an AsyncProcessStatus (the
+#   status of the subprocess, zero in requests to it).
+# - "base64": each message is a pickle, base64 encoded on a line of its own.
+#   Slower, but kept as a fallback.
+#
+# With the binary transport, actions (the bulk of the messages in a game) are
+# sent as their move id (see bitboard.py) rather than pickled: an action()
+# result as a message of type _MSG_ACTION, and a turn(color, action) call as
+# one of type _MSG_TURN. They are decoded to the interned action objects.
+TRANSPORT_BINARY = "binary"
+TRANSPORT_BASE64 = "base64"
+TRANSPORTS = (TRANSPORT_BINARY, TRANSPORT_BASE64)
+
+# Binary message types
+_MSG_CALL = 0
+_MSG_OK = 1
+_MSG_EXC = 2
+_MSG_ACTION = 3
+_MSG_TURN = 4
+
+_FRAME_HEADER = struct.Struct("<IBdd?dd")
+_ACTION_BODY = struct.Struct("<H")  # move id
+_TURN_BODY = struct.Struct("<BH")   # player index, move id
+
 
 class InterchangeException(Exception):
     pass
@@ -28,6 +59,9 @@ class AsyncProcessStatus:
     space_peak: float
 
 
+_NO_STATUS = AsyncProcessStatus(0, 0, False, 0, 0)
+
+
 @contextmanager
 def catch_exceptions(op: str, data: Any):
     try:
@@ -46,3 +80,51 @@ def m_pickle(o: Any) -> bytes:
 def m_unpickle(b: bytes) -> Any:
     with catch_exceptions("unpickle", b):
         return pickle.loads(a2b_base64(b))
+
+def _action_move(o: Any) -> int | None:
+    # The move id of an action, or None if it isn't one
+    if isinstance(o, (SpawnAction, SpreadAction)):
+        try:
+            return action_move(o)
+        except ValueError:
+            pass
+    return None
+
+def _pack_frame(kind: int, body: bytes, status: AsyncProcessStatus) -> bytes:
+    return _FRAME_HEADER.pack(
+        len(body), kind,
+        status.time_delta, status.time_used,
+        status.space_known, status.space_curr, status.space_peak,
+    ) + body
+
+def m_frame(kind: int, o: Any, status: AsyncProcessStatus=_NO_STATUS) -> bytes:
+    with catch_exceptions("pickle", o):
+        body = pickle.dumps(o, protocol=5)
+    return _pack_frame(kind, body, status)
+
+def m_frame_call(name: str, args: tuple, kwargs: dict) -> bytes:
+    if name == "turn" and len(args) == 2 and not kwargs \
+            and isinstance(args[0], PlayerColor) \
+            and (move := _action_move(args[1])) is not None:
+        return _pack_frame(
+            _MSG_TURN, _TURN_BODY.pack(args[0].value, move), _NO_STATUS)
+    return m_frame(_MSG_CALL, (name, args, kwargs))
+
+def m_frame_result(result: Any, status: AsyncProcessStatus) -> bytes:
+    move = _action_move(result)
+    if move is not None:
+        return _pack_frame(_MSG_ACTION, _ACTION_BODY.pack(move), status)
+    return m_frame(_MSG_OK, result, status)
+
+def m_unframe_header(b: bytes) -> tuple[int, int, AsyncProcessStatus]:
+    length, kind, *status = _FRAME_HEADER.unpack(b)
+    return length, kind, AsyncProcessStatus(*status)
+
+def m_unframe_body(kind: int, b: bytes) -> Any:
+    if kind == _MSG_ACTION:
+        return move_action(_ACTION_BODY.unpack(b)[0])
+    if kind == _MSG_TURN:
+        color, move = _TURN_BODY.unpack(b)
+        return "turn", (PlayerColor(color), move_action(move)), {}
+    with catch_exceptions("unpickle", b):
+        return pickle.loads(b)
@@ -0,0 +1,213 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+import os
+import sys
+import time
+from asyncio import wait_for, wrap_future
+from asyncio.exceptions import TimeoutError as AIOTimeoutError
+from concurrent.futures import Future
+from importlib import import_module
+from queue import SimpleQueue
+from threading import Thread, local
+from traceback import format_exc
+from typing import Any, Callable
+
+from ..log import NullLogger, LogStream
+from .client import WrappedProcessException
+from .resources import CountdownTimer, ResourceLimitException
+from .io import AsyncProcessStatus
+
+# Context manager that hosts a class in the referee's own process, as a faster
+# (but unsandboxed) alternative to RemoteProcessClassClient with the same
+# interface. The class is instantiated, and its methods called, on a worker
+# thread of its own, so the event loop keeps running while the agent thinks.
+# Each call is timed with the CPU clock of that thread (time.thread_time), so
+# the time of the referee and of other agents is not charged to it.
+#
+# There is no sandbox: the agent shares the referee's memory, so its space
+# usage cannot be measured (and a space limit is not enforced). A call that
+# doesn't return within recv_timeout fails as it would in a subprocess, but
+# the thread can't be killed: it is a daemon thread, left to run until the
+# referee exits.
+
+_thread_state = local()
+
+
+class _AgentStdout:
+    """
+    Stands in for sys.stdout while agents run in-process. Output from agent
+    threads goes to stderr (as it does from agent subprocesses), and output
+    from any other thread to the original stdout. Installed while any client
+    is active, and the original restored once the last one exits.
+    """
+
+    _clients = 0
+
+    def __init__(self, stdout):
+        self._stdout = stdout
+
+    @classmethod
+    def install(cls):
+        if cls._clients == 0:
+            sys.stdout = cls(sys.stdout)
+        cls._clients += 1
+
+    @classmethod
+    def uninstall(cls):
+        cls._clients -= 1
+        if cls._clients == 0 and isinstance(sys.stdout, cls):
+            sys.stdout = sys.stdout._stdout
+
+    def __getattr__(self, name):
+        if getattr(_thread_state, "agent", False):
+            return getattr(sys.stderr, name)
+        return getattr(self._stdout, name)
+
+
+class LocalClassClient:
+
+    def __init__(self,
+        pkg: str, cls: str,
+        time_limit: float | None, space_limit: float | None,
+        recv_timeout: float, # Hard timeout (s) for receiving a reply
+        *cons_args,
+        log: LogStream=NullLogger(),
+        transport: str | None=None, # Unused: no messages are sent
+        **cons_kwargs
+    ):
+        self.pkg = pkg
+        self._cls = cls
+        self._time_limit = time_limit
+        self._recv_timeout = recv_timeout
+        self._log = log
+        self._cons_args = cons_args
+        self._cons_kwargs = cons_kwargs
+        self._timer = CountdownTimer(time_limit, clock=time.thread_time)
+        self._jobs: SimpleQueue = SimpleQueue()
+        self._thread: Thread | None = None
+        self._instance: Any = None
+        self._status: AsyncProcessStatus | None = None
+        if space_limit:
+            log.warning("space limit is not enforced for in-process agents")
+
+    @property
+    def pid(self) -> int:
+        return os.getpid()
+
+    @property
+    def status(self) -> AsyncProcessStatus | None:
+        return self._status
+
+    def _referee(self) -> dict:
+        time_limit = self._time_limit
+        return {
+            "time_remaining": time_limit - self._timer.total()
+                if time_limit else None,
+            "space_remaining": None,
+            "space_limit": None,
+        }
+
+    def _serve(self):
+        # Worker thread loop: run each job queued until None
+        _thread_state.agent = True
+        while (job := self._jobs.get()) is not None:
+            future, method, args, kwargs = job
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self._call(method, *args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+    def _call(self, method: Callable, *args, **kwargs) -> Any:
+        # Runs on the worker thread
+        try:
+            with self._timer:
+                return method(*args, **{**kwargs, **self._referee()})
+        except ResourceLimitException:
+            raise
+        except Exception as e:
+            raise WrappedProcessException(
+                f"exception in agent thread: {self._thread.name}\n",
+                {
+                    "exception_type": e.__class__.__name__,
+                    "exception_msg": str(e),
+                    "stacktrace_str": format_exc(),
+                }
+            )
+        finally:
+            self._status = AsyncProcessStatus(
+                time_delta=self._timer.delta(),
+                time_used=self._timer.total(),
+                space_known=False,
+                space_curr=0,
+                space_peak=0,
+            )
+
+    async def _run(self, method: Callable, *args, **kwargs) -> Any:
+        future = Future()
+        self._jobs.put((future, method, args, kwargs))
+        try:
+            return await wait_for(
+                wrap_future(future),
+                timeout=self._recv_timeout
+            )
+        except AIOTimeoutError as e:
+            self._log.debug(
+                f"reply not received within {self._recv_timeout}s!")
+            raise ResourceLimitException(
+                f"agent thread reply time limit "
+                f"({self._recv_timeout}s) exceeded"
+            ) from e
+
+    def _construct(self, *args, **kwargs) -> Any:
+        Cls = getattr(import_module(self.pkg), self._cls)
+        return Cls(*args, **kwargs)
+
+    async def __aenter__(self):
+        _AgentStdout.install()
+        self._thread = Thread(
+            target=self._serve, name=f"{self.pkg}:{self._cls}", daemon=True)
+        self._thread.start()
+        self._log.debug(f"agent thread {self._thread.name} started")
+
+        self._log.debug(
+            f"initialising class '{self.pkg}:{self._cls}' "
+            f"on agent thread {self._thread.name}"
+        )
+        try:
+            self._instance = await self._run(
+                self._construct, *self._cons_args, **self._cons_kwargs)
+        except:
+            self._log.debug(
+                f"exception occured during construction of class"
+            )
+            self._jobs.put(None)
+            _AgentStdout.uninstall()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self._log.debug(f"an exception occured!")
+
+        # End the worker thread once it has finished its current job (if any)
+        self._jobs.put(None)
+        self._instance = None
+        _AgentStdout.uninstall()
+
+    # Support "transparent" method calls on the class instance
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            assert self._instance is not None
+            self._log.debug(
+                f"send method call request to agent thread "
+                f"{self._thread.name}"
+            )
+            return await self._run(
+                getattr(self._instance, name), *args, **kwargs)
+
+        return call
@@ -0,0 +1,178 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+import gc
+import multiprocessing
+import socket
+import sys
+from threading import Lock
+from asyncio import get_running_loop, open_connection, wait, Future, \
+    StreamReader, StreamWriter
+from multiprocessing.process import BaseProcess
+from typing import Iterable
+
+from .client import RemoteProcessClassClient
+from .io import m_frame, m_unframe_header, m_unframe_body, \
+    TRANSPORT_BINARY, _FRAME_HEADER, _MSG_CALL, _SUBPROC_MODULE
+
+# A pool of pre-forked agent host processes, as a faster alternative to
+# starting a new Python interpreter for every agent in every game. Hosts are
+# forked from a template process (a multiprocessing fork server) that has
+# already imported the referee and the agent packages, so a host starts
+# without paying for interpreter startup or those imports. Each host then
+# waits on a socket for the class/constructor arguments of one agent, and
+# serves it exactly as an agent subprocess would (see subprocess.py), until
+# the end of the game.
+#
+# A host serves a single agent in a single game, so every game gets a fresh
+# Agent instance, fresh resource counters and fresh module state. The pool
+# keeps `size` idle hosts forked ahead of time, forking a replacement whenever
+# one is taken. Note that space usage is measured from the size of the host
+# when the agent is constructed, so the preloaded agent packages are not
+# counted against the space limit (as their import would be in a subprocess).
+
+
+def _host(sock: socket.socket):
+    # Entry point of a forked agent host. The standard streams are overridden
+    # as in an agent subprocess, and an EOF before any arguments ends the host.
+    # (subprocess.py is imported here, not at the top, as it is also run as a
+    # module of its own; the template has imported it already.)
+    from .subprocess import serve, override_stdio
+    override_stdio()
+    # Leave the objects inherited from the template out of garbage collection
+    # (the referee collects before every call), so collections stay as quick
+    # as in a new subprocess and don't copy the template's pages
+    gc.freeze()
+    in_buffer = sock.makefile("rb")
+    out_buffer = sock.makefile("wb")
+    header = in_buffer.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return
+    length, kind, _ = m_unframe_header(header)
+    config = m_unframe_body(kind, in_buffer.read(length))
+    serve(in_buffer, out_buffer, TRANSPORT_BINARY, *config)
+
+
+class AgentHostPool:
+    """
+    Pre-forked agent hosts, forked from a template that has imported the given
+    agent packages. Use as a context manager (or call close()) so that idle
+    hosts are ended when the pool is no longer needed.
+    """
+
+    def __init__(self, packages: Iterable[str]=(), size: int=2):
+        self._context = multiprocessing.get_context("forkserver")
+        self._context.set_forkserver_preload(
+            [_SUBPROC_MODULE, __name__, *packages])
+        self._size = size
+        self._idle: list[tuple[BaseProcess, socket.socket]] = []
+        self._lock = Lock()
+
+    def _fork(self) -> tuple[BaseProcess, socket.socket]:
+        sock, host_sock = socket.socketpair()
+        process = self._context.Process(target=_host, args=(host_sock,))
+        process.start()
+        host_sock.close()
+        return process, sock
+
+    def fill(self):
+        """
+        Fork hosts until the pool has `size` idle hosts.
+        """
+        with self._lock:
+            while len(self._idle) < self._size:
+                self._idle.append(self._fork())
+
+    def take(self) -> tuple[BaseProcess, socket.socket]:
+        """
+        Take an idle host (forking one if there is none), as its process and
+        the socket to talk to it through.
+        """
+        with self._lock:
+            if not self._idle:
+                return self._fork()
+            return self._idle.pop(0)
+
+    def close(self):
+        """
+        End the idle hosts.
+        """
+        with self._lock:
+            for process, sock in self._idle:
+                sock.close()
+                process.join()
+            self._idle.clear()
+
+    def __enter__(self) -> 'AgentHostPool':
+        self.fill()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _HostProcess:
+    """
+    A forked agent host, with the parts of the interface of an asyncio
+    subprocess that RemoteProcessClassClient uses.
+    """
+
+    def __init__(self,
+        process: BaseProcess, reader: StreamReader, writer: StreamWriter
+    ):
+        self._process = process
+        self.stdout = reader
+        self.stdin = writer
+
+    @property
+    def pid(self) -> int | None:
+        return self._process.pid
+
+    @property
+    def returncode(self) -> int | None:
+        return self._process.exitcode
+
+    def kill(self):
+        self._process.kill()
+
+    async def wait(self) -> int | None:
+        await get_running_loop().run_in_executor(None, self._process.join)
+        self.stdin.close()
+        return self._process.exitcode
+
+
+# RemoteProcessClassClient, but with the class hosted by a host taken from a
+# pool rather than by a new subprocess. Messages always use the binary
+# transport.
+
+class PooledProcessClassClient(RemoteProcessClassClient):
+
+    def __init__(self, *args, pool: AgentHostPool, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pool = pool
+        self._transport = TRANSPORT_BINARY
+        self._fill: Future | None = None
+
+    async def _start(self) -> _HostProcess: # type: ignore[override]
+        process, sock = self._pool.take()
+        reader, writer = await open_connection(sock=sock)
+        writer.write(m_frame(_MSG_CALL, self._config()))
+        # Fork a replacement on another thread, while the agent is constructed
+        self._fill = get_running_loop().run_in_executor(None, self._pool.fill)
+        self._fill.add_done_callback(self._filled)
+        return _HostProcess(process, reader, writer)
+
+    def _filled(self, fill: Future):
+        # A failed fork only leaves the pool short (take() forks on demand),
+        # so it is logged rather than raised in the middle of a game
+        if not fill.cancelled() and fill.exception() is not None:
+            self._log.warning(
+                f"failed to fork a replacement agent host: {fill.exception()!r}")
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await super().__aexit__(exc_type, exc_val, exc_tb)
+        finally:
+            # Don't leave the replacement forking past the end of the game
+            if self._fill is not None:
+                await wait([self._fill])
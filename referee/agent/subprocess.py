@@ -5,20 +5,20 @@ import sys
 from contextlib import contextmanager
 from importlib import import_module
 from traceback import format_exc
-from typing import Any
+from typing import Any, BinaryIO
 
 from .resources import CountdownTimer, MemoryWatcher, set_space_line
-from .io import AsyncProcessStatus, m_pickle, m_unpickle,\
-    _ACK, _REPLY_OK, _REPLY_EXC
+from .io import AsyncProcessStatus, m_pickle, m_unpickle, m_frame, \
+    m_frame_result, m_unframe_header, m_unframe_body, TRANSPORT_BASE64, \
+    _FRAME_HEADER, _MSG_EXC, _ACK, _REPLY_OK, _REPLY_EXC
 
 _STDOUT_OVERRIDE_MESSAGE = "stdout usage is not allowed in agent (use stderr)"
 _STDIN_OVERRIDE_MESSAGE = "stdin usage is not allowed in agent"
 
-# Wrapper subprocess entry point
-def main():
-    in_stream = sys.stdin
-    out_stream = sys.stdout
-
+# Keep agent code off the standard streams, which an agent subprocess uses for
+# data interchange with the parent process (and which a pre-forked agent host
+# inherits from the referee, see pool.py)
+def override_stdio():
     # Redirect stdout to stderr (debugging purposes). This allows for seamless
     # use of print() in the subprocess without interruping data interchange
     # with the parent process.
@@ -47,20 +47,37 @@ def main():
         def readlines(self, *args, **kwargs):
             raise RuntimeError(_STDIN_OVERRIDE_MESSAGE)
 
+        # multiprocessing closes stdin in every process it starts
+        def close(self):
+            pass
+
     sys.__stdin__ = _StdinOverride()
     sys.stdin = _StdinOverride()
 
-    # Utils
-    def _s_unpickle(s: str) -> Any:
-        return m_unpickle(bytes(s, "ascii"))
 
-    def _s_pickle(o: Any) -> str:
-        return m_pickle(o).decode("ascii")
+# Wrapper subprocess entry point
+def main():
+    in_stream = sys.stdin
+    out_stream = sys.stdout
+
+    override_stdio()
+
+    # Command line arguments are the class/constructor arguments, and the
+    # transport
+    config = m_unpickle(bytes(sys.argv[1], "ascii"))
+    transport = sys.argv[2] if len(sys.argv) > 2 else TRANSPORT_BASE64
+    serve(in_stream.buffer, out_stream.buffer, transport, *config)
 
-    # Command line arguments are the class/constructor arguments
-    cls_module, cls_name, time_limit, space_limit, cons_args, cons_kwargs \
-        = _s_unpickle(sys.argv[1])
 
+# Host a class instance, constructing it and then serving method calls read
+# from in_buffer (replying on out_buffer) until EOF. Used both by agent
+# subprocesses and by pre-forked agent hosts (see pool.py).
+def serve(
+    in_buffer: BinaryIO, out_buffer: BinaryIO, transport: str,
+    cls_module: str, cls_name: str,
+    time_limit: float, space_limit: float,
+    cons_args: tuple, cons_kwargs: dict
+):
     # Create some context managers for resource tracking
     timer = CountdownTimer(time_limit)
     space = MemoryWatcher(space_limit)
@@ -88,15 +105,30 @@ def main():
 
     # Comms functions
     def _recv() -> Any:
-        line = in_stream.readline()
-        if not line: # EOF, process should exit (see __aexit__ above)
+        if transport == TRANSPORT_BASE64:
+            line = in_buffer.readline()
+            if not line: # EOF, process should exit (see __aexit__ above)
+                exit(0)
+            return m_unpickle(line)
+
+        header = in_buffer.read(_FRAME_HEADER.size)
+        if len(header) < _FRAME_HEADER.size: # EOF, as above
             exit(0)
-        return _s_unpickle(line)
+        length, kind, _ = m_unframe_header(header)
+        return m_unframe_body(kind, in_buffer.read(length))
 
     def _reply(*args: Any):
         # Reply is a tuple of (status, arg0, arg1, ...)
-        out_stream.write(_s_pickle((_get_status(), *args)))
-        out_stream.flush()
+        if transport == TRANSPORT_BASE64:
+            frame = m_pickle((_get_status(), *args))
+        # The status goes in the header, and the reply type in its message
+        # type, leaving the result (or the exception and stack trace) as body
+        elif args[0] == _REPLY_OK:
+            frame = m_frame_result(args[1], _get_status())
+        else:
+            frame = m_frame(_MSG_EXC, args[1:], _get_status())
+        out_buffer.write(frame)
+        out_buffer.flush()
 
     @contextmanager
     def _relay_exceptions():
@@ -6,10 +6,13 @@ from dataclasses import dataclass
 from typing import AsyncGenerator
 
 from .constants import *
-from .hex import HexPos, HexDir
+from .hex import HexPos, HexDir, HEX_POSITIONS
 from .player import Player
 from .board import Board, PlayerColor
-from .actions import Action, SpawnAction, SpreadAction
+from .bitboard import BitBoard
+from .attacks import AttackBoard
+from .actions import Action, SpawnAction, SpreadAction, \
+    SPAWN_ACTIONS, SPREAD_ACTIONS
 from .exceptions import PlayerException, IllegalActionException
 import csv
 import os
@@ -94,8 +97,8 @@ async def game(
                 # Each loop iteration is a turn.
                 while True:
                     # Get the current player.
-                    turn_color: PlayerColor = board._turn_color
-                    player: Player = players[board._turn_color]
+                    turn_color: PlayerColor = board.turn_color
+                    player: Player = players[board.turn_color]
 
                     opp_color = PlayerColor.BLUE if turn_color == turn_color.RED else PlayerColor.RED
                     opp = players[opp_color]
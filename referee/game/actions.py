@@ -3,31 +3,87 @@
 
 from dataclasses import dataclass
 
-from .hex import HexPos, HexDir
+from .hex import HexPos, HexDir, HEX_POSITIONS
+from .constants import BOARD_N
 
 
 # Here we define dataclasses for the two possible actions that a player can
 # make. See the `hex.py` file for the definition of the `HexPos` and `HexDir`.
 # If you are unfamiliar with dataclasses, see the relevant Python docs here:
-# https://docs.python.org/3/library/dataclasses.html 
+# https://docs.python.org/3/library/dataclasses.html
+#
+# Like HexPos, actions on valid positions/directions are interned: there is one
+# SpawnAction per cell (SPAWN_ACTIONS, indexed by r * BOARD_N + q) and one
+# SpreadAction per cell and direction (SPREAD_ACTIONS, indexed by
+# cell index * 6 + the direction's position in HexDir). Constructing an action
+# returns the cached instance, and equality/hashing are by identity. Actions with
+# invalid arguments are still created as ordinary instances, so that the referee
+# can report them as illegal.
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, init=False)
 class SpawnAction():
     cell: HexPos
 
+    def __new__(cls, cell: HexPos) -> 'SpawnAction':
+        if type(cell) is HexPos:
+            return SPAWN_ACTIONS[cell.r * BOARD_N + cell.q]
+        return _make_action(cls, cell=cell)
+
+    __init__ = object.__init__
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __reduce__(self):
+        return (SpawnAction, (self.cell,))
+
     def __str__(self) -> str:
         return f"SPAWN({self.cell.r}, {self.cell.q})"
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(frozen=True, slots=True, init=False)
 class SpreadAction():
     cell: HexPos
     direction: HexDir
 
+    def __new__(cls, cell: HexPos, direction: HexDir) -> 'SpreadAction':
+        if type(cell) is HexPos and type(direction) is HexDir:
+            return SPREAD_ACTIONS[
+                (cell.r * BOARD_N + cell.q) * len(_DIRECTIONS) +
+                _DIRECTIONS.index(direction)
+            ]
+        return _make_action(cls, cell=cell, direction=direction)
+
+    __init__ = object.__init__
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __reduce__(self):
+        return (SpreadAction, (self.cell, self.direction))
+
     def __str__(self) -> str:
         return f"SPREAD({self.cell.r}, {self.cell.q}, " + \
                f"{self.direction.r}, {self.direction.q})"
 
 
 Action = SpawnAction | SpreadAction
+
+
+_DIRECTIONS: list[HexDir] = list(HexDir)
+
+
+def _make_action(cls, **fields):
+    action = object.__new__(cls)
+    for name, value in fields.items():
+        object.__setattr__(action, name, value)
+    return action
+
+
+SPAWN_ACTIONS: tuple[SpawnAction, ...] = tuple(
+    _make_action(SpawnAction, cell=cell) for cell in HEX_POSITIONS
+)
+
+SPREAD_ACTIONS: tuple[SpreadAction, ...] = tuple(
+    _make_action(SpreadAction, cell=cell, direction=direction)
+    for cell in HEX_POSITIONS for direction in _DIRECTIONS
+)
@@ -0,0 +1,139 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from .player import PlayerColor
+from .bitboard import BitBoard, iter_bits
+from .rays import REACH_MASKS
+from .constants import *
+
+
+# The AttackBoard is a BitBoard which also keeps an attack map: for each player,
+# the mask of cells it could spread onto. BitBoard.reach_mask computes this from
+# scratch by OR-ing the REACH_MASKS of every cell the player controls; here it
+# is kept up to date as moves are played and undone instead, so that reading it
+# is O(1). This suits searches that query it at every node.
+#
+# A union of masks can't be updated when one of them is removed, so for every
+# cell we count how many of the player's cells reach it. The counts are kept
+# "bit-sliced": ATTACK_PLANES masks per player, where plane k holds bit k of
+# every cell's count. Adding (or removing) a cell's reach mask is then a ripple
+# carry across the planes, and the attack map is the OR of the planes. A cell
+# can be reached from at most 6 * MAX_CELL_POWER = 36 cells, so 6 planes suffice.
+
+ATTACK_PLANES = 6
+
+
+def add_count(planes: list[int], start: int, mask: int):
+    """
+    Add one to the count of every cell in a mask, where the counts are stored as
+    bit planes from planes[start] (least significant) onwards.
+    """
+    i = start
+    while mask:
+        plane = planes[i]
+        planes[i] = plane ^ mask
+        mask &= plane
+        i += 1
+
+
+def sub_count(planes: list[int], start: int, mask: int):
+    """
+    Subtract one from the count of every cell in a mask (see add_count).
+    """
+    i = start
+    while mask:
+        plane = planes[i]
+        planes[i] = plane ^ mask
+        mask &= ~plane
+        i += 1
+
+
+class AttackBoard(BitBoard):
+    __slots__ = [
+        "_attacks",
+        "_attacks_history",
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self._attacks: list[int] = [0] * (2 * ATTACK_PLANES)
+        self._attacks_history: list[list[int]] = []
+
+    def copy(self) -> "AttackBoard":
+        """
+        Return a copy of the board and its attack map. The undo history is not
+        copied.
+        """
+        other = super().copy()
+        other._attacks = self._attacks[:]
+        other._attacks_history = []
+        return other
+
+    def place(self, index: int, color: PlayerColor | None, power: int):
+        """
+        Set the contents of a cell directly (see BitBoard.place), and rebuild
+        the attack map.
+        """
+        super().place(index, color, power)
+        attacks = self._attacks = [0] * (2 * ATTACK_PLANES)
+        for c in (0, 1):
+            for i in iter_bits(self._masks[c]):
+                add_count(
+                    attacks, c * ATTACK_PLANES, REACH_MASKS[i][self._powers[i]]
+                )
+
+    def spawn(self, index: int):
+        """
+        Spawn a token (see BitBoard.spawn), updating the attack map.
+        """
+        super().spawn(index)
+        self._update_attacks()
+
+    def spread(self, index: int, direction: int):
+        """
+        Spread a token stack (see BitBoard.spread), updating the attack map.
+        """
+        super().spread(index, direction)
+        self._update_attacks()
+
+    def undo(self):
+        """
+        Undo the last move played, restoring the attack map from before it.
+        """
+        super().undo()
+        self._attacks = self._attacks_history.pop()
+
+    def _update_attacks(self):
+        # Update the counts for the cells changed by the move just played, as
+        # recorded for undo: each loses its old reach (for its old owner) and
+        # gains its new one.
+        red_mask, _, _, _, _, changed = self._history[-1]
+        attacks = self._attacks
+        self._attacks_history.append(attacks[:])
+        powers = self._powers
+        new_red_mask = self._masks[0]
+        for index, old in changed:
+            new = powers[index]
+            bit = 1 << index
+            if old:
+                sub_count(attacks, 0 if red_mask & bit else ATTACK_PLANES,
+                          REACH_MASKS[index][old])
+            if new:
+                add_count(attacks, 0 if new_red_mask & bit else ATTACK_PLANES,
+                          REACH_MASKS[index][new])
+
+    def reach_mask(self, color: PlayerColor) -> int:
+        """
+        Return the mask of cells a player could spread onto.
+        """
+        start = color.value * ATTACK_PLANES
+        mask = 0
+        for plane in self._attacks[start:start + ATTACK_PLANES]:
+            mask |= plane
+        return mask
+
+    def is_attacked(self, index: int, color: PlayerColor) -> bool:
+        """
+        True iff the given player could spread onto the given cell.
+        """
+        return bool(self.reach_mask(color) >> index & 1)
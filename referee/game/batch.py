@@ -0,0 +1,116 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+
+from .player import PlayerColor
+from .bitboard import BitBoard
+from .rays import CELL_COUNT, REACH_MASKS
+from .constants import *
+
+
+# Batched board features for the agents' evaluation functions, computed with
+# NumPy for many boards at once (e.g. all children of a search node). This
+# module needs NumPy, so unlike the rest of the engine it is not imported by
+# the `referee.game` package itself; agents import it directly.
+#
+# A batch of N boards is stacked into an int8 array of shape (N, 2, CELL_COUNT)
+# holding two planes per board: the owner plane (+1 for RED, -1 for BLUE, 0 for
+# empty cells) and the power plane.
+
+OWNER_PLANE = 0
+POWER_PLANE = 1
+
+_SIGNS = {PlayerColor.RED: 1, PlayerColor.BLUE: -1}
+
+# REACH_MASKS as little-endian 64-bit integers, flattened so that the reach of
+# cell i with power p is _REACH_FLAT[_REACH_ROWS[i] + p]
+_REACH_FLAT = np.array(REACH_MASKS, dtype="<u8").ravel()
+_REACH_ROWS = np.arange(CELL_COUNT) * (MAX_CELL_POWER + 1)
+
+
+@dataclass(frozen=True, slots=True)
+class BatchFeatures:
+    """
+    Features of a batch of boards from one player's point of view, as arrays
+    with one entry per board. `opp_reach` is the mask (bit i for cell i) of
+    cells the opponent can spread onto, and `safety` the total power of the
+    player's cells outside it.
+    """
+    player_power: np.ndarray
+    opp_power: np.ndarray
+    player_cells: np.ndarray
+    opp_cells: np.ndarray
+    opp_reach: np.ndarray
+    safety: np.ndarray
+
+
+def stack_planes(
+    masks: Iterable[tuple[int, int]],
+    powers: Iterable[bytes]
+) -> np.ndarray:
+    """
+    Stack boards given by their (RED, BLUE) ownership masks and cell powers
+    (CELL_COUNT bytes each) into an array of owner and power planes.
+    """
+    masks = np.array(masks, dtype="<u8")
+    planes = np.empty((len(masks), 2, CELL_COUNT), dtype=np.int8)
+    bits = np.unpackbits(
+        masks.view(np.uint8).reshape(-1, 2, 8), axis=2, bitorder="little"
+    )[:, :, :CELL_COUNT].view(np.int8)
+    np.subtract(bits[:, 0], bits[:, 1], out=planes[:, OWNER_PLANE])
+    planes[:, POWER_PLANE] = np.frombuffer(
+        b"".join(powers), dtype=np.int8
+    ).reshape(-1, CELL_COUNT)
+    return planes
+
+
+def board_planes(boards: Iterable[BitBoard]) -> np.ndarray:
+    """
+    Stack boards into an array of owner and power planes.
+    """
+    boards = list(boards)
+    return stack_planes(
+        [b._masks for b in boards], [b._powers for b in boards]
+    )
+
+
+def batch_features(planes: np.ndarray, color: PlayerColor) -> BatchFeatures:
+    """
+    Compute the features of every board in a stack of planes, from the point
+    of view of the given player.
+    """
+    owners = planes[:, OWNER_PLANE]
+    powers = planes[:, POWER_PLANE]
+    sign = _SIGNS[color]
+    mine = owners == sign
+    theirs = owners == -sign
+
+    # OR together the reach of every opponent cell, then unpack the result
+    reach = _REACH_FLAT.take(_REACH_ROWS + powers)
+    reach *= theirs
+    opp_reach = np.bitwise_or.reduce(reach, axis=1)
+    reached = np.unpackbits(
+        opp_reach.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+    )[:, :CELL_COUNT]
+
+    # Sum the per-cell terms of all the features at once
+    terms = np.empty((len(planes), 5, CELL_COUNT), dtype=np.int16)
+    np.multiply(powers, mine, out=terms[:, 0])
+    np.multiply(powers, theirs, out=terms[:, 1])
+    terms[:, 2] = mine
+    terms[:, 3] = theirs
+    np.multiply(terms[:, 0], 1 - reached, out=terms[:, 4])
+    sums = terms.sum(axis=2)
+
+    return BatchFeatures(
+        player_power=sums[:, 0],
+        opp_power=sums[:, 1],
+        player_cells=sums[:, 2],
+        opp_cells=sums[:, 3],
+        opp_reach=opp_reach,
+        safety=sums[:, 4],
+    )
@@ -0,0 +1,411 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from random import Random
+
+from .hex import HexPos, HexDir, HEX_POSITIONS
+from .player import PlayerColor
+from .actions import Action, SPAWN_ACTIONS, SPREAD_ACTIONS
+from .rays import CELL_COUNT, DIRECTIONS, SPREAD_CELLS, REACH_MASKS
+from .constants import *
+
+
+# The BitBoard is a compact, mutable board engine shared by the referee and the
+# agents. Cells are identified by their index `r * BOARD_N + q`, and directions
+# by their position in the HexDir enum. Ownership is stored as one bitmask per
+# player (bit i set iff that player controls cell i), and the power of each cell
+# lives in a fixed-size bytearray (which is cheap to copy, or to hand to NumPy). Running power totals are maintained per player, so
+# that game-over checks never need to scan the board.
+#
+# Moves are also encoded as small integers: a spawn on cell i is move i, and a
+# spread from cell i in direction d is move CELL_COUNT + i * 6 + d. This gives
+# one id for each of the 343 distinct actions in the game.
+#
+# Each board also maintains a Zobrist hash of its position (cell contents and
+# player to move), updated incrementally by every move and restored on undo.
+
+MOVE_COUNT = CELL_COUNT + CELL_COUNT * len(HexDir)
+FULL_MASK  = (1 << CELL_COUNT) - 1
+
+_DIR_INDEX: dict[HexDir, int] = {d: i for i, d in enumerate(DIRECTIONS)}
+
+# The interned action for each move id, and the move id of each action.
+MOVE_ACTIONS: tuple[Action, ...] = SPAWN_ACTIONS + SPREAD_ACTIONS
+_ACTION_MOVES: dict[Action, int] = {a: m for m, a in enumerate(MOVE_ACTIONS)}
+_COLORS: tuple[PlayerColor, PlayerColor] = (PlayerColor.RED, PlayerColor.BLUE)
+
+
+# Zobrist keys: ZOBRIST_CELLS[color][index][power] for each cell content (the
+# key for power 0 is zero, so empty cells never contribute), and ZOBRIST_TURN
+# for BLUE to move. Keys are 63 bits so they fit in a signed 64-bit integer.
+_zobrist_rng = Random(30024)
+ZOBRIST_CELLS: list[list[list[int]]] = [
+    [
+        [0] + [_zobrist_rng.getrandbits(63) for _ in range(MAX_CELL_POWER)]
+        for _ in range(CELL_COUNT)
+    ]
+    for _ in PlayerColor
+]
+ZOBRIST_TURN: int = _zobrist_rng.getrandbits(63)
+
+
+def cell_index(cell: HexPos) -> int:
+    """
+    Return the index of a board position.
+    """
+    return cell.r * BOARD_N + cell.q
+
+
+def cell_pos(index: int) -> HexPos:
+    """
+    Return the board position of a cell index.
+    """
+    return HEX_POSITIONS[index]
+
+
+def dir_index(direction: HexDir) -> int:
+    """
+    Return the index of a direction.
+    """
+    return _DIR_INDEX[direction]
+
+
+def spawn_move(index: int) -> int:
+    """
+    Return the move id of a spawn on the given cell.
+    """
+    return index
+
+
+def spread_move(index: int, direction: int) -> int:
+    """
+    Return the move id of a spread from the given cell in the given direction.
+    """
+    return CELL_COUNT + index * len(DIRECTIONS) + direction
+
+
+def action_move(action: Action) -> int:
+    """
+    Return the move id of an action.
+    """
+    move = _ACTION_MOVES.get(action)
+    if move is None:
+        raise ValueError(f"Unknown action {action}")
+    return move
+
+
+def move_action(move: int) -> Action:
+    """
+    Return the action corresponding to a move id.
+    """
+    return MOVE_ACTIONS[move]
+
+
+def iter_bits(mask: int):
+    """
+    Yield the index of each set bit in a mask, lowest first.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitBoard:
+    __slots__ = [
+        "_powers",
+        "_masks",
+        "_color_power",
+        "_turn",
+        "_turn_count",
+        "_hash",
+        "_history",
+    ]
+
+    def __init__(self):
+        self._powers: bytearray = bytearray(CELL_COUNT)
+        self._masks: list[int] = [0, 0]
+        self._color_power: list[int] = [0, 0]
+        self._turn: int = PlayerColor.RED.value
+        self._turn_count: int = 0
+        self._hash: int = 0
+        self._history: list[tuple] = []
+
+    def copy(self) -> "BitBoard":
+        """
+        Return a copy of the board. The undo history is not copied.
+        """
+        other = self.__class__.__new__(self.__class__)
+        other._powers = self._powers[:]
+        other._masks = self._masks[:]
+        other._color_power = self._color_power[:]
+        other._turn = self._turn
+        other._turn_count = self._turn_count
+        other._hash = self._hash
+        other._history = []
+        return other
+
+    def place(self, index: int, color: PlayerColor | None, power: int):
+        """
+        Set the contents of a cell directly, e.g. to set up a position. This is
+        not a move: the turn is not advanced and it cannot be undone.
+        """
+        self._clear(index)
+        if color is not None and 0 < power <= MAX_CELL_POWER:
+            self._powers[index] = power
+            self._masks[color.value] |= 1 << index
+            self._color_power[color.value] += power
+            self._hash ^= ZOBRIST_CELLS[color.value][index][power]
+
+    def _clear(self, index: int):
+        bit = 1 << index
+        for c in (0, 1):
+            if self._masks[c] & bit:
+                self._masks[c] ^= bit
+                self._color_power[c] -= self._powers[index]
+                self._hash ^= ZOBRIST_CELLS[c][index][self._powers[index]]
+        self._powers[index] = 0
+
+    def owner(self, index: int) -> PlayerColor | None:
+        """
+        Return the player controlling a cell, or None if it is empty.
+        """
+        bit = 1 << index
+        if self._masks[0] & bit:
+            return _COLORS[0]
+        if self._masks[1] & bit:
+            return _COLORS[1]
+        return None
+
+    def power(self, index: int) -> int:
+        """
+        Return the power of a cell (0 if empty).
+        """
+        return self._powers[index]
+
+    def color_mask(self, color: PlayerColor) -> int:
+        """
+        Return the mask of cells controlled by a player.
+        """
+        return self._masks[color.value]
+
+    def color_power(self, color: PlayerColor) -> int:
+        """
+        Return the total power controlled by a player.
+        """
+        return self._color_power[color.value]
+
+    def color_cells(self, color: PlayerColor) -> list[int]:
+        """
+        Return the indices of the cells controlled by a player.
+        """
+        return list(iter_bits(self._masks[color.value]))
+
+    def reach_mask(self, color: PlayerColor) -> int:
+        """
+        Return the mask of cells a player could spread onto (in any direction,
+        from any of its cells).
+        """
+        powers = self._powers
+        mask = 0
+        for index in iter_bits(self._masks[color.value]):
+            mask |= REACH_MASKS[index][powers[index]]
+        return mask
+
+    @property
+    def empty_mask(self) -> int:
+        """
+        The mask of empty cells.
+        """
+        return FULL_MASK & ~(self._masks[0] | self._masks[1])
+
+    @property
+    def total_power(self) -> int:
+        """
+        The total power of all cells on the board.
+        """
+        return self._color_power[0] + self._color_power[1]
+
+    @property
+    def turn_color(self) -> PlayerColor:
+        """
+        The player (color) whose turn it is.
+        """
+        return _COLORS[self._turn]
+
+    @property
+    def turn_count(self) -> int:
+        """
+        The number of actions that have been played so far.
+        """
+        return self._turn_count
+
+    @property
+    def zobrist_key(self) -> int:
+        """
+        The Zobrist hash of the position (cells and player to move).
+        """
+        return self._hash
+
+    @property
+    def game_over(self) -> bool:
+        """
+        True iff the game is over.
+        """
+        if self._turn_count < 2:
+            return False
+
+        return self._turn_count >= MAX_TURNS \
+            or self._color_power[0] == 0 \
+            or self._color_power[1] == 0
+
+    @property
+    def winner_color(self) -> PlayerColor | None:
+        """
+        The player (color) who won the game, or None if no player has won.
+        """
+        if not self.game_over:
+            return None
+
+        red_power, blue_power = self._color_power
+        if abs(red_power - blue_power) < WIN_POWER_DIFF:
+            return None
+
+        return _COLORS[red_power < blue_power]
+
+    def can_spawn(self, index: int) -> bool:
+        """
+        True iff the player to move may spawn on the given cell.
+        """
+        return self._color_power[0] + self._color_power[1] < MAX_TOTAL_POWER \
+            and not (self._masks[0] | self._masks[1]) >> index & 1
+
+    def can_spread(self, index: int) -> bool:
+        """
+        True iff the player to move may spread from the given cell.
+        """
+        return bool(self._masks[self._turn] >> index & 1)
+
+    def legal_moves(self) -> list[int]:
+        """
+        Return the ids of all legal moves for the player to move: spreads
+        first, then spawns, each in cell order.
+        """
+        num_dirs = len(DIRECTIONS)
+        moves = [
+            CELL_COUNT + index * num_dirs + d
+            for index in iter_bits(self._masks[self._turn])
+            for d in range(num_dirs)
+        ]
+        if self._color_power[0] + self._color_power[1] < MAX_TOTAL_POWER:
+            moves.extend(iter_bits(self.empty_mask))
+        return moves
+
+    def legal_actions(self) -> list[Action]:
+        """
+        Return all legal actions for the player to move.
+        """
+        return [MOVE_ACTIONS[move] for move in self.legal_moves()]
+
+    def spawn(self, index: int):
+        """
+        Spawn a token for the player to move on the given (empty) cell. No
+        legality checks are performed.
+        """
+        color = self._turn
+        self._history.append((
+            self._masks[0], self._masks[1],
+            self._color_power[0], self._color_power[1],
+            self._hash, ((index, self._powers[index]),),
+        ))
+        self._powers[index] = 1
+        self._masks[color] |= 1 << index
+        self._color_power[color] += 1
+        self._hash ^= ZOBRIST_CELLS[color][index][1] ^ ZOBRIST_TURN
+        self._turn = 1 - color
+        self._turn_count += 1
+
+    def spread(self, index: int, direction: int):
+        """
+        Spread the token stack on the given cell (controlled by the player to
+        move) in the given direction. No legality checks are performed.
+        """
+        color = self._turn
+        other = 1 - color
+        powers = self._powers
+        masks = self._masks
+        color_power = self._color_power
+        power = powers[index]
+
+        changed = [(index, power)]
+        self._history.append((
+            masks[0], masks[1], color_power[0], color_power[1],
+            self._hash, changed
+        ))
+
+        my_keys = ZOBRIST_CELLS[color]
+        their_keys = ZOBRIST_CELLS[other]
+        mine = masks[color] & ~(1 << index)
+        theirs = masks[other]
+        gained = -power
+        lost = 0
+        key = self._hash ^ my_keys[index][power] ^ ZOBRIST_TURN
+        powers[index] = 0
+
+        for to in SPREAD_CELLS[index][direction][power]:
+            prev = powers[to]
+            changed.append((to, prev))
+            bit = 1 << to
+            if theirs & bit:
+                theirs ^= bit
+                lost += prev
+                gained += prev
+                key ^= their_keys[to][prev]
+            else:
+                key ^= my_keys[to][prev]
+            if prev == MAX_CELL_POWER:
+                powers[to] = 0
+                mine &= ~bit
+                gained -= prev
+            else:
+                powers[to] = prev + 1
+                mine |= bit
+                gained += 1
+                key ^= my_keys[to][prev + 1]
+
+        masks[color] = mine
+        masks[other] = theirs
+        color_power[color] += gained
+        color_power[other] -= lost
+        self._hash = key
+        self._turn = other
+        self._turn_count += 1
+
+    def play(self, move: int):
+        """
+        Play a move given by its id. No legality checks are performed.
+        """
+        if move < CELL_COUNT:
+            self.spawn(move)
+        else:
+            index, direction = divmod(move - CELL_COUNT, len(DIRECTIONS))
+            self.spread(index, direction)
+
+    def undo(self):
+        """
+        Undo the last move played. Throws an IndexError if no moves have been
+        played.
+        """
+        if len(self._history) == 0:
+            raise IndexError("No moves to undo.")
+
+        red_mask, blue_mask, red_power, blue_power, self._hash, changed = \
+            self._history.pop()
+        self._masks[0] = red_mask
+        self._masks[1] = blue_mask
+        self._color_power[0] = red_power
+        self._color_power[1] = blue_power
+        for index, power in changed:
+            self._powers[index] = power
+        self._turn = 1 - self._turn
+        self._turn_count -= 1
@@ -1,12 +1,13 @@
 # COMP30024 Artificial Intelligence, Semester 1 2023
 # Project Part B: Game Playing Agent
 
-from collections import defaultdict
 from dataclasses import dataclass
 
 from .hex import HexPos, HexDir
 from .player import PlayerColor
 from .actions import Action, SpawnAction, SpreadAction
+from .bitboard import BitBoard, cell_index, cell_pos, dir_index
+from .rays import SPREAD_CELLS
 from .exceptions import IllegalActionException
 from .constants import *
 
@@ -63,20 +64,22 @@ class BoardMutation:
 # the game. Don't assume this class is an "ideal" board representation for your
 # own agent; you should think carefully about how to design data structures for
 # representing the state of a game with respect to your chosen strategy. 
+#
+# The cell contents themselves are held in a BitBoard (see bitboard.py), which
+# is the same engine the agents use for search. This class adds validation and
+# a history of cell mutations on top of it.
 
 class Board:
     __slots__ = [
         "_mutable", 
-        "_state", 
-        "_turn_color", 
+        "_bits", 
         "_history"
     ]
 
     def __init__(self, initial_state: dict[HexPos, CellState]={}):
-        self._state: dict[HexPos, CellState] = \
-            defaultdict(lambda: CellState(None, 0))
-        self._state.update(initial_state)
-        self._turn_color: PlayerColor = PlayerColor.RED
+        self._bits: BitBoard = BitBoard()
+        for cell, state in initial_state.items():
+            self._bits.place(cell_index(cell), state.player, state.power)
         self._history: list[BoardMutation] = []
 
     def __getitem__(self, cell: HexPos) -> CellState:
@@ -85,7 +88,15 @@ class Board:
         """
         if not self._within_bounds(cell):
             raise IndexError(f"Cell position '{cell}' is invalid.")
-        return self._state[cell]
+        index = cell_index(cell)
+        return CellState(self._bits.owner(index), self._bits.power(index))
+
+    @property
+    def bits(self) -> BitBoard:
+        """
+        The underlying board engine.
+        """
+        return self._bits
 
     def apply_action(self, action: Action):
         """
@@ -95,17 +106,16 @@ class Board:
         match action:
             case SpawnAction():
                 res_action = self._resolve_spawn_action(action)
+                self._bits.spawn(cell_index(action.cell))
             case SpreadAction():
                 res_action = self._resolve_spread_action(action)
+                self._bits.spread(
+                    cell_index(action.cell), dir_index(action.direction))
             case _:
                 raise IllegalActionException(
-                    f"Unknown action {action}", self._turn_color)
-
-        for mutation in res_action.cell_mutations:
-            self._state[mutation.cell] = mutation.next
+                    f"Unknown action {action}", self.turn_color)
 
         self._history.append(res_action)
-        self._turn_color = self._turn_color.opponent
 
     def undo_action(self):
         """
@@ -115,10 +125,8 @@ class Board:
         if len(self._history) == 0:
             raise IndexError("No actions to undo.")
 
-        action: BoardMutation = self._history.pop()
-        for mutation in action.cell_mutations:
-            self._state[mutation.cell] = mutation.prev
-        self._turn_color = self._turn_color.opponent
+        self._history.pop()
+        self._bits.undo()
 
     def render(self, use_color: bool=False, use_unicode: bool=False) -> str:
         """
@@ -145,7 +153,7 @@ class Board:
                 r = max((dim - 1) - row, 0) + col
                 q = max(row - (dim - 1), 0) + col
                 if self._cell_occupied(HexPos(r, q)):
-                    color, power = self._state[HexPos(r, q)]
+                    color, power = self[HexPos(r, q)]
                     color = "r" if color == PlayerColor.RED else "b"
                     text = f"{color}{power}".center(4)
                     if use_color:
@@ -170,82 +178,66 @@ class Board:
         """
         The player (color) whose turn it is.
         """
-        return self._turn_color
+        return self._bits.turn_color
     
     @property
     def game_over(self) -> bool:
         """
         True iff the game is over.
         """
-        if self.turn_count < 2: 
-            return False
-        
-        return any([
-            self.turn_count >= MAX_TURNS,
-            self._color_power(PlayerColor.RED) == 0,
-            self._color_power(PlayerColor.BLUE) == 0
-        ])
+        return self._bits.game_over
     
     @property
     def winner_color(self) -> PlayerColor | None:
         """
         The player (color) who won the game, or None if no player has won.
         """
-        if not self.game_over:
-            return None
-        
-        red_power = self._color_power(PlayerColor.RED)
-        blue_power = self._color_power(PlayerColor.BLUE)
-
-        if abs(red_power - blue_power) < WIN_POWER_DIFF:
-            return None
-        
-        return (PlayerColor.RED, PlayerColor.BLUE)[red_power < blue_power]
+        return self._bits.winner_color
     
     @property
     def _total_power(self) -> int:
         """
         The total power of all cells on the board.
         """
-        return sum(map(lambda cell: cell.power, self._state.values()))
+        return self._bits.total_power
     
     def _player_cells(self, color: PlayerColor) -> list[CellState]:
-        return list(filter(
-            lambda cell: cell.player == color,
-            self._state.values()
-        ))
+        return [
+            CellState(color, self._bits.power(index))
+            for index in self._bits.color_cells(color)
+        ]
 
     def _color_power(self, color: PlayerColor) -> int:
-        return sum(map(lambda cell: cell.power, self._player_cells(color)))
+        return self._bits.color_power(color)
     
     def _within_bounds(self, coord: HexPos) -> bool:
         r, q = coord
         return 0 <= r < BOARD_N and 0 <= q < BOARD_N
     
     def _cell_occupied(self, coord: HexPos) -> bool:
-        return self._state[coord].power > 0
+        return self._bits.power(cell_index(coord)) > 0
 
     def _validate_action_pos_input(self, pos: HexPos):
         if type(pos) != HexPos or not self._within_bounds(pos):
             raise IllegalActionException(
-                f"'{pos}' is not a valid position.", self._turn_color)
+                f"'{pos}' is not a valid position.", self.turn_color)
 
     def _validate_action_dir_input(self, dir: HexDir):
         if type(dir) != HexDir:
             raise IllegalActionException(
-                f"'{dir}' is not a valid direction.", self._turn_color)
+                f"'{dir}' is not a valid direction.", self.turn_color)
 
     def _validate_spawn_action_input(self, action: SpawnAction):
         if type(action) != SpawnAction:
             raise IllegalActionException(
-                f"Action '{action}' is not a SPAWN action.", self._turn_color)
+                f"Action '{action}' is not a SPAWN action.", self.turn_color)
 
         self._validate_action_pos_input(action.cell)
 
     def _validate_spread_action_input(self, action: SpreadAction):
         if type(action) != SpreadAction:
             raise IllegalActionException(
-                f"Action '{action}' is not a SPREAD action.", self._turn_color)
+                f"Action '{action}' is not a SPREAD action.", self.turn_color)
 
         self._validate_action_pos_input(action.cell)
         self._validate_action_dir_input(action.direction)
@@ -258,16 +250,16 @@ class Board:
         if (self._total_power >= MAX_TOTAL_POWER):
             raise IllegalActionException(
                 f"Total board power max reached ({MAX_TOTAL_POWER})", 
-                self._turn_color)
+                self.turn_color)
 
         if self._cell_occupied(cell):
             raise IllegalActionException(
-                f"Cell {cell} is occupied.", self._turn_color)
+                f"Cell {cell} is occupied.", self.turn_color)
 
         return BoardMutation(
             action,
-            cell_mutations={CellMutation(cell, self._state[cell], 
-                                         CellState(self._turn_color, 1)
+            cell_mutations={CellMutation(cell, self[cell], 
+                                         CellState(self.turn_color, 1)
             )},
         )
 
@@ -275,23 +267,25 @@ class Board:
         self._validate_spread_action_input(action)
 
         from_cell, dir = action.cell, action.direction
-        action_player: PlayerColor = self._turn_color
+        action_player: PlayerColor = self.turn_color
+        from_state: CellState = self[from_cell]
 
-        if self[from_cell].player != action_player:
+        if from_state.player != action_player:
             raise IllegalActionException(
                 f"SPREAD cell {from_cell} not occupied by {action_player}",
-                self._turn_color)
+                self.turn_color)
 
-        # Compute destination cell coords.
+        # Look up destination cell coords.
         to_cells = [
-            from_cell + dir * (i + 1) for i in range(self[from_cell].power)
+            cell_pos(index) for index in 
+            SPREAD_CELLS[cell_index(from_cell)][dir_index(dir)][from_state.power]
         ]
 
         return BoardMutation(
             action,
             cell_mutations={
                 # Remove token stack from source cell.
-                CellMutation(from_cell, self[from_cell], CellState()),
+                CellMutation(from_cell, from_state, CellState()),
             } | {
                 # Add token stack to destination cells.
                 CellMutation(to_cell, self[to_cell], 
@@ -76,14 +76,15 @@ class HexDir(Enum):
             HexDir.UpRight:   "[↗]"
         }[self]
 
-    def __getattribute__(self, __name: str) -> int:
-        match __name:
-            case "r":
-                return self.value.r
-            case "q":
-                return self.value.q
-            case _:
-                return super().__getattribute__(__name)
+    # Plain properties rather than a __getattribute__ override, so that other
+    # attribute lookups (e.g. .value) don't pay for the dispatch.
+    @property
+    def r(self) -> int:
+        return self.value.r
+
+    @property
+    def q(self) -> int:
+        return self.value.q
 
 
 # HexPos represents a position in the axial coordinate system used by the game.
@@ -91,25 +92,51 @@ class HexDir(Enum):
 # in Action dataclasses (see actions.py). For convenience and safety, it also
 # ensures computed vector additions/subtractions are within the bounds of the
 # board, and throws an exception if trying to create an out-of-bounds position.
+#
+# There are only BOARD_N * BOARD_N valid positions, so they are interned: every
+# HexPos(r, q) (and every sum/difference) returns the same instance from the
+# HEX_POSITIONS table, indexed by r * BOARD_N + q. Equality and hashing are
+# therefore by identity.
 
-@dataclass(order=True, frozen=True)
+@dataclass(order=True, frozen=True, init=False)
 class HexPos(HexVec):
 
-    def __post_init__(self):
-        if not (0 <= self.r < BOARD_N) or not (0 <= self.q < BOARD_N):
-            raise ValueError(f"Out-of-bounds board position: {self}")
+    def __new__(cls, r: int, q: int) -> 'HexPos':
+        if not (0 <= r < BOARD_N) or not (0 <= q < BOARD_N):
+            raise ValueError(f"Out-of-bounds board position: {r}-{q}")
+        return HEX_POSITIONS[r * BOARD_N + q]
+
+    # The cached instance is already initialised.
+    __init__ = object.__init__
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __reduce__(self):
+        return (HexPos, (self.r, self.q))
 
     def __str__(self):
         return f"{self.r}-{self.q}"
 
     def __add__(self, other: 'HexDir|HexVec') -> 'HexPos':
-        return self.__class__(
-            (self.r + other.r) % BOARD_N, 
-            (self.q + other.q) % BOARD_N,
-        )
+        return HEX_POSITIONS[
+            (self.r + other.r) % BOARD_N * BOARD_N + 
+            (self.q + other.q) % BOARD_N
+        ]
 
     def __sub__(self, other: 'HexDir|HexVec') -> 'HexPos':
-        return self.__class__(
-            (self.r - other.r) % BOARD_N, 
+        return HEX_POSITIONS[
+            (self.r - other.r) % BOARD_N * BOARD_N + 
             (self.q - other.q) % BOARD_N
-        )
+        ]
+
+
+def _make_hex_pos(r: int, q: int) -> HexPos:
+    pos = object.__new__(HexPos)
+    object.__setattr__(pos, "r", r)
+    object.__setattr__(pos, "q", q)
+    return pos
+
+
+HEX_POSITIONS: tuple[HexPos, ...] = tuple(
+    _make_hex_pos(r, q) for r in range(BOARD_N) for q in range(BOARD_N)
+)
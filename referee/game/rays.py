@@ -0,0 +1,63 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+from .hex import HexDir
+from .constants import *
+
+
+# Precomputed spread rays for the toroidal board. Cells are indexed as
+# r * BOARD_N + q, and directions by their position in the HexDir enum. For
+# every cell, direction and power (0 to MAX_CELL_POWER) we store the cells a
+# spread would cover, in order, with wrapping already applied:
+#
+#   SPREAD_CELLS[index][direction][power] -> tuple of cell indices
+#   SPREAD_MASKS[index][direction][power] -> bitmask of the same cells
+#   REACH_MASKS[index][power] -> bitmask of the cells covered in any direction
+#
+# NEIGHBOURS[index][direction] is the adjacent cell in that direction. Since
+# BOARD_N is prime, a ray never revisits a cell or returns to its source.
+
+CELL_COUNT = BOARD_N * BOARD_N
+DIRECTIONS: list[HexDir] = list(HexDir)
+
+
+def _ray(index: int, direction: HexDir, power: int) -> tuple[int, ...]:
+    r, q = divmod(index, BOARD_N)
+    dr, dq = direction.value
+    return tuple(
+        ((r + dr * i) % BOARD_N) * BOARD_N + (q + dq * i) % BOARD_N
+        for i in range(1, power + 1)
+    )
+
+
+def _mask(cells: tuple[int, ...]) -> int:
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+
+SPREAD_CELLS: list[list[list[tuple[int, ...]]]] = [
+    [
+        [_ray(index, direction, power) for power in range(MAX_CELL_POWER + 1)]
+        for direction in DIRECTIONS
+    ]
+    for index in range(CELL_COUNT)
+]
+
+SPREAD_MASKS: list[list[list[int]]] = [
+    [[_mask(cells) for cells in rays] for rays in dir_rays]
+    for dir_rays in SPREAD_CELLS
+]
+
+REACH_MASKS: list[list[int]] = [
+    [
+        _mask(tuple(cell for rays in dir_rays for cell in rays[power]))
+        for power in range(MAX_CELL_POWER + 1)
+    ]
+    for dir_rays in SPREAD_CELLS
+]
+
+NEIGHBOURS: list[list[int]] = [
+    [rays[1][0] for rays in dir_rays] for dir_rays in SPREAD_CELLS
+]
@@ -20,7 +20,7 @@ from .game import Player, PlayerColor
 from .log import LogStream, LogColor, LogLevel
 from .run import game_user_wait, run_game, \
     game_commentator, game_event_logger, game_delay, output_board_updates
-from .agent import AgentProxyPlayer
+from .agent import AgentProxyPlayer, InProcessPlayer
 from .options import get_options
 
 
@@ -90,13 +90,16 @@ def main(options: Namespace|None=None):
             player_name = f"player {p_num} [{':'.join(player_loc)}]"
 
             rl.info(f"wrapping {player_name} as {player_color}...")
-            p: Player = AgentProxyPlayer(
+            PlayerClass = InProcessPlayer if options.in_process \
+                else AgentProxyPlayer
+            p: Player = PlayerClass(
                 player_name,
                 player_color,
                 player_loc,
                 time_limit=options.time,
                 space_limit=options.space,
-                log=LogStream(f"player{p_num}", LogColor[str(player_color)])
+                log=LogStream(f"player{p_num}", LogColor[str(player_color)]),
+                transport=options.transport,
             )
             agents[p] = {
                 "name": player_name,
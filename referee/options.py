@@ -4,6 +4,7 @@
 import sys
 import argparse
 from .game import PlayerColor, GAME_NAME, NUM_PLAYERS
+from .agent.io import TRANSPORTS, TRANSPORT_BINARY
 
 
 # Program information:
@@ -132,6 +133,23 @@ def get_options():
         help="limit on CPU time (float, seconds) for each agent.",
     )
 
+    optionals.add_argument(
+        "-i",
+        "--in-process",
+        action="store_true",
+        help="run the agents in the referee's process (each on a thread of "
+        "its own) rather than in subprocesses. Faster, but the agents are not "
+        "sandboxed and space limits are not enforced: trusted agents only.",
+    )
+    optionals.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default=TRANSPORT_BINARY,
+        help="how messages are sent to and from agent subprocesses. binary: "
+        "(default) length-prefixed raw pickles; base64: base64 encoded "
+        "pickles, one per line (slower).",
+    )
+
     verbosity_group = optionals.add_mutually_exclusive_group()
     verbosity_group.add_argument(
         "-d",
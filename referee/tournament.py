@@ -0,0 +1,261 @@
+# COMP30024 Artificial Intelligence, Semester 1 2023
+# Project Part B: Game Playing Agent
+
+# Entry point for running many games between agent packages, e.g.
+#
+#   python -m referee.tournament agent_minimax agent_greedy -n 40 -j 8 -t 180
+#
+# Every pair of the given packages plays the given number of games, the
+# packages swapping colours from one game to the next. Games are run
+# concurrently on a single event loop (the agents run in their own processes,
+# so each game keeps about one core busy): a fixed number of runners each take
+# the next game from a shared queue as soon as their last one ends, so no game
+# waits for a slower one to finish. Results are printed as games end, with a
+# summary at the end. As with the referee, each result is also appended to
+# output.csv in the working directory.
+
+import argparse
+import asyncio
+import os
+from dataclasses import dataclass
+from itertools import combinations
+from time import perf_counter
+from typing import AsyncGenerator
+
+from .game import PlayerColor, GameBegin, TurnBegin, TurnEnd
+from .log import LogStream, LogColor, LogLevel
+from .run import run_game
+from .agent import AgentProxyPlayer, AgentHostPool
+from .options import TIME_LIMIT_NOVALUE, SPACE_LIMIT_NOVALUE
+
+GAMES_DEFAULT = 10  # per pair of packages
+POOL_SIZE_PER_RUNNER = 2  # idle pre-forked hosts kept per concurrent game
+
+
+@dataclass
+class GameRecord:
+    number: int
+    red: str
+    blue: str
+    winner: PlayerColor | None = None
+    error: str | None = None
+    turns: int = 0
+    startup: float = 0.  # seconds until both agents are constructed
+    elapsed: float = 0.  # seconds for the whole game
+
+
+@dataclass
+class Standing:
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    errors: int = 0
+    games: int = 0
+
+
+async def game_recorder(record: GameRecord) -> AsyncGenerator:
+    """
+    Intercepts game updates to record the startup time and length of a game.
+    """
+    start = perf_counter()
+    while True:
+        update = yield
+        match update:
+            case GameBegin(_):
+                start = perf_counter()
+            case TurnBegin(1, _):
+                record.startup = perf_counter() - start
+            case TurnEnd(turn_id, _, _):
+                record.turns = turn_id
+
+
+def schedule(packages: list[str], games: int) -> list[GameRecord]:
+    """
+    Return the games to play between each pair of packages, alternating
+    colours, interleaving the pairs so that partial results cover them all.
+    """
+    pairs = list(combinations(packages, 2))
+    records = []
+    for game in range(games):
+        for a, b in pairs:
+            red, blue = (a, b) if game % 2 == 0 else (b, a)
+            records.append(GameRecord(len(records) + 1, red, blue))
+    return records
+
+
+async def run_tournament(
+    records: list[GameRecord],
+    concurrency: int,
+    time_limit: float,
+    space_limit: float,
+    pool: AgentHostPool | None,
+    log: LogStream,
+):
+    """
+    Play the given games, at most `concurrency` at a time, filling in their
+    records and logging each result as it comes in.
+    """
+    queue: asyncio.Queue[GameRecord] = asyncio.Queue()
+    for record in records:
+        queue.put_nowait(record)
+
+    async def _play(record: GameRecord):
+        players = [
+            AgentProxyPlayer(
+                f"{pkg} [{color}]", color, (pkg, "Agent"),
+                time_limit=time_limit, space_limit=space_limit, pool=pool,
+            )
+            for pkg, color in [(record.red, PlayerColor.RED),
+                               (record.blue, PlayerColor.BLUE)]
+        ]
+        start = perf_counter()
+        try:
+            winner = await run_game(players, [game_recorder(record)])
+            record.winner = None if winner is None else winner.color
+        except Exception as e:
+            record.error = f"{e.__class__.__name__}: {e}"
+        record.elapsed = perf_counter() - start
+
+    async def _runner():
+        while not queue.empty():
+            record = queue.get_nowait()
+            await _play(record)
+            log.info(_describe(record, len(records)))
+
+    await asyncio.gather(*[_runner() for _ in range(concurrency)])
+
+
+def _describe(record: GameRecord, total: int) -> str:
+    match record:
+        case GameRecord(error=str(error)):
+            result = f"error: {error}"
+        case GameRecord(winner=None):
+            result = "draw"
+        case GameRecord(winner=PlayerColor.RED):
+            result = f"{record.red} (RED) wins"
+        case _:
+            result = f"{record.blue} (BLUE) wins"
+    return (f"game {record.number}/{total}: "
+            f"{record.red} vs {record.blue}: {result} "
+            f"after {record.turns} turns "
+            f"({record.elapsed:.1f}s, startup {record.startup * 1e3:.0f}ms)")
+
+
+def standings(records: list[GameRecord]) -> dict[str, Standing]:
+    """
+    Return the wins, losses, draws and errors of each package.
+    """
+    table: dict[str, Standing] = {}
+    for record in records:
+        for pkg, color in [(record.red, PlayerColor.RED),
+                           (record.blue, PlayerColor.BLUE)]:
+            standing = table.setdefault(pkg, Standing())
+            standing.games += 1
+            if record.error is not None:
+                standing.errors += 1
+            elif record.winner is None:
+                standing.draws += 1
+            elif record.winner == color:
+                standing.wins += 1
+            else:
+                standing.losses += 1
+    return table
+
+
+def get_options() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m referee.tournament",
+        description="Play games between every pair of the given Agent "
+        "packages, several games at a time.",
+    )
+    parser.add_argument(
+        "packages",
+        nargs="+",
+        metavar="PKG",
+        help="agent packages to play (at least two; a package may be given "
+        "twice to play it against itself).",
+    )
+    parser.add_argument(
+        "-n",
+        "--games",
+        type=int,
+        default=GAMES_DEFAULT,
+        help="number of games between each pair of packages (colours "
+        "alternate between games).",
+    )
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of games to run at once (default: number of CPUs).",
+    )
+    parser.add_argument(
+        "-t",
+        "--time",
+        metavar="time_limit",
+        type=float,
+        nargs="?",
+        default=0,
+        const=TIME_LIMIT_NOVALUE,
+        help="limit on CPU time (float, seconds) for each agent, each game.",
+    )
+    parser.add_argument(
+        "-s",
+        "--space",
+        metavar="space_limit",
+        type=float,
+        nargs="?",
+        default=0,
+        const=SPACE_LIMIT_NOVALUE,
+        help="limit on memory space (float, MB) for each agent, each game.",
+    )
+    parser.add_argument(
+        "-p",
+        "--pool",
+        action="store_true",
+        help="host the agents in processes pre-forked from a template that "
+        "has imported the packages, rather than in new subprocesses.",
+    )
+    options = parser.parse_args()
+    if len(options.packages) < 2:
+        parser.error("at least two packages are required")
+    return options
+
+
+def main():
+    options = get_options()
+    LogStream.set_global_setting("level", LogLevel.INFO)
+    log = LogStream("tournament", LogColor.WHITE)
+
+    records = schedule(options.packages, options.games)
+    concurrency = max(1, min(options.concurrency, len(records)))
+    log.info(f"playing {len(records)} games, {concurrency} at a time...")
+
+    pool = None
+    if options.pool:
+        pool = AgentHostPool(set(options.packages),
+                             size=POOL_SIZE_PER_RUNNER * concurrency)
+        pool.fill()
+    start = perf_counter()
+    try:
+        asyncio.run(run_tournament(
+            records, concurrency, options.time, options.space, pool, log))
+    finally:
+        if pool is not None:
+            pool.close()
+    elapsed = perf_counter() - start
+
+    log.info()
+    for pkg, standing in standings(records).items():
+        log.info(f"{pkg}: {standing.wins} wins, {standing.losses} losses, "
+                 f"{standing.draws} draws, {standing.errors} errors "
+                 f"in {standing.games} games")
+    startup = sum(record.startup for record in records) / len(records)
+    log.info(f"{len(records)} games in {elapsed:.1f}s "
+             f"({len(records) / elapsed:.2f} games/s), "
+             f"mean startup {startup * 1e3:.0f}ms per game")
+
+
+if __name__ == "__main__":
+    main()